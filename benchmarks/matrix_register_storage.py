@@ -0,0 +1,47 @@
+"""Compare the memory footprint and construction time of the latch-level and bit-packed matrix registers.
+
+```
+python -m benchmarks.matrix_register_storage --widths 16 64 256
+```
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+from computer.ram import MatrixRegister, PackedMatrixRegister
+
+
+def footprint(register_class, width: int) -> int:
+    """Return the bytes allocated to construct a register of the given `width`."""
+    tracemalloc.start()
+    register = register_class(width)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del register
+    return allocated
+
+
+def construction_time(register_class, width: int, repeat: int = 5) -> float:
+    """Return the fewest seconds taken to construct a register of the given `width` in `repeat` runs.
+
+    Timed without tracing allocations, which would slow down the construction of the many latch objects.
+    """
+    return min(timeit.repeat(lambda: register_class(width), number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--widths", type=int, nargs="+", default=[16, 64, 128, 256])
+    parser.add_argument("--repeat", type=int, default=5, help="Construction runs to take the fastest of")
+    args = parser.parse_args()
+
+    print(f"{'width':>6} {'storage':>8} {'bytes':>14} {'construction [s]':>17}")
+    for width in args.widths:
+        for name, register_class in (("latches", MatrixRegister), ("packed", PackedMatrixRegister)):
+            allocated, seconds = footprint(register_class, width), construction_time(register_class, width, args.repeat)
+            print(f"{width:>6} {name:>8} {allocated:>14,} {seconds:>17.6f}")
+
+
+if __name__ == "__main__":
+    main()
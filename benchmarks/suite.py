@@ -0,0 +1,250 @@
+"""Benchmark the throughput of bits, gates, adders, latches, registers and conversions.
+
+```
+python -m benchmarks.suite --output baseline.json
+python -m benchmarks.suite --output current.json --compare baseline.json --threshold 0.25
+python -m benchmarks.suite --filter adders --quick
+```
+
+Every benchmark is timed with `timeit` over enough calls to take a measurable time, and the fastest of several repeats
+is reported in seconds per call. With `--compare` the results are compared to earlier ones and the process exits with
+status 1 if any benchmark got slower by more than the threshold.
+"""
+
+import argparse
+import json
+import platform
+import re
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+from computer import gates
+from computer.adders import full_adder, half_adder, ripple_carry_adder, ripple_carry_adder_8bit
+from computer.bits_and_bytes import Bit, BitString, Byte
+from computer.ram import AndOrLatch, GatedLatch, MatrixRegister, PackedMatrixRegister
+from computer.truth_table import truth_table
+
+
+WIDTHS = (4, 16, 64)
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = dict()
+
+
+def benchmark(name: str):
+    """Register a benchmark. The decorated function does the setup and returns the callable to time."""
+
+    def register(setup: Callable[[], Callable[[], object]]):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+@benchmark("bits.Bit")
+def _bit():
+    return lambda: Bit(1)
+
+
+@benchmark("bits.Byte.from_int")
+def _byte_from_int():
+    return lambda: Byte.from_int(0xA5)
+
+
+@benchmark("bits.Byte.from_str")
+def _byte_from_str():
+    return lambda: Byte("10100101")
+
+
+@benchmark("bits.Byte.getitem")
+def _byte_getitem():
+    byte = Byte.from_int(0xA5)
+    return lambda: byte[3]
+
+
+def _gate(gate: Callable) -> Callable:
+    inputs = (Bit(1),) if gate is gates.NOT else (Bit(1), Bit(0))
+    return lambda: lambda: gate(*inputs)
+
+
+for _name in ("AND", "OR", "NOT", "XOR", "NAND"):
+    benchmark(f"gates.{_name}")(_gate(getattr(gates, _name)))
+
+
+@benchmark("adders.half_adder")
+def _half_adder():
+    return lambda: half_adder(Bit(1), Bit(1))
+
+
+@benchmark("adders.full_adder")
+def _full_adder():
+    return lambda: full_adder(Bit(1), Bit(0), Bit(1))
+
+
+def _compiled(circuit: Callable, *inputs) -> Callable:
+    def setup():
+        compiled = truth_table(circuit)
+        compiled.build()
+        return lambda: compiled(*inputs)
+
+    return setup
+
+
+benchmark("gates.XOR[truth_table]")(_compiled(gates.XOR, Bit(1), Bit(0)))
+benchmark("adders.half_adder[truth_table]")(_compiled(half_adder, Bit(1), Bit(1)))
+benchmark("adders.full_adder[truth_table]")(_compiled(full_adder, Bit(1), Bit(0), Bit(1)))
+
+
+@benchmark("adders.ripple_carry_adder_8bit")
+def _ripple_carry_adder_8bit():
+    a, b = Byte.from_int(100), Byte.from_int(57)
+    return lambda: ripple_carry_adder_8bit(a, b)
+
+
+for _width in WIDTHS:
+
+    @benchmark(f"adders.ripple_carry_adder[width={_width}]")
+    def _ripple_carry_adder(width=_width):
+        a, b = BitString.from_int(12345 % (1 << width), width), BitString.from_int(54321 % (1 << width), width)
+        return lambda: ripple_carry_adder(a, b)
+
+
+@benchmark("latches.AndOrLatch.write")
+def _and_or_latch():
+    latch = AndOrLatch()
+    return lambda: latch.write(Bit(1), Bit(0))
+
+
+@benchmark("latches.GatedLatch.write")
+def _gated_latch():
+    latch = GatedLatch()
+    return lambda: latch.write(Bit(1), Bit(1))
+
+
+for _width in WIDTHS:
+    for _register_class in (MatrixRegister, PackedMatrixRegister):
+
+        @benchmark(f"registers.{_register_class.__name__}.construct[width={_width}]")
+        def _construct(register_class=_register_class, width=_width):
+            return lambda: register_class(width)
+
+        @benchmark(f"registers.{_register_class.__name__}.sweep[width={_width}]")
+        def _sweep(register_class=_register_class, width=_width):
+            """Write and read back every bit of the register once."""
+            register = register_class(width)
+
+            def sweep():
+                for row in range(width):
+                    for col in range(width):
+                        register.write(row, col, Bit(1), Bit(1))
+                        register.read(row, col, Bit(1))
+
+            return sweep
+
+
+@benchmark("conversions.BitString.from_int[width=64]")
+def _from_int():
+    return lambda: BitString.from_int(0x0123456789ABCDEF, 64)
+
+
+@benchmark("conversions.BitString.to_int[width=64]")
+def _to_int():
+    bitstring = BitString.from_int(0x0123456789ABCDEF, 64)
+    return lambda: int(bitstring)
+
+
+@benchmark("conversions.BitString.from_bytes[width=64]")
+def _from_bytes():
+    data = bytes(range(8))
+    return lambda: BitString.from_bytes(data)
+
+
+@benchmark("conversions.BitString.to_bytes[width=64]")
+def _to_bytes():
+    bitstring = BitString.from_int(0x0123456789ABCDEF, 64)
+    return lambda: bitstring.to_bytes()
+
+
+def run(pattern: Optional[str] = None, repeat: int = 5, min_time: float = 0.2) -> Dict[str, dict]:
+    """Run the benchmarks whose name matches the regular expression `pattern` and return their results.
+
+    Each result holds the fastest time per call in seconds over `repeat` repeats of `number` calls, where `number` is
+    chosen so that one repeat takes at least `min_time` seconds.
+    """
+    results = dict()
+    for name, setup in BENCHMARKS.items():
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        timer = timeit.Timer(setup())
+        number, seconds = timer.autorange()
+        number = max(1, int(number * min_time / max(seconds, 1e-9)))
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        results[name] = dict(seconds=best, number=number, repeat=repeat)
+    return results
+
+
+def compare(
+    baseline: Dict[str, dict], results: Dict[str, dict], threshold: float
+) -> List[Tuple[str, float, float, float, bool]]:
+    """Compare `results` with the `baseline` results of the same benchmarks.
+
+    Returns the name, baseline and current seconds per call, the ratio of the two and whether it is a regression,
+    i.e. slower than the baseline by more than the fraction `threshold`, for every benchmark in both.
+    """
+    rows = []
+    for name in results:
+        if name in baseline:
+            old, new = baseline[name]["seconds"], results[name]["seconds"]
+            ratio = new / old
+            rows.append((name, old, new, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown as a fraction")
+    parser.add_argument("--filter", help="Only run benchmarks matching this regular expression")
+    parser.add_argument("--quick", action="store_true", help="Fewer and shorter repeats")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(name for name in BENCHMARKS if args.filter is None or re.search(args.filter, name)))
+        return 0
+
+    repeat, min_time = (3, 0.05) if args.quick else (5, 0.2)
+    results = run(args.filter, repeat, min_time)
+    report = dict(
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        python=sys.version.split()[0],
+        machine=platform.platform(),
+        results=results,
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if not args.compare:
+        print(f"{'benchmark':<56} {'per call':>12}")
+        for name, result in results.items():
+            print(f"{name:<56} {result['seconds'] * 1e6:>10.3f}us")
+        return 0
+
+    with open(args.compare) as file:
+        baseline = json.load(file)["results"]
+    rows = compare(baseline, results, args.threshold)
+    print(f"{'benchmark':<56} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, old, new, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<56} {old * 1e6:>10.3f}us {new * 1e6:>10.3f}us {ratio:>7.2f}{flag}")
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print(f"{len(regressions)} of {len(rows)} benchmarks regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,10 @@ https://www.youtube.com/watch?v=1I5ZMmrOfnA&list=PLH2l6uzC4UEW0s7-KewFLBC1D0l6XR
 """
 
 
-from typing import Tuple
+from functools import lru_cache
+from typing import List, Tuple
 
+from computer.analysis import MeasuredCircuit
 from computer.bits_and_bytes import Bit, BitString, Byte
 from computer.gates import AND, OR, XOR
 from computer.configuration import PRECISION
@@ -55,17 +57,132 @@ def full_adder(a: Bit, b: Bit, c: Bit) -> Tuple[Bit, Bit]:
     return sum, carry
 
 
-def ripple_carry_adder_8bit(a: Byte, b: Byte):
-    """Add two numbers represented as 8-bit strings (bytes) together and return the sum byte and carry bit."""
-    # allocate memory for the sum and carry
-    sum = Byte("0" * 8)
-    carry = Bit("0")
+def ripple_carry_adder(a: BitString, b: BitString, carry: Bit = Bit(0)) -> Tuple[BitString, Bit]:
+    """Add two equally wide bit strings and a carry bit together and return the sum and carry bit.
+
+    The bit strings can have any width. They can also be `BitPlanes` to add a whole batch of numbers at once, e.g.
+    bit-sliced with 64 numbers per machine word.
+    """
+    assert len(a) == len(b)
+    # allocate memory for the sum
+    sum = [carry] * len(a)
     # from right-most (smallest) bit, call full-adder and carry the result forward to next bit
-    for i in range(1, 9):
+    for i in range(1, len(a) + 1):
         sum[-i], carry = full_adder(a[-i], b[-i], carry)
-    return sum, carry
+    return type(a).from_bits(sum), carry
+
+
+def ripple_carry_adder_8bit(a: Byte, b: Byte) -> Tuple[Byte, Bit]:
+    """Add two numbers represented as 8-bit strings (bytes) together and return the sum byte and carry bit.
+
+    The bytes can also be `BitPlanes` to add a whole batch of numbers at once.
+    """
+    assert len(a) == 8
+    return ripple_carry_adder(a, b)
+
+
+PREFIX_TOPOLOGIES = ("kogge-stone", "brent-kung", "sklansky")
 
 
-def carry_look_ahead_adder():
-    """Add two numbers represented as bit strings and return the sum and carry bit"""
-    
+def _prefix_levels(width: int, topology: str) -> List[List[Tuple[int, int]]]:
+    """Return the levels of prefix operators `(i, j)` that combine the span ending at bit `j` into the one at bit `i`.
+
+    Bits are numbered from the right-most (smallest) bit. Operators on the same level are evaluated in parallel.
+    """
+    levels = []
+    if topology == "kogge-stone":
+        distance = 1
+        while distance < width:
+            levels.append([(i, i - distance) for i in range(distance, width)])
+            distance *= 2
+    elif topology == "sklansky":
+        level = 0
+        while (1 << level) < width:
+            levels.append([(i, ((i >> level) << level) - 1) for i in range(width) if i & (1 << level)])
+            level += 1
+    elif topology == "brent-kung":
+        distance = 1
+        while distance < width:
+            level = [(i, i - distance) for i in range(2 * distance - 1, width, 2 * distance)]
+            if level:
+                levels.append(level)
+            distance *= 2
+        distance //= 2
+        while distance >= 1:
+            level = [(i, i - distance) for i in range(3 * distance - 1, width, 2 * distance)]
+            if level:
+                levels.append(level)
+            distance //= 2
+    else:
+        raise ValueError(f"Unknown prefix topology {topology!r}, expected one of {PREFIX_TOPOLOGIES}")
+    return levels
+
+
+class ParallelPrefixAdder(MeasuredCircuit):
+    def __init__(self, width: int, topology: str = "kogge-stone") -> None:
+        """A carry look-ahead adder that computes all carries with a parallel prefix network.
+
+        Every bit generates a carry `g = a AND b` and propagates an incoming one if `p = a XOR b`. The carry out of
+        bit `i` is the prefix `(G, P)` over bits `0..i` under the operator `(g, p) o (g', p') = (g OR p AND g', p AND
+        p')`, which the `topology` evaluates in a logarithmic number of levels:
+
+        - Kogge-Stone: log2(width) levels with one operator per bit and level; minimal depth and fan-out but the most
+          gates and wires.
+        - Brent-Kung: about 2*log2(width) levels and fewer than 2*width operators; the fewest gates.
+        - Sklansky: log2(width) levels and width/2 operators per level; minimal depth but high fan-out.
+
+        https://en.wikipedia.org/wiki/Kogge%E2%80%93Stone_adder
+        https://en.wikipedia.org/wiki/Brent%E2%80%93Kung_adder
+        """
+        self.width = width
+        self.topology = topology
+        self.levels = _prefix_levels(width, topology)
+
+    def __call__(self, a: BitString, b: BitString, carry: Bit = Bit(0)) -> Tuple[BitString, Bit]:
+        """Add two `width` bit strings and a carry bit together and return the sum and carry bit."""
+        assert len(a) == len(b) == self.width
+        width = self.width
+        propagate = [XOR(a[-1 - i], b[-1 - i]) for i in range(width)]
+        generate = [AND(a[-1 - i], b[-1 - i]) for i in range(width)]
+        # fold the incoming carry into the right-most bit so that every prefix starting at bit 0 includes it
+        generate[0] = OR(generate[0], AND(propagate[0], carry))
+        group_generate, group_propagate = list(generate), list(propagate)
+        lowest = list(range(width))  # right-most bit covered by the group ending at each bit
+        for level in self.levels:
+            updates = []
+            for i, j in level:
+                assert lowest[i] == j + 1
+                g = OR(group_generate[i], AND(group_propagate[i], group_generate[j]))
+                # groups that reach bit 0 hold the final carry and their propagate signal is never used again
+                p = AND(group_propagate[i], group_propagate[j]) if lowest[j] > 0 else None
+                updates.append((i, g, p, lowest[j]))
+            for i, g, p, low in updates:
+                group_generate[i], group_propagate[i], lowest[i] = g, p, low
+        assert all(low == 0 for low in lowest)
+        carries = [carry] + group_generate
+        sum = [XOR(propagate[i], carries[i]) for i in range(width)]
+        return type(a).from_bits(reversed(sum)), carries[width]
+
+    @property
+    def widths(self) -> Tuple[int, ...]:
+        return (self.width, self.width, 0)
+
+    def __repr__(self):
+        return f"ParallelPrefixAdder(width={self.width}, topology={self.topology!r})"
+
+
+@lru_cache(maxsize=None)
+def parallel_prefix_adder(width: int, topology: str = "kogge-stone") -> ParallelPrefixAdder:
+    """Return the (shared) parallel prefix adder of the given `width` and `topology`."""
+    return ParallelPrefixAdder(width, topology)
+
+
+def carry_look_ahead_adder(
+    a: BitString, b: BitString, carry: Bit = Bit(0), topology: str = "kogge-stone"
+) -> Tuple[BitString, Bit]:
+    """Add two numbers represented as bit strings and return the sum and carry bit.
+
+    The carries are looked ahead with a parallel prefix network of the given `topology` so that the depth of the
+    adder grows logarithmically instead of linearly with the width of the bit strings.
+    """
+    return parallel_prefix_adder(len(a), topology)(a, b, carry)
@@ -2,12 +2,23 @@
 
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, Optional, Tuple, Union
 
+import numpy as np
 
-OVERFLOW = ""
-ZERO = ""
-NEGATIVE = ""
+from computer.adders import ripple_carry_adder
+from computer.batch import bitslice, pack, unpack
+from computer.bits_and_bytes import Bit, BitString
+from computer.dividers import Divider
+from computer.gates import AND, NOT, OR, XOR
+from computer.logic import any_set, is_zero
+from computer.multipliers import Multiplier
+
+
+OVERFLOW = "overflow"
+ZERO = "zero"
+NEGATIVE = "negative"
+CARRY = "carry"
 
 
 class AbstractALU(ABC):
@@ -75,48 +86,160 @@ class AbstractALU(ABC):
 
 class ALU8Bit(AbstractALU):
     OP_CODES = dict(
-        
+        add="0000",
+        add_with_carry="0001",
+        subtact="0010",
+        subtract_with_borrow="0011",
+        negate="0100",
+        increment="0101",
+        decrement="0110",
+        pass_through="0111",
+        multiply="1000",
+        divide="1001",
     )
+    OPERANDS = dict(add_with_carry=3, subtract_with_borrow=3, negate=1, increment=1, decrement=1, pass_through=1)
+    FLAGS = {
+        OVERFLOW: "the signed result does not fit in the output",
+        ZERO: "all bits of the output are 0",
+        NEGATIVE: "the sign bit of the output is 1",
+        CARRY: "the adder carries out of its left-most bit",
+    }
 
     def __init__(self, precision: int = 8, op_code_bits: int = 4) -> None:
+        """An ALU that operates on `precision` bit two's complement numbers using gate-level adders.
+
+        Every operation returns its output and a dictionary of flag bits: `overflow` if the signed result does not
+        fit, `zero` and `negative` for the properties of the output and `carry` for the carry out of the adder. For
+        subtractions `carry` is the inverted borrow, so it can be fed to `subtract_with_borrow` through `NOT`.
+
+        Multiplication uses a radix-4 Booth multiplier and division a restoring divider on the magnitudes of the
+        operands, see `computer.multipliers` and `computer.dividers`.
+
+        Operations are dispatched through a table indexed by the integer value of the op code. The operands can be
+        bit strings or `BitPlanes`, so `batch` runs one op code over whole arrays of operands.
+        """
         self.precision = precision
         self.op_code_bits = op_code_bits
+        self.multiplier = Multiplier("booth", precision)
+        self.divider = Divider("restoring", precision)
+        self._dispatch = [None] * (1 << op_code_bits)
+        for name, op_code in self.OP_CODES.items():
+            self._dispatch[int(op_code, 2)] = (getattr(self, name), self.OPERANDS.get(name, 2))
+
+    def _operation(self, op_code: Union[str, BitString, int]):
+        index = int(op_code, 2) if isinstance(op_code, str) else int(op_code)
+        entry = self._dispatch[index]
+        if entry is None:
+            raise ValueError(f"Unknown op code {op_code}")
+        return entry
+
+    def __call__(
+        self, op_code: Union[str, BitString, int], a: BitString, b: Optional[BitString] = None, carry: Bit = Bit(0)
+    ) -> Tuple[BitString, Dict[str, Bit]]:
+        """Run the operation with the given `op_code` on `a` (and `b`) and return the output and flags."""
+        operation, n_operands = self._operation(op_code)
+        return operation(*(a, b, carry)[:n_operands])
+
+    def batch(
+        self,
+        op_code: Union[str, BitString, int],
+        a: np.ndarray,
+        b: Optional[np.ndarray] = None,
+        carry: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Run one operation over arrays of unsigned `precision` bit operands, 64 operations per gate evaluation.
+
+        Returns the outputs as an array of unsigned integers and a dictionary of boolean flag arrays, identical to
+        calling the ALU on each set of operands.
+        """
+        count = len(a)
+        a = bitslice(a, self.precision)
+        b = bitslice(np.zeros(count, dtype=np.uint64) if b is None else b, self.precision)
+        carry = Bit(0) if carry is None else pack(np.asarray(carry, dtype=bool), np.uint64)
+        output, flags = self(op_code, a, b, carry)
+        flags = {
+            name: unpack(flag, count) if not isinstance(flag, Bit) else np.full(count, bool(flag))
+            for name, flag in flags.items()
+        }
+        return output.to_ints(count), flags
+
+    def _constant(self, a: BitString, value: int) -> BitString:
+        """Return the constant `value` as a word of the same type as `a`."""
+        return type(a).from_bits(Bit((value >> (self.precision - 1 - i)) & 1) for i in range(self.precision))
+
+    def _flags(self, output: BitString, overflow: Bit, carry: Bit) -> Dict[str, Bit]:
+        return {OVERFLOW: overflow, ZERO: is_zero(output), NEGATIVE: output[0], CARRY: carry}
+
+    def _add(self, a: BitString, b: BitString, carry: Bit) -> Tuple[BitString, Dict[str, Bit]]:
+        """Add and flag signed overflow when both operands have the same sign and the sum has the other sign."""
+        assert len(a) == len(b) == self.precision
+        sum, carry = ripple_carry_adder(a, b, carry)
+        overflow = AND(NOT(XOR(a[0], b[0])), XOR(sum[0], a[0]))
+        return sum, self._flags(sum, overflow, carry)
+
+    def _invert(self, a: BitString) -> BitString:
+        return type(a).from_bits(NOT(bit) for bit in a)
+
+    def _negate_if(self, negative: Bit, a: BitString) -> BitString:
+        """Return the two's complement of `a` if `negative` is on else `a`."""
+        output, _ = ripple_carry_adder(
+            type(a).from_bits(XOR(bit, negative) for bit in a), self._constant(a, 0), negative
+        )
+        return output
+
+    def add(self, a: BitString, b: BitString):
+        """Add two bit strings."""
+        return self._add(a, b, Bit(0))
 
-    def __call__(self, op_code: str, a: str, b: Optional[str] = "") -> str:
-        flags = ()
-        
+    def add_with_carry(self, a: BitString, b: BitString, carry: Bit):
+        """Add two bit strings and a carry bit."""
+        return self._add(a, b, carry)
 
-    def add(self, a: str, b: str):
-        """Add two """
-        pass
+    def subtact(self, a: BitString, b: BitString):
+        """Subtract bitstring `b` from bitstring `a` by adding its two's complement."""
+        return self._add(a, self._invert(b), Bit(1))
 
-    def add_with_carry(self, a: str, b: str):
-        pass
+    def subtract_with_borrow(self, a: BitString, b: BitString, carry: Bit):
+        """Subtract bitstring `b` and the borrow `carry` from bitstring `a`."""
+        return self._add(a, self._invert(b), NOT(carry))
 
-    def subtact(self, a: str, b: str):
-        pass
+    def negate(self, a: BitString):
+        """Negative the sign of a bitstring by subtracting it from zero."""
+        return self.subtact(self._constant(a, 0), a)
 
-    def subtract_with_borrow(self, a: str, b: str):
-        pass
+    def increment(self, a: BitString):
+        """Add 1 to a bitstring."""
+        return self._add(a, self._constant(a, 0), Bit(1))
 
-    def negate(self, a: str):
-        pass
+    def decrement(self, a: BitString):
+        """Subtract 1 from a bitstring by adding all ones."""
+        return self._add(a, self._constant(a, (1 << self.precision) - 1), Bit(0))
 
-    def increment(self, a: str):
-        pass
+    def multiply(self, a: BitString, b: BitString):
+        """Multiply together two bitstrings and keep the low half of the product.
 
-    def decrement(self, a: str):
-        pass
+        Overflow is flagged when the discarded high half is not the sign extension of the output.
+        """
+        product = self.multiplier(a, b)
+        output = type(a).from_bits(product[self.precision :])
+        overflow = any_set([XOR(product[i], output[0]) for i in range(self.precision)])
+        return output, self._flags(output, overflow, Bit(0))
 
-    def pass_through(self, a: str):
-        return a
+    def divide(self, a: BitString, b: BitString):
+        """Divide bitstring `a` by bitstring `b`, rounding the quotient towards zero.
 
-# Add
-# Add with carry
-# Subtract
-# Subtract with borrow
-# Negate
-# Increment
-# Decrement
-# Pass through
+        Overflow is flagged when dividing by zero and for the one quotient that does not fit, the most negative
+        number divided by -1.
+        """
+        negative = XOR(a[0], b[0])
+        quotient, _ = self.divider(self._negate_if(a[0], a), self._negate_if(b[0], b))
+        output = self._negate_if(negative, quotient)
+        overflow = OR(is_zero(b), AND(XOR(output[0], negative), quotient[0]))
+        return output, self._flags(output, overflow, Bit(0))
+
+    def pass_through(self, a: BitString):
+        """All bits of a bitstring are passed through without modification."""
+        return a, self._flags(a, Bit(0), Bit(0))
 
+    def __repr__(self):
+        return f"ALU8Bit(precision={self.precision})"
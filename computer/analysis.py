@@ -0,0 +1,195 @@
+"""Static analysis of circuits
+
+A circuit is analysed by evaluating it once on `Probe` signals instead of bits. Every primitive gate that acts on a
+probe produces a new probe one level deeper and is tallied, so the logic depth and gate count of any circuit built
+from `computer.gates` fall out of a single evaluation. Constant `Bit` inputs are folded away like a synthesis tool
+would, so the figures describe the circuit that remains.
+
+Every probe also remembers the gate that produced it and its deepest input, so the critical path, the longest chain of
+gates from an input to an output, can be followed back from the deepest output.
+"""
+
+import sys
+from abc import ABC, abstractmethod
+from collections import Counter
+from types import FrameType
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from typing_extensions import Self
+
+from computer.bits_and_bytes import Bit, Word
+
+
+GATE_MODULES = ("computer.gates", __name__)
+COMPREHENSIONS = ("<listcomp>", "<dictcomp>", "<setcomp>", "<genexpr>")
+
+
+def enclosing_circuit(frame: Optional[FrameType]) -> str:
+    """Return the qualified name of the innermost function on the stack from `frame` that is not a gate.
+
+    Comprehensions are attributed to the function they are written in.
+    """
+    while frame is not None and (
+        frame.f_globals.get("__name__") in GATE_MODULES or frame.f_code.co_name in COMPREHENSIONS
+    ):
+        frame = frame.f_back
+    if frame is None:
+        return "<unknown>"
+    code = frame.f_code
+    # code objects only know their qualified name from Python 3.11
+    return f"{frame.f_globals.get('__name__')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class Probe():
+    """A signal that records the depth at which it is produced and tallies the gates evaluated on it."""
+
+    __slots__ = ("depth", "tally", "source")
+
+    def __init__(self, depth: int, tally: Counter, source: Optional[Tuple[str, "Probe"]] = None) -> None:
+        self.depth = depth
+        self.tally = tally
+        self.source = source  # the gate that produced the probe and its deepest input
+
+    def _gate(self, name: str, *inputs: "Probe") -> Self:
+        self.tally[name] += 1
+        deepest = max(inputs, key=lambda signal: signal.depth)
+        return type(self)(deepest.depth + 1, self.tally, (name, deepest))
+
+    def __and__(self, other: Any) -> Any:
+        if isinstance(other, Bit):
+            return self if other else other
+        return self._gate("AND", self, other)
+
+    def __or__(self, other: Any) -> Any:
+        if isinstance(other, Bit):
+            return other if other else self
+        return self._gate("OR", self, other)
+
+    def __invert__(self) -> Self:
+        return self._gate("NOT", self)
+
+    __rand__ = __and__
+    __ror__ = __or__
+
+    def __bool__(self) -> bool:
+        raise TypeError("The value of a probe is unknown so a circuit cannot branch on it")
+
+    def __repr__(self) -> str:
+        return f"Probe(depth={self.depth})"
+
+
+class CircuitProbe(Probe):
+    """A probe that also records the circuit that evaluated the gate producing it, at the cost of a stack walk."""
+
+    __slots__ = ("circuit",)
+
+    def __init__(self, depth: int, tally: Counter, source: Optional[Tuple[str, "Probe"]] = None) -> None:
+        super().__init__(depth, tally, source)
+        self.circuit = enclosing_circuit(sys._getframe(1)) if source is not None else None
+
+
+class CircuitStats(NamedTuple):
+    """The logic depth and primitive gate counts of a circuit."""
+
+    depth: int
+    gates: Counter
+
+    @property
+    def gate_count(self) -> int:
+        return sum(self.gates.values())
+
+
+def _flatten(outputs: Any) -> Iterator[Any]:
+    if isinstance(outputs, (tuple, list)):
+        for output in outputs:
+            yield from _flatten(output)
+    else:
+        yield outputs
+
+
+def probe_inputs(widths: Iterable[int], tally: Counter, probe_type: type = Probe) -> List[Any]:
+    """Return one probe per zero `width` (a single bit input) and one `Word` per multi-bit input."""
+    return [
+        probe_type(0, tally) if width == 0 else Word(probe_type(0, tally) for _ in range(width))
+        for width in widths
+    ]
+
+
+def measure(circuit, *widths: int) -> CircuitStats:
+    """Measure the depth and gate count of `circuit` called with inputs of the given `widths`.
+
+    A width of 0 stands for a single `Bit` input, any other width for a bit string of that many bits.
+    """
+    tally = Counter()
+    outputs = circuit(*probe_inputs(widths, tally))
+    depth = max((output.depth for output in _flatten(outputs) if isinstance(output, Probe)), default=0)
+    return CircuitStats(depth, tally)
+
+
+class MeasuredCircuit(ABC):
+    """A circuit component that measures its logic depth and gate count once, on inputs of its `widths`."""
+
+    _stats: Optional[CircuitStats] = None
+
+    @property
+    @abstractmethod
+    def widths(self) -> Tuple[int, ...]:
+        """The widths of the inputs of the circuit, 0 for a single `Bit`, see `measure`."""
+        pass
+
+    @property
+    def stats(self) -> CircuitStats:
+        """The logic depth and gate counts of the circuit in primitive AND, OR and NOT gates."""
+        if self._stats is None:
+            self._stats = measure(self, *self.widths)
+        return self._stats
+
+    @property
+    def depth(self) -> int:
+        return self.stats.depth
+
+    @property
+    def gate_count(self) -> int:
+        return self.stats.gate_count
+
+
+class CriticalPath(NamedTuple):
+    """The gates on the longest path through a circuit from an input to an output, with the enclosing circuits."""
+
+    gates: List[Tuple[str, str]]
+
+    @property
+    def depth(self) -> int:
+        return len(self.gates)
+
+    def circuits(self) -> Counter:
+        """Return the number of gates on the path evaluated by each circuit."""
+        return Counter(circuit for _, circuit in self.gates)
+
+
+def critical_path(circuit, *widths: int) -> CriticalPath:
+    """Find the critical path of `circuit` called with inputs of the given `widths`, see `measure`."""
+    outputs = circuit(*probe_inputs(widths, Counter(), CircuitProbe))
+    probes = [output for output in _flatten(outputs) if isinstance(output, Probe)]
+    gates = []
+    if probes:
+        probe = max(probes, key=lambda probe: probe.depth)
+        while probe.source is not None:
+            name, deepest = probe.source
+            gates.append((name, probe.circuit))
+            probe = deepest
+    return CriticalPath(gates[::-1])
+
+
+def report(circuit, *widths: int) -> str:
+    """Return a readable report of the depth, gate counts and critical path of `circuit`."""
+    stats = measure(circuit, *widths)
+    path = critical_path(circuit, *widths)
+    lines = [
+        f"{getattr(circuit, '__qualname__', repr(circuit))}{tuple(widths)}",
+        f"  depth {stats.depth}, {stats.gate_count} gates: "
+        + ", ".join(f"{count} {gate}" for gate, count in sorted(stats.gates.items())),
+        "  critical path by circuit:",
+    ]
+    lines += [f"    {count:>6}  {name}" for name, count in path.circuits().most_common()]
+    return "\n".join(lines)
@@ -0,0 +1,190 @@
+"""On-disk cache of built circuit artifacts
+
+Structures that take long to build, e.g. the truth table of a circuit, a compiled netlist or a large memory, can be
+kept in an `ArtifactCache` so that the next process loads them from disk instead of building them again.
+
+Every artifact is keyed by the function that builds it and its arguments, together with a fingerprint of the source
+of the `computer` package. Changing any circuit definition therefore invalidates all artifacts built from the old
+source, and changing `CACHE_VERSION` (e.g. when the layout of a cached structure changes) invalidates everything.
+Artifacts are pickled, which keeps `Bit`s the interned `ZERO` and `ONE` singletons.
+
+Latch based structures (`GatedLatch`, `MatrixRegister` and memories built from them) pickle as their stored bits and
+rebuild their latch objects on load, which takes about as long as building them. They load no faster than they build,
+so cache memories with `storage="packed"`, which load as a single buffer.
+
+```
+cache = ArtifactCache()
+memory = cache.get_or_build(SRAM, 16, 16, storage="packed")
+```
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+import types
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+
+
+CACHE_VERSION = 1
+CACHE_DIRECTORY = os.environ.get("COMPUTER_CACHE_DIR", os.path.join("~", ".cache", "computer"))
+PACKAGE_DIRECTORY = Path(__file__).resolve().parent
+
+
+@functools.lru_cache(maxsize=None)
+def source_fingerprint(directory: Path = PACKAGE_DIRECTORY) -> str:
+    """Return a hash of the source of every Python module in `directory` and below."""
+    digest = hashlib.sha256()
+    for path in sorted(directory.rglob("*.py")):
+        digest.update(str(path.relative_to(directory)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _module_fingerprint(name: str) -> str:
+    """Return a hash of the source of the module `name` if it is outside the package, which is fingerprinted whole."""
+    path = getattr(sys.modules.get(name), "__file__", None)
+    if path is None or Path(path).resolve().is_relative_to(PACKAGE_DIRECTORY):
+        return ""
+    return "@" + hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+
+def describe(value: Any) -> str:
+    """Return a description of `value` that is the same in every process, to key artifacts by.
+
+    Functions and classes are described by their qualified name (and the source of their module if it is not part of
+    the package), partials by their function and arguments, arrays by their contents and any other value by its
+    `repr`. Raises a `ValueError` for values whose `repr` is not stable, e.g. holds an address, and for methods bound
+    to an instance, whose state is not part of their name.
+    """
+    if isinstance(value, functools.partial):
+        arguments = [describe(arg) for arg in value.args]
+        arguments += [f"{name}={describe(arg)}" for name, arg in sorted(value.keywords.items())]
+        return f"partial({describe(value.func)}, {', '.join(arguments)})"
+    if isinstance(value, np.ndarray):
+        return f"ndarray({value.dtype}, {value.shape}, {hashlib.sha256(value.tobytes()).hexdigest()[:16]})"
+    if isinstance(value, (tuple, list)):
+        return type(value).__name__ + "(" + ", ".join(describe(item) for item in value) + ")"
+    if isinstance(value, dict):
+        return "dict(" + ", ".join(f"{describe(k)}: {describe(v)}" for k, v in sorted(value.items())) + ")"
+    bound = getattr(value, "__self__", None) if inspect.ismethod(value) or inspect.isbuiltin(value) else None
+    if bound is not None and not isinstance(bound, (type, types.ModuleType)):
+        raise ValueError(f"{value.__qualname__} is bound to an instance so it cannot key an artifact")
+    if hasattr(value, "__qualname__") and hasattr(value, "__module__"):
+        if "<locals>" in value.__qualname__ or "<lambda>" in value.__qualname__:
+            raise ValueError(f"{value.__qualname__} is not defined at module level so it cannot key an artifact")
+        return f"{value.__module__}.{value.__qualname__}{_module_fingerprint(value.__module__)}"
+    description = repr(value)
+    if " at 0x" in description:
+        raise ValueError(f"The representation {description} is not stable so it cannot key an artifact")
+    return description
+
+
+class ArtifactCache():
+    def __init__(self, directory: Optional[Union[str, Path]] = None, enabled: bool = True) -> None:
+        """A directory of pickled artifacts keyed by the function that builds them and its arguments.
+
+        Args:
+            directory (str): Root of the cache. Defaults to `$COMPUTER_CACHE_DIR` or `~/.cache/computer`. The
+                artifacts are kept in a subdirectory per `CACHE_VERSION`.
+            enabled (bool): Load and store artifacts. A disabled cache builds every artifact.
+        """
+        root = Path(os.path.expanduser(CACHE_DIRECTORY if directory is None else directory))
+        self.directory = root / f"v{CACHE_VERSION}"
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def fingerprint(self) -> str:
+        return source_fingerprint()[:16]
+
+    def key(self, builder: Callable, *args, **kwargs) -> str:
+        """Return the key of the artifact built by `builder(*args, **kwargs)` from the current source."""
+        description = describe(builder) + describe(args) + describe(kwargs)
+        python = f"{sys.version_info.major}.{sys.version_info.minor}"  # pickles of code objects are version bound
+        digest = hashlib.sha256(f"{python}:{self.fingerprint}:{description}".encode()).hexdigest()[:32]
+        name = getattr(builder, "__name__", type(builder).__name__)
+        return f"{name}-{self.fingerprint}-{digest}"
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def load(self, key: str) -> Any:
+        """Return the artifact stored under `key`. Raises a `KeyError` if there is none or it cannot be read."""
+        try:
+            with open(self.path(key), "rb") as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            raise KeyError(key) from None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+            raise KeyError(f"{key} is unreadable: {error}") from None
+
+    def store(self, key: str, artifact: Any) -> None:
+        """Store `artifact` under `key`, atomically so that concurrent processes never read a partial artifact."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                pickle.dump(artifact, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def get_or_build(self, builder: Callable, *args, **kwargs) -> Any:
+        """Return the artifact `builder(*args, **kwargs)`, loaded from the cache or else built and stored."""
+        if not self.enabled:
+            return builder(*args, **kwargs)
+        key = self.key(builder, *args, **kwargs)
+        try:
+            artifact = self.load(key)
+        except KeyError:
+            self.misses += 1
+            artifact = builder(*args, **kwargs)
+            self.store(key, artifact)
+            return artifact
+        self.hits += 1
+        return artifact
+
+    def __contains__(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def prune(self) -> int:
+        """Remove the artifacts built from another version of the source and return how many were removed."""
+        removed = 0
+        for path in self.directory.glob("*.pkl"):
+            if path.stem.split("-")[-2] != self.fingerprint:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove all artifacts."""
+        for path in self.directory.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+
+    def __repr__(self):
+        return f"ArtifactCache({str(self.directory)!r}, hits={self.hits}, misses={self.misses})"
+
+
+def cached(builder: Callable, cache: Optional[ArtifactCache] = None) -> Callable:
+    """Wrap `builder` so that it returns artifacts from `cache`, by default an `ArtifactCache()` in the default place.
+
+    Can be used as a decorator on module level functions that build artifacts.
+    """
+    cache = ArtifactCache() if cache is None else cache
+
+    @functools.wraps(builder)
+    def build(*args, **kwargs):
+        return cache.get_or_build(builder, *args, **kwargs)
+
+    build.cache = cache
+    return build
@@ -0,0 +1,157 @@
+"""Batched evaluation of circuits over NumPy arrays
+
+The gates in `computer.gates` are built from the bitwise operators, so every circuit composed of them also runs on
+NumPy arrays. A boolean array holds one independent simulation per element, while a packed unsigned integer array
+(`uint8` up to `uint64`) holds one independent simulation per bit lane. A `Bit` can be mixed in as a constant.
+
+Multi-bit words are batched as `BitPlanes`: one array per bit position, ordered like the bits of a `BitString`.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from typing_extensions import Self
+
+from computer.adders import ripple_carry_adder
+from computer.bits_and_bytes import Bit, BitString
+
+
+SIGNAL_DTYPES = (np.bool_, np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def signal(array: Union[np.ndarray, Sequence]) -> np.ndarray:
+    """Return `array` as a batched signal, checking that its dtype is boolean or packed unsigned integer."""
+    array = np.asarray(array)
+    if array.dtype.type not in SIGNAL_DTYPES:
+        raise TypeError(f"A batched signal must have one of the dtypes {SIGNAL_DTYPES} but got {array.dtype}")
+    return array
+
+
+def pack(bits: np.ndarray, dtype: np.dtype = np.uint64) -> np.ndarray:
+    """Pack the last axis of a boolean array into bit lanes of `dtype` words.
+
+    Lane `k` is bit `k % w` of word `k // w` where `w` is the number of bits in `dtype`. Unused lanes are zero.
+    """
+    dtype = np.dtype(dtype)
+    bits = np.asarray(bits, dtype=bool)
+    packed = np.packbits(bits, axis=-1, bitorder="little")
+    padding = -packed.shape[-1] % dtype.itemsize
+    if padding:
+        packed = np.concatenate([packed, np.zeros(packed.shape[:-1] + (padding,), np.uint8)], axis=-1)
+    return packed.view(dtype.newbyteorder("<")).astype(dtype)
+
+
+def unpack(packed: np.ndarray, count: int) -> np.ndarray:
+    """Unpack the first `count` bit lanes of packed words into the last axis of a boolean array."""
+    packed = np.asarray(packed)
+    as_bytes = packed.astype(packed.dtype.newbyteorder("<")).view(np.uint8)
+    return np.unpackbits(as_bytes, axis=-1, count=count, bitorder="little").astype(bool)
+
+
+def int_dtype(width: int) -> np.dtype:
+    """Return the integer dtype that holds `width` bit unsigned values."""
+    return np.dtype(np.uint64) if width <= 64 else np.dtype(object)
+
+
+class BitPlanes():
+    """A batch of bitstrings stored as one signal array per bit position."""
+
+    __slots__ = ("planes",)
+
+    def __init__(self, planes: Sequence[Union[np.ndarray, Bit]]) -> None:
+        self.planes = list(planes)
+
+    @classmethod
+    def from_bits(cls, bits: Iterable[Union[np.ndarray, Bit]]) -> Self:
+        """Create a batch from its bit planes ordered from left to right, broadcasting constant `Bit` planes."""
+        planes = list(bits)
+        reference = next((plane for plane in planes if not isinstance(plane, Bit)), None)
+        if reference is not None:
+            zeros = np.zeros_like(reference)
+            planes = [(~zeros if plane else zeros) if isinstance(plane, Bit) else plane for plane in planes]
+        return cls(planes)
+
+    @classmethod
+    def from_ints(cls, values: Union[np.ndarray, Sequence[int]], width: int, dtype: np.dtype = np.bool_) -> Self:
+        """Create a batch of `width` bit bitstrings holding the unsigned integers `values`.
+
+        `values` must be an object array of Python integers if `width` is more than 64.
+        With a boolean `dtype` every element of a plane is one simulation. With an unsigned integer `dtype` the
+        simulations are packed into the bit lanes of the plane words.
+        """
+        values = np.asarray(values, dtype=int_dtype(width))
+        one = values.dtype.type(1)
+        planes = [((values >> values.dtype.type(width - 1 - i)) & one).astype(bool) for i in range(width)]
+        if np.dtype(dtype) != np.bool_:
+            planes = [pack(plane, dtype) for plane in planes]
+        return cls(planes)
+
+    @classmethod
+    def from_bitstrings(cls, bitstrings: Sequence[BitString], dtype: np.dtype = np.bool_) -> Self:
+        """Create a batch from equally wide bitstrings."""
+        width = len(bitstrings[0])
+        assert all(len(bitstring) == width for bitstring in bitstrings)
+        return cls.from_ints([int(bitstring) for bitstring in bitstrings], width, dtype)
+
+    @property
+    def is_packed(self) -> bool:
+        return self.planes[0].dtype != np.bool_
+
+    def to_ints(self, count: Optional[int] = None) -> np.ndarray:
+        """Return the batch as an array of unsigned integers, unpacking the first `count` lanes of packed planes.
+
+        Batches wider than 64 bits are returned as an object array of Python integers.
+        """
+        planes = self.planes
+        if self.is_packed:
+            count = planes[0].shape[-1] * planes[0].itemsize * 8 if count is None else count
+            planes = [unpack(plane, count) for plane in planes]
+        dtype = int_dtype(len(planes))
+        one = dtype.type(1)
+        values = np.zeros(np.shape(planes[0]), dtype=dtype)
+        for plane in planes:
+            values = (values << one) | plane.astype(dtype)
+        return values
+
+    def to_bitstrings(self, count: Optional[int] = None) -> List[BitString]:
+        """Return the batch as a list of bitstrings."""
+        return [BitString.from_int(int(value), len(self)) for value in self.to_ints(count).ravel()]
+
+    def __len__(self) -> int:
+        return len(self.planes)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return iter(self.planes)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[np.ndarray, Self]:
+        if isinstance(index, slice):
+            return BitPlanes(self.planes[index])
+        return self.planes[index]
+
+    def __setitem__(self, index: int, plane: np.ndarray) -> None:
+        self.planes[index] = plane
+
+    def __repr__(self):
+        return f"BitPlanes(width={len(self.planes)}, shape={np.shape(self.planes[0]) if self.planes else ()})"
+
+
+def bitslice(values: Union[np.ndarray, Sequence[int]], width: int) -> BitPlanes:
+    """Bit-slice `width` bit unsigned integers so that bit `i` of 64 consecutive values shares one `uint64` word."""
+    return BitPlanes.from_ints(values, width, np.uint64)
+
+
+def bitsliced_add(
+    a: Union[np.ndarray, Sequence[int]],
+    b: Union[np.ndarray, Sequence[int]],
+    width: int,
+    carry: Optional[Union[np.ndarray, Sequence[int]]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Add pairs of `width` bit unsigned integers with the ripple carry adder, 64 pairs per gate evaluation.
+
+    Returns the `width` bit sums and the carry bits, identical to calling the scalar adder on each pair.
+    """
+    count = len(a)
+    carry = Bit(0) if carry is None else pack(np.asarray(carry, dtype=bool), np.uint64)
+    sum, carry = ripple_carry_adder(bitslice(a, width), bitslice(b, width), carry)
+    carry = unpack(carry, count) if not isinstance(carry, Bit) else np.full(count, bool(carry))
+    return sum.to_ints(count), carry
@@ -1,66 +1,198 @@
 """Classes that represent bits and bytes"""
 
 
-from enum import Enum
-from typing import Union
+from typing import Iterable, Iterator, Optional, Union
 from typing_extensions import Self
 
 
 class Bit():
-    """One bit of information."""
+    """One bit of information.
 
-    def __init__(self, state: Union[int, str]) -> None:
-        state = str(state)
-        assert len(state) == 1
-        assert state in ["0", "1"]
-        self.state = state
+    There are exactly two bits, `ZERO` and `ONE`. Constructing a `Bit` returns one of these shared instances so
+    that bits can be compared by identity and gates never allocate.
+    """
+
+    __slots__ = ("state", "_value")
+
+    _instances = dict()
+
+    def __new__(cls, state: Union[int, str, bool, "Bit"]) -> Self:
+        try:
+            return cls._instances[state]
+        except (KeyError, TypeError):
+            raise ValueError(f"A bit must be 0 or 1 but got {state!r}") from None
+
+    @classmethod
+    def _intern(cls, state: str) -> Self:
+        bit = object.__new__(cls)
+        bit.state = state
+        bit._value = state == "1"
+        cls._instances.update({state: bit, int(state): bit, bit: bit})
+        return bit
+
+    # NumPy arrays defer to the reflected operators below so a bit can act as a constant in batched circuits.
+    __array_ufunc__ = None
 
     def __bool__(self) -> bool:
         """The `bool` operator."""
-        return self.state == "1"
+        return self._value
+
+    def __int__(self) -> int:
+        return int(self._value)
 
     def __invert__(self) -> Self:
         """The ~ operator."""
-        return Bit("0" if self.state == "1" else "1")
+        return ZERO if self._value else ONE
 
     def __or__(self, bit: Self) -> Self:
         """The `or` operator."""
-        return self.state == "1" or bit.state == "1"
+        return self if self._value else bit
 
     def __and__(self, bit: Self) -> Self:
         """The `and` operator."""
-        return self.state == "1" and bit.state == "1"
+        return bit if self._value else self
 
-    def __eq__(self, bit: Self) -> bool:
-        """The `==` operator."""
-        if isinstance(bit, Bit):
-            return self.state == bit.state
+    __ror__ = __or__
+    __rand__ = __and__
 
-        return False
+    def __reduce__(self):
+        return (Bit, (self.state,))
+
+    def __copy__(self) -> Self:
+        return self
+
+    def __deepcopy__(self, memo) -> Self:
+        return self
 
     def __repr__(self) -> str:
         return f"Bit({self.state})"
 
 
+ZERO = Bit._intern("0")
+ONE = Bit._intern("1")
+
+
+class Word(list):
+    """A word of bits or signals, e.g. probes, wires or NumPy arrays, that circuits index like a `BitString`.
+
+    Circuits build their outputs with `type(a).from_bits`, so a circuit evaluated on `Word`s returns `Word`s.
+    """
+
+    @classmethod
+    def from_bits(cls, bits: Iterable) -> Self:
+        return cls(bits)
+
+
 class BitString():
-    """Some number of bits of information."""
+    """Some number of bits of information.
 
-    def __init__(self, bits: str) -> None:
-        assert all(b in ["0", "1"] for b in bits)
-        self._bits = list(bits)
+    The bits are packed into a single integer with the left-most bit as the most significant one. This makes
+    conversion to and from `int` and `bytes` a single operation and lets comparisons work on the whole word at once.
+    """
 
-    @property
-    def bits(self):
-        return "".join(self._bits)
+    __slots__ = ("_value", "_width")
 
-    def __getitem__(self, index: int) -> Bit:
-        return Bit(self._bits[index])
+    def __init__(self, bits: str) -> None:
+        assert not bits.strip("01")
+        self._width = len(bits)
+        self._value = int(bits, 2) if bits else 0
+
+    @classmethod
+    def _new(cls, value: int, width: int) -> Self:
+        """Create a bitstring directly from its packed integer `value` without parsing a string."""
+        bitstring = object.__new__(cls)
+        bitstring._value = value
+        bitstring._width = width
+        return bitstring
+
+    @classmethod
+    def from_int(cls, value: int, width: int) -> Self:
+        """Create a `width` bit long bitstring holding the unsigned integer `value`."""
+        assert 0 <= value < (1 << width)
+        return cls._new(value, width)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, width: Optional[int] = None) -> Self:
+        """Create a bitstring from big-endian `data`, by default using all `8 * len(data)` bits."""
+        width = 8 * len(data) if width is None else width
+        return cls.from_int(int.from_bytes(data, "big"), width)
+
+    @classmethod
+    def from_bits(cls, bits: Iterable[Bit]) -> Self:
+        """Create a bitstring from an iterable of bits ordered from left to right."""
+        value = 0
+        width = 0
+        for bit in bits:
+            value = (value << 1) | (1 if bit else 0)
+            width += 1
+        return cls._new(value, width)
 
-    def __setitem__(self, index: int, bit: Bit) -> None:
-        self._bits[index] = bit.state
+    @property
+    def bits(self) -> str:
+        return format(self._value, f"0{self._width}b") if self._width else ""
+
+    def to_int(self) -> int:
+        """Return the bitstring interpreted as an unsigned integer."""
+        return self._value
+
+    def to_bytes(self) -> bytes:
+        """Return the bitstring as big-endian bytes, left-padded with zeros to a whole number of bytes."""
+        return self._value.to_bytes((self._width + 7) // 8, "big")
+
+    def __int__(self) -> int:
+        return self._value
+
+    def __bytes__(self) -> bytes:
+        return self.to_bytes()
+
+    def __len__(self) -> int:
+        return self._width
+
+    def __iter__(self) -> Iterator[Bit]:
+        value = self._value
+        for shift in range(self._width - 1, -1, -1):
+            yield ONE if (value >> shift) & 1 else ZERO
+
+    def _shift(self, index: int) -> int:
+        """Return the distance from bit `index` to the least significant bit."""
+        if index < 0:
+            index += self._width
+        if not 0 <= index < self._width:
+            raise IndexError("bitstring index out of range")
+        return self._width - 1 - index
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Bit, "BitString"]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._width)
+            if step == 1:
+                width = max(0, stop - start)
+                return BitString._new((self._value >> (self._width - start - width)) & ((1 << width) - 1), width)
+            return BitString.from_bits(self[i] for i in range(start, stop, step))
+        return ONE if (self._value >> self._shift(index)) & 1 else ZERO
+
+    def __setitem__(self, index: Union[int, slice], bit: Union[Bit, "BitString"]) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._width)
+            positions = range(start, stop, step)
+            assert len(positions) == len(bit)
+            if step == 1 and len(positions):
+                shift = self._width - stop
+                mask = ((1 << len(positions)) - 1) << shift
+                self._value = (self._value & ~mask) | (int(bit) << shift)
+                return
+            for i, b in zip(positions, bit):
+                self[i] = b
+            return
+        shift = self._shift(index)
+        if bit:
+            self._value |= 1 << shift
+        else:
+            self._value &= ~(1 << shift)
 
     def __eq__(self, bitstring: Self) -> bool:
-        return all(b1 == b2 for b1, b2 in zip(self._bits, bitstring._bits))
+        if isinstance(bitstring, BitString):
+            return self._width == bitstring._width and self._value == bitstring._value
+        return False
 
     def __repr__(self):
         return f"BitString({self.bits})"
@@ -69,9 +201,17 @@ class BitString():
 class Byte(BitString):
     """Eight bits of information."""
 
-    def __init__(self, bits: int) -> None:
+    __slots__ = ()
+
+    def __init__(self, bits: str) -> None:
         super().__init__(bits)
         assert len(bits) == 8
 
+    @classmethod
+    def from_int(cls, value: int, width: int = 8) -> Self:
+        """Create a byte holding the unsigned integer `value`."""
+        assert width == 8
+        return super().from_int(value, width)
+
     def __repr__(self):
         return f"Byte({self.bits})"
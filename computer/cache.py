@@ -0,0 +1,332 @@
+"""Set-associative caches
+
+A `Cache` sits in front of any word addressed memory with the interface of an `SRAM`, e.g. an `SRAM`, a
+`ShardedSRAM` or another `Cache`, and has that same interface itself. Words are kept in lines of `line_size`
+consecutive words, and every address maps to one set of `associativity` lines. Hits are served from the lines held
+by the cache without touching the memory behind it. Misses fill a whole line with one `read_block` of the memory,
+which e.g. a packed `SRAM` serves in bulk instead of word by word through its latches.
+
+Caches are stacked into a hierarchy by putting one in front of the other, see `cache_hierarchy`.
+
+```
+l1, l2 = cache_hierarchy(SRAM(8, 16, 8, storage="packed"), (L1, L2))
+cpu = CPU(l1)
+cpu.run()
+print(l1.stats, l2.stats)
+```
+
+https://en.wikipedia.org/wiki/Cache_placement_policies#Set-associative_cache
+https://en.wikipedia.org/wiki/Cache_replacement_policies
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from computer.bits_and_bytes import Bit, BitString, Byte
+
+
+class LRU():
+    def __init__(self, ways: int) -> None:
+        """Least recently used replacement of the `ways` lines of a set."""
+        self.order = list(range(ways))  # least recently used first
+
+    def access(self, way: int) -> None:
+        self.order.remove(way)
+        self.order.append(way)
+
+    def insert(self, way: int) -> None:
+        self.access(way)
+
+    def victim(self) -> int:
+        return self.order[0]
+
+
+class PLRU():
+    def __init__(self, ways: int) -> None:
+        """Tree pseudo least recently used replacement of the `ways` lines of a set.
+
+        A binary tree of `ways - 1` bits points from the root towards the line to replace next. An access flips the
+        bits on the path to its line to point away from it, so one bit per node approximates the recency order.
+        """
+        assert ways > 0 and ways & (ways - 1) == 0, "Tree PLRU needs a power of two ways"
+        self.levels = ways.bit_length() - 1
+        self.tree = [0] * (ways - 1)
+
+    def access(self, way: int) -> None:
+        node = 0
+        for level in reversed(range(self.levels)):
+            direction = (way >> level) & 1
+            self.tree[node] = 1 - direction
+            node = 2 * node + 1 + direction
+
+    def insert(self, way: int) -> None:
+        self.access(way)
+
+    def victim(self) -> int:
+        node, way = 0, 0
+        for _ in range(self.levels):
+            direction = self.tree[node]
+            way = 2 * way + direction
+            node = 2 * node + 1 + direction
+        return way
+
+
+class FIFO():
+    def __init__(self, ways: int) -> None:
+        """First in first out replacement of the `ways` lines of a set, regardless of how they are accessed."""
+        self.order = list(range(ways))  # oldest first
+
+    def access(self, way: int) -> None:
+        pass
+
+    def insert(self, way: int) -> None:
+        self.order.remove(way)
+        self.order.append(way)
+
+    def victim(self) -> int:
+        return self.order[0]
+
+
+REPLACEMENT_POLICIES = dict(lru=LRU, plru=PLRU, fifo=FIFO)
+WRITE_POLICIES = ("write-back", "write-through")
+
+
+class CacheConfig(NamedTuple):
+    size: int = 64
+    line_size: int = 4
+    associativity: int = 2
+    replacement: str = "lru"
+    write_policy: str = "write-back"
+
+
+L1 = CacheConfig(size=64, line_size=4, associativity=2)
+L2 = CacheConfig(size=256, line_size=8, associativity=4)
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    write_backs: int
+
+    @property
+    def accesses(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.accesses if self.accesses else 0.0
+
+
+class Cache():
+    def __init__(
+        self,
+        memory: Any,
+        size: int = 64,
+        line_size: int = 4,
+        associativity: int = 2,
+        replacement: str = "lru",
+        write_policy: str = "write-back",
+    ) -> None:
+        """A set-associative cache of `size` words in front of `memory`.
+
+        The cache reads and writes like the memory it wraps. Writes to the memory that bypass the cache are not seen
+        by it, so all accesses should go through the cache, and a write-back cache must be `flush`ed before the memory
+        is read directly.
+
+        Args:
+            memory (Any): The memory behind the cache, with `read`, `write`, `n_registers` and `n_addresses` like an
+                `SRAM`. Lines are transferred with `read_block` and `write_block` if the memory has them.
+            size (int): Number of words the cache holds.
+            line_size (int): Number of consecutive words in a line, the unit of transfer to and from the memory.
+            associativity (int): Number of lines in a set, i.e. the places a line can go. A single set of all lines
+                is a fully associative cache and one line per set a direct mapped cache.
+            replacement (str): Policy to select the line of a full set to evict, one of `REPLACEMENT_POLICIES`.
+            write_policy (str): With "write-back" a write only goes to the line, which is written to the memory when
+                it is evicted. With "write-through" every write also goes to the memory, and a write miss does not
+                bring the line into the cache.
+        """
+        assert size % (line_size * associativity) == 0, "The size must be a whole number of sets"
+        assert memory.n_addresses % line_size == 0, "The memory must be a whole number of lines"
+        assert replacement in REPLACEMENT_POLICIES, f"Unknown replacement {replacement!r}"
+        assert write_policy in WRITE_POLICIES, f"Unknown write policy {write_policy!r}"
+        self.memory = memory
+        self.size = size
+        self.line_size = line_size
+        self.associativity = associativity
+        self.replacement = replacement
+        self.write_policy = write_policy
+        self.n_sets = size // (line_size * associativity)
+        self.n_registers = memory.n_registers
+        self.observers: List[Callable[[int, int], None]] = []
+        self._word_type = Byte if self.n_registers == 8 else BitString
+        self._bulk = hasattr(memory, "read_block") and self.n_registers % 8 == 0
+        self.invalidate()
+        self.reset_stats()
+
+    @property
+    def n_addresses(self) -> int:
+        return self.memory.n_addresses
+
+    @property
+    def word_bytes(self) -> int:
+        assert self.n_registers % 8 == 0, "Block transfers need words of whole bytes"
+        return self.n_registers // 8
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, self.write_backs)
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.write_backs = 0
+
+    def invalidate(self) -> None:
+        """Drop all lines without writing them back."""
+        self._tags: List[Dict[int, int]] = [dict() for _ in range(self.n_sets)]  # tag to way, per set
+        self._lines: List[List[Optional[List[int]]]] = [[None] * self.associativity for _ in range(self.n_sets)]
+        self._dirty: List[List[bool]] = [[False] * self.associativity for _ in range(self.n_sets)]
+        self._policies = [REPLACEMENT_POLICIES[self.replacement](self.associativity) for _ in range(self.n_sets)]
+
+    def _locate(self, address: Union[int, BitString]) -> Tuple[int, int, int]:
+        """Return the set, tag and offset in the line of an address given as an integer, `Byte` or `BitString`."""
+        address = int(address)
+        assert 0 <= address < self.n_addresses, f"Address {address} is outside of the memory"
+        line, offset = divmod(address, self.line_size)
+        index, tag = line % self.n_sets, line // self.n_sets
+        return index, tag, offset
+
+    def _fetch(self, address: int) -> List[int]:
+        """Read the line from `address` onwards from the memory as integers."""
+        if self._bulk:
+            data, size = self.memory.read_block(address, self.line_size, Bit(1)), self.word_bytes
+            return [int.from_bytes(data[i : i + size], "big") for i in range(0, len(data), size)]
+        return [int(self.memory.read(address + i, Bit(1))) for i in range(self.line_size)]
+
+    def _store(self, address: int, words: Sequence[int]) -> None:
+        """Write the integer words of a line to the memory from `address` onwards."""
+        if self._bulk:
+            self.memory.write_block(address, b"".join(word.to_bytes(self.word_bytes, "big") for word in words))
+            return
+        for i, word in enumerate(words):
+            self.memory.write(address + i, self._word_type._new(word, self.n_registers), Bit(1))
+
+    def _line(self, index: int, tag: int, allocate: bool = True) -> Optional[List[int]]:
+        """Return the words of the line with `tag` in set `index`, filling it on a miss unless not `allocate`."""
+        way = self._tags[index].get(tag)
+        if way is not None:
+            self.hits += 1
+            self._policies[index].access(way)
+            return self._lines[index][way]
+        self.misses += 1
+        if not allocate:
+            return None
+        way = self._evict(index)
+        line = self._fetch((tag * self.n_sets + index) * self.line_size)
+        self._tags[index][tag] = way
+        self._lines[index][way] = line
+        self._policies[index].insert(way)
+        return line
+
+    def _evict(self, index: int) -> int:
+        """Free a way of set `index`, writing back its line if it is dirty, and return it."""
+        lines = self._lines[index]
+        if None in lines:
+            return lines.index(None)
+        way = self._policies[index].victim()
+        tag = next(tag for tag, held in self._tags[index].items() if held == way)
+        self.evictions += 1
+        if self._dirty[index][way]:
+            self.write_backs += 1
+            self._store((tag * self.n_sets + index) * self.line_size, lines[way])
+            self._dirty[index][way] = False
+        del self._tags[index][tag]
+        lines[way] = None
+        return way
+
+    def read(self, address: Union[int, BitString], read_enable: Bit) -> BitString:
+        """Read the `n_registers` bit word at `address`, all zeros unless `read_enable` is on."""
+        if not read_enable:
+            return self._word_type._new(0, self.n_registers)
+        index, tag, offset = self._locate(address)
+        return self._word_type._new(self._line(index, tag)[offset], self.n_registers)
+
+    def write(self, address: Union[int, BitString], data: BitString, write_enable: Bit) -> None:
+        """Write the `n_registers` bit word `data` to `address` if `write_enable` is on."""
+        assert len(data) == self.n_registers
+        if not write_enable:
+            return
+        index, tag, offset = self._locate(address)
+        through = self.write_policy == "write-through"
+        line = self._line(index, tag, allocate=not through)
+        if line is not None:
+            line[offset] = int(data)
+            self._dirty[index][self._tags[index][tag]] = not through
+        if through:
+            self.memory.write(int(address), data, write_enable)
+        for observer in self.observers:
+            observer(int(address), 1)
+
+    def read_block(self, address: int, count: int, read_enable: Bit = Bit(1)) -> bytes:
+        """Read the `count` words from `address` onwards as bytes, `n_registers / 8` big-endian bytes per word."""
+        assert 0 <= address and address + count <= self.n_addresses
+        if not read_enable:
+            return bytes(count * self.word_bytes)
+        words = []
+        while count > 0:
+            index, tag, offset = self._locate(address)
+            taken = min(count, self.line_size - offset)
+            words += self._line(index, tag)[offset : offset + taken]
+            address, count = address + taken, count - taken
+        return b"".join(word.to_bytes(self.word_bytes, "big") for word in words)
+
+    def write_block(self, address: int, data: Union[bytes, bytearray, memoryview], write_enable: Bit = Bit(1)) -> None:
+        """Write the words in `data` to `address` onwards, `n_registers / 8` big-endian bytes per word."""
+        assert len(data) % self.word_bytes == 0
+        count = len(data) // self.word_bytes
+        assert 0 <= address and address + count <= self.n_addresses
+        if not write_enable:
+            return
+        size, data = self.word_bytes, bytes(data)
+        words = [int.from_bytes(data[i : i + size], "big") for i in range(0, len(data), size)]
+        through = self.write_policy == "write-through"
+        start, written = address, 0
+        while written < count:
+            index, tag, offset = self._locate(start + written)
+            taken = min(count - written, self.line_size - offset)
+            line = self._line(index, tag, allocate=not through)
+            if line is not None:
+                line[offset : offset + taken] = words[written : written + taken]
+                self._dirty[index][self._tags[index][tag]] = not through
+            written += taken
+        if through:
+            self.memory.write_block(address, data, write_enable)
+        for observer in self.observers:
+            observer(address, count)
+
+    def flush(self) -> None:
+        """Write all dirty lines back to the memory, and flush the memory too if it is a cache."""
+        for index in range(self.n_sets):
+            for tag, way in self._tags[index].items():
+                if self._dirty[index][way]:
+                    self.write_backs += 1
+                    self._store((tag * self.n_sets + index) * self.line_size, self._lines[index][way])
+                    self._dirty[index][way] = False
+        if hasattr(self.memory, "flush"):
+            self.memory.flush()
+
+    def __repr__(self):
+        return (
+            f"Cache(size={self.size}, line_size={self.line_size}, associativity={self.associativity}, "
+            f"replacement={self.replacement!r}, write_policy={self.write_policy!r})"
+        )
+
+
+def cache_hierarchy(memory: Any, configs: Sequence[CacheConfig] = (L1, L2)) -> List[Cache]:
+    """Put a cache per config in front of `memory`, the last one closest to it, and return them from L1 onwards."""
+    caches: List[Cache] = []
+    for config in reversed(configs):
+        memory = Cache(memory, *config)
+        caches.insert(0, memory)
+    return caches
@@ -0,0 +1,310 @@
+"""Clocked simulation of synchronous components
+
+A `Clock` drives registered components on its rising and falling edges. Components of the same type are stepped
+together: at every edge each type evaluates the next state of all of its components in one batched operation, and
+only then do all types commit their new states. Every component therefore sees the state of the others from before
+the edge, like flip-flops that all sample their inputs at the same instant, regardless of the order they registered.
+
+```
+clock = Clock()
+stages = [clock.register(ClockedRegister(8)) for _ in range(4)]
+for previous, stage in zip(stages, stages[1:]):
+    stage.connect(previous)
+stages[0].drive(42)
+stats = clock.run(1000)
+print(stats.cycles_per_second)
+```
+
+https://www.youtube.com/watch?v=FZGugFqdr60&list=PL8dPuuaLjXtNlUrzyH5r6jN9ulIgZBpdo&index=10
+"""
+
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from typing_extensions import Self
+
+from computer.bits_and_bytes import Bit, BitString, Byte
+from computer.gates import AND, NOT, OR
+
+
+EDGES = ("rising", "falling")
+
+
+def _commit_each(edge: str, components: Sequence[Any], state: Any) -> None:
+    """Step every component on its own with its `rising` or `falling` method."""
+    for component in components:
+        getattr(component, edge)()
+
+
+class Component():
+    """A component driven by the edges of a `Clock`, stepped together with all components of its type.
+
+    A subclass either implements `rising` and `falling` to step a single component, or overrides `evaluate` and
+    `commit` to step all of its components at once: `evaluate` computes their next state from the current state of the
+    system and `commit` stores it after all types have evaluated theirs. Both receive the components as returned by
+    `group`, which can override it to keep their state in a structure that is cheaper to step.
+    """
+
+    @classmethod
+    def group(cls, edge: str, components: List[Self]) -> Any:
+        """Return the `components` stepped on `edge` as `evaluate` and `commit` take them, once per schedule."""
+        return components
+
+    @classmethod
+    def evaluate(cls, edge: str, components: Sequence[Self]) -> Any:
+        """Return the next state of the `components` at the `edge`."""
+        return None
+
+    @classmethod
+    def commit(cls, edge: str, components: Sequence[Self], state: Any) -> None:
+        """Store the next `state` of the `components` that `evaluate` returned."""
+        _commit_each(edge, components, state)
+
+    def rising(self) -> None:
+        pass
+
+    def falling(self) -> None:
+        pass
+
+
+def gated_latches(value: Any, data: Any, enable: Any) -> Any:
+    """Return the new value of a word of gated latches holding `value` with `data` on their inputs.
+
+    `enable` has every bit set whose latch is write enabled. The words can be integers, whose bits are evaluated in
+    parallel, or arrays of those, which evaluate a whole batch of words at once.
+    """
+    set_bits = AND(data, enable)
+    reset_bits = AND(NOT(data), enable)
+    return AND(OR(set_bits, value), NOT(reset_bits))
+
+
+class RegisterBank():
+    def __init__(self, registers: Sequence["ClockedRegister"]) -> None:
+        """The state of a group of `ClockedRegister`s in NumPy arrays, so that a clock edge steps them all at once.
+
+        `state` holds the values of the registers followed by the data driven on their inputs, and `sources` the index
+        in `state` of the input of each register: the value of the register it is connected to, or its own data. The
+        registers read and write their state here from now on. The words are `uint64` if they fit and else Python
+        integers in arrays of objects.
+        """
+        n = len(registers)
+        dtype = np.uint64 if max(register.width for register in registers) <= 64 else object
+        self.registers = list(registers)
+        self.slots = {id(register): slot for slot, register in enumerate(registers)}
+        self.state = np.zeros(2 * n, dtype=dtype)
+        self.values, self.data = self.state[:n], self.state[n:]
+        self.enables = np.zeros(n, dtype=dtype)
+        self.sources = np.arange(n, 2 * n)
+        self.external: Dict[int, "ClockedRegister"] = dict()  # sources outside of the bank, by slot
+        for slot, register in enumerate(self.registers):
+            value, data, write_enable, source = register.value, register.data, register.write_enable, register.source
+            register._bank, register._slot = self, slot
+            register.value, register.data, register.write_enable, register.source = value, data, write_enable, source
+
+    def connect(self, slot: int, source: Optional["ClockedRegister"]) -> None:
+        """Take the input of the register in `slot` from `source`, or from its own data if it is None."""
+        self.external.pop(slot, None)
+        if source is not None and id(source) in self.slots:
+            self.sources[slot] = self.slots[id(source)]
+            return
+        self.sources[slot] = len(self.registers) + slot
+        if source is not None:
+            self.external[slot] = source
+
+    def evaluate(self) -> np.ndarray:
+        """Return the values of the registers after the next rising edge."""
+        inputs = self.state[self.sources]
+        for slot, source in self.external.items():
+            inputs[slot] = source.value
+        return gated_latches(self.values, inputs, self.enables)
+
+    def __len__(self) -> int:
+        return len(self.registers)
+
+
+class ClockedRegister(Component):
+    def __init__(self, width: int = 8, source: Optional["ClockedRegister"] = None) -> None:
+        """A `width` bit register of gated latches that stores its input on the rising edge of the clock.
+
+        The input is either driven with `drive` or connected to the output of another register with `connect`, e.g.
+        to build shift registers and pipelines. The registers of a clock keep their state in a `RegisterBank` and are
+        stepped together with the latch logic evaluated bit-parallel on arrays of their values. A register is
+        therefore stepped by one clock at a time.
+        """
+        self.width = width
+        self.mask = (1 << width) - 1
+        self._bank: Optional[RegisterBank] = None
+        self._slot = 0
+        self.value = 0
+        self.data = 0
+        self.write_enable = Bit(1)
+        self.source = source
+
+    @property
+    def value(self) -> int:
+        return self._value if self._bank is None else int(self._bank.values[self._slot])
+
+    @value.setter
+    def value(self, value: int) -> None:
+        if self._bank is None:
+            self._value = value
+        else:
+            self._bank.values[self._slot] = value
+
+    @property
+    def data(self) -> int:
+        return self._data if self._bank is None else int(self._bank.data[self._slot])
+
+    @data.setter
+    def data(self, data: int) -> None:
+        if self._bank is None:
+            self._data = data
+        else:
+            self._bank.data[self._slot] = data
+
+    @property
+    def write_enable(self) -> Bit:
+        return self._write_enable
+
+    @write_enable.setter
+    def write_enable(self, write_enable: Bit) -> None:
+        self._write_enable = write_enable
+        if self._bank is not None:
+            self._bank.enables[self._slot] = self.mask if write_enable else 0
+
+    @property
+    def source(self) -> Optional["ClockedRegister"]:
+        return self._source
+
+    @source.setter
+    def source(self, source: Optional["ClockedRegister"]) -> None:
+        self._source = source
+        if self._bank is not None:
+            self._bank.connect(self._slot, source)
+
+    def drive(self, data: Union[int, BitString], write_enable: Bit = Bit(1)) -> None:
+        """Drive the input of the register with `data` and `write_enable`, disconnecting it from its source."""
+        assert not isinstance(data, BitString) or len(data) == self.width
+        self.data = int(data) & self.mask
+        self.write_enable = write_enable
+        self.source = None
+
+    def connect(self, source: "ClockedRegister") -> None:
+        """Connect the input of the register to the output of `source`."""
+        assert source.width == self.width
+        self.source = source
+
+    def read(self) -> BitString:
+        word_type = Byte if self.width == 8 else BitString
+        return word_type._new(self.value, self.width)
+
+    @classmethod
+    def group(cls, edge: str, registers: List["ClockedRegister"]) -> Union[RegisterBank, List["ClockedRegister"]]:
+        return RegisterBank(registers) if edge == "rising" else registers
+
+    @classmethod
+    def evaluate(cls, edge: str, bank: RegisterBank) -> Optional[np.ndarray]:
+        return bank.evaluate() if edge == "rising" else None
+
+    @classmethod
+    def commit(cls, edge: str, bank: RegisterBank, state: Optional[np.ndarray]) -> None:
+        if state is not None:
+            bank.values[:] = state
+
+    def __repr__(self):
+        return f"ClockedRegister({self.read()})"
+
+
+class ClockStats(NamedTuple):
+    cycles: int
+    seconds: float
+
+    @property
+    def cycles_per_second(self) -> float:
+        """Simulated clock cycles per second of wall time."""
+        return self.cycles / self.seconds if self.seconds else 0.0
+
+
+class Clock():
+    def __init__(self) -> None:
+        """A clock that drives the registered components on its rising and falling edges.
+
+        A cycle is a rising edge followed by a falling edge. At each edge the components are stepped one type at a
+        time, see `Component`. Components that are not a `Component` are stepped on their own by calling their
+        `rising` or `falling` method, after all types that evaluate their next state first have done so.
+        """
+        self.cycle = 0
+        self._groups: Dict[str, Dict[type, List[Any]]] = {edge: defaultdict(list) for edge in EDGES}
+        self._schedule: Optional[Dict[str, List[Tuple[Callable, Callable, Any]]]] = None
+
+    def register(self, component: Any, edges: Iterable[str] = ("rising",)) -> Any:
+        """Drive `component` on the given `edges` of the clock and return it."""
+        for edge in edges:
+            assert edge in EDGES, f"Unknown edge {edge!r}, expected one of {EDGES}"
+            assert isinstance(component, Component) or hasattr(component, edge), f"{component!r} has no {edge}"
+            self._groups[edge][type(component)].append(component)
+        self._schedule = None
+        return component
+
+    def unregister(self, component: Any) -> None:
+        """Stop driving `component`."""
+        for groups in self._groups.values():
+            group = groups.get(type(component), [])
+            if component in group:
+                group.remove(component)
+        self._schedule = None
+
+    @property
+    def components(self) -> int:
+        groups = [group for groups in self._groups.values() for group in groups.values()]
+        return len({id(component) for group in groups for component in group})
+
+    def schedule(self) -> Dict[str, List[Tuple[Callable, Callable, Any]]]:
+        """Return the evaluate and commit functions and the grouped components of every type, per edge."""
+        if self._schedule is None:
+            self._schedule = dict()
+            for edge, groups in self._groups.items():
+                groups = [(kind, group) for kind, group in groups.items() if group]
+                batched = [
+                    (kind.evaluate, kind.commit, kind.group(edge, list(group)))
+                    for kind, group in groups
+                    if issubclass(kind, Component)
+                ]
+                single = [(None, _commit_each, group) for kind, group in groups if not issubclass(kind, Component)]
+                self._schedule[edge] = batched + single
+        return self._schedule
+
+    @staticmethod
+    def _step(edge: str, steps: List[Tuple[Callable, Callable, Any]]) -> None:
+        """Evaluate the next state of every type of components, then commit them all."""
+        states = [evaluate(edge, group) if evaluate is not None else None for evaluate, _, group in steps]
+        for (_, commit, group), state in zip(steps, states):
+            commit(edge, group, state)
+
+    def edge(self, edge: str) -> None:
+        """Step all components driven on `edge`."""
+        self._step(edge, self.schedule()[edge])
+
+    def tick(self) -> None:
+        """Run one clock cycle."""
+        self.edge("rising")
+        self.edge("falling")
+        self.cycle += 1
+
+    def run(self, cycles: int) -> ClockStats:
+        """Run `cycles` clock cycles and return how long they took."""
+        schedule = self.schedule()
+        edges = [(edge, schedule[edge]) for edge in EDGES if schedule[edge]]
+        step = self._step
+        start = time.perf_counter()
+        for _ in range(cycles):
+            for edge, steps in edges:
+                step(edge, steps)
+        seconds = time.perf_counter() - start
+        self.cycle += cycles
+        return ClockStats(cycles, seconds)
+
+    def __repr__(self):
+        return f"Clock(cycle={self.cycle}, components={self.components})"
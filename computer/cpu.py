@@ -0,0 +1,502 @@
+"""Central processing unit
+
+https://www.youtube.com/watch?v=FZGugFqdr60&list=PL8dPuuaLjXtNlUrzyH5r6jN9ulIgZBpdo&index=8
+
+An 8-bit CPU with four general purpose registers A, B, C and D, a program counter and the flags of the last ALU
+operation. Programs and data share a memory of 256 bytes.
+
+Every instruction starts with a byte holding a 4-bit op code and two 2-bit register fields `r` and `s`. Instructions
+that take an address or an immediate value are followed by a second byte holding it.
+
+    op code  instruction     operation
+    0000     HALT            stop the CPU
+    0001     LOAD r addr     r = memory[addr]
+    0010     STORE r addr    memory[addr] = r
+    0011     LOADI r value   r = value
+    0100     ADD r s         r = r + s
+    0101     SUB r s         r = r - s
+    0110     MUL r s         r = r * s
+    0111     DIV r s         r = r / s
+    1000     NEG r           r = -r
+    1001     INC r           r = r + 1
+    1010     DEC r           r = r - 1
+    1011     MOV r s         r = s
+    1100     CMP r s         set the flags of r - s
+    1101     JUMP addr       jump to addr, JZ, JNEG and JNZ on the flags (the condition is held in the `r` field)
+    1110     LOADX r s       r = memory[s]
+    1111     STOREX r s      memory[s] = r
+
+The arithmetic is done by a gate-level `ALU8Bit` which also sets the flags, and the registers are `LinearRegister`s.
+
+With `translate=True` the CPU also translates basic blocks, i.e. runs of instructions that end in a jump, halt or
+store, into a single generated Python function once they are hot. Such a function keeps the registers in local
+variables, runs the ALU operations as compiled netlists and leaves the CPU in exactly the state, and with exactly the
+instruction and cycle counts, that interpreting the block would.
+"""
+
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Union
+
+from computer.alu import ALU8Bit, NEGATIVE, ZERO
+from computer.bits_and_bytes import Bit, Byte
+from computer.gates import NOT
+from computer.netlist import trace
+from computer.ram import SRAM, LinearRegister
+
+
+OP_CODES = dict(
+    HALT=0b0000,
+    LOAD=0b0001,
+    STORE=0b0010,
+    LOADI=0b0011,
+    ADD=0b0100,
+    SUB=0b0101,
+    MUL=0b0110,
+    DIV=0b0111,
+    NEG=0b1000,
+    INC=0b1001,
+    DEC=0b1010,
+    MOV=0b1011,
+    CMP=0b1100,
+    JUMP=0b1101,
+    LOADX=0b1110,
+    STOREX=0b1111,
+)
+OPERANDS = dict(
+    HALT="",
+    LOAD="ra",
+    STORE="ra",
+    LOADI="ra",
+    NEG="r",
+    INC="r",
+    DEC="r",
+    JUMP="a",
+)  # "r" and "s" are registers and "a" the second byte, all others are "rs"
+ALU_OPERATIONS = dict(
+    ADD="add",
+    SUB="subtact",
+    MUL="multiply",
+    DIV="divide",
+    NEG="negate",
+    INC="increment",
+    DEC="decrement",
+    CMP="subtact",
+)
+JUMP_CONDITIONS = dict(JUMP=0, JZ=1, JNEG=2, JNZ=3)
+REGISTERS = "ABCD"
+MEMORY_ACCESS = ("LOAD", "STORE", "LOADX", "STOREX")
+BLOCK_ENDS = ("HALT", "JUMP", "STORE", "STOREX")  # stores end a block as they may modify the code that follows
+MAX_BLOCK_LENGTH = 32
+FLAG_NAMES = tuple(ALU8Bit.FLAGS)
+
+
+class Instruction(NamedTuple):
+    """A decoded instruction."""
+
+    name: str
+    register: int
+    source: int
+    operand: int
+    size: int
+    cycles: int
+
+    def __str__(self) -> str:
+        if self.name == "JUMP":
+            name = list(JUMP_CONDITIONS)[self.register]
+            return f"{name} {self.operand}"
+        operands = OPERANDS.get(self.name, "rs")
+        values = dict(r=REGISTERS[self.register], s=REGISTERS[self.source], a=str(self.operand))
+        return " ".join([self.name] + [values[kind] for kind in operands])
+
+
+def decode(first: int, second: int = 0) -> Instruction:
+    """Decode the instruction starting with the byte `first`, followed by the byte `second`.
+
+    An instruction takes one clock cycle per byte to fetch, one to execute and one more if it accesses memory.
+    """
+    name = list(OP_CODES)[first >> 4]
+    size = 2 if "a" in OPERANDS.get(name, "rs") else 1
+    cycles = size + 1 + (name in MEMORY_ACCESS)
+    return Instruction(name, (first >> 2) & 0b11, first & 0b11, second if size == 2 else 0, size, cycles)
+
+
+def encode(name: str, *operands: Union[int, str]) -> bytes:
+    """Encode an instruction with register operands given by name ("A") or index and addresses or values as ints."""
+    condition = JUMP_CONDITIONS.get(name)
+    if condition is not None:
+        name, operands = "JUMP", (condition, *operands)
+        kinds = "ra"
+    else:
+        kinds = OPERANDS.get(name, "rs")
+    assert len(operands) == len(kinds), f"{name} takes {len(kinds)} operands"
+    fields = dict(r=0, s=0)
+    data = b""
+    for kind, operand in zip(kinds, operands):
+        if kind == "a":
+            assert 0 <= operand < 256
+            data = bytes([operand])
+        else:
+            fields[kind] = REGISTERS.index(operand) if isinstance(operand, str) else operand
+    return bytes([(OP_CODES[name] << 4) | (fields["r"] << 2) | fields["s"]]) + data
+
+
+def assemble(source: str) -> bytes:
+    """Assemble a program with one instruction per line into machine code.
+
+    Operands are separated by spaces or commas. A line `name:` defines a label that can be used as an address,
+    `DATA 1 2 3` places raw bytes and everything after a `;` is a comment.
+    """
+    lines = []
+    for line in source.splitlines():
+        line = line.split(";")[0].replace(",", " ").split()
+        if line:
+            lines.append(line)
+
+    # the first pass finds the address of every label, the second encodes the instructions
+    labels = dict()
+    for resolve in (False, True):
+        program = b""
+        for line in lines:
+            while line and line[0].endswith(":"):
+                labels[line[0][:-1]] = len(program)
+                line = line[1:]
+            if not line:
+                continue
+            name, *operands = line
+            values = []
+            for operand in operands:
+                if operand.upper() in REGISTERS:
+                    values.append(operand.upper())
+                elif operand[0].isdigit():
+                    values.append(int(operand, 0))
+                elif operand in labels or not resolve:
+                    values.append(labels.get(operand, 0))
+                else:
+                    raise ValueError(f"Unknown label {operand!r}")
+            if name.upper() == "DATA":
+                program += bytes(values)
+            else:
+                program += encode(name.upper(), *values)
+    return program
+
+
+class Block(NamedTuple):
+    """A basic block translated into a single function that runs it and returns the address of the next one."""
+
+    start: int
+    size: int
+    instructions: int
+    cycles: int
+    function: Callable[["CPU"], int]
+    source: str
+
+
+class CPUStats(NamedTuple):
+    instructions: int
+    cycles: int
+    seconds: float
+
+    @property
+    def cpi(self) -> float:
+        """Clock cycles per instruction."""
+        return self.cycles / self.instructions if self.instructions else 0.0
+
+    @property
+    def ips(self) -> float:
+        """Simulated instructions per second of wall time."""
+        return self.instructions / self.seconds if self.seconds else 0.0
+
+
+class CPU():
+    def __init__(
+        self,
+        memory: Optional[SRAM] = None,
+        alu: Optional[ALU8Bit] = None,
+        cache: bool = True,
+        translate: bool = False,
+        hot_threshold: int = 2,
+    ) -> None:
+        """An 8-bit CPU running a fetch-decode-execute cycle on a `memory` of 256 bytes.
+
+        Args:
+            memory (SRAM): Memory holding the program and its data. Any memory with the `read` and `write` interface
+                of `SRAM` for 8-bit words and 8-bit addresses works. Defaults to a packed `SRAM`.
+            alu (ALU8Bit): ALU doing the arithmetic. Defaults to an 8-bit `ALU8Bit`.
+            cache (bool): Keep decoded instructions by address so that instructions that run again, e.g. in a loop,
+                are not fetched and decoded again. A write to memory drops the instructions it overlaps.
+            translate (bool): Translate basic blocks into Python functions once they are entered `hot_threshold`
+                times, see `translate_block`. Switch it off to compare with pure interpretation.
+            hot_threshold (int): Number of times a block is interpreted before it is translated.
+
+        Writes to memory drop the decoded instructions and translated blocks they overlap. Writes that bypass the CPU
+        are seen too if the memory has `observers` like `SRAM`.
+        """
+        self.memory = SRAM(n_registers=8, register_width=16, storage="packed") if memory is None else memory
+        self.alu = ALU8Bit() if alu is None else alu
+        self.cache = cache
+        self.registers = [LinearRegister(8) for _ in REGISTERS]
+        self.program_counter = LinearRegister(8)
+        self.flags = {name: Bit(0) for name in ALU8Bit.FLAGS}
+        self.halted = False
+        self.instructions = 0
+        self.cycles = 0
+        self.seconds = 0.0
+        self.decodes = 0
+        self.translate = translate
+        self.hot_threshold = hot_threshold
+        self.translations = 0
+        self._decoded: Dict[int, Instruction] = dict()
+        self._blocks: Dict[int, Block] = dict()
+        self._block_starts: Dict[int, Set[int]] = dict()  # the blocks holding each byte address
+        self._heat: Dict[int, int] = dict()
+        self._operations: Dict[str, Callable] = dict()
+        self._observed = hasattr(self.memory, "observers")
+        if self._observed:
+            self.memory.observers.append(self._memory_written)
+        self._dispatch: List[Callable[[Instruction], Optional[int]]] = [
+            getattr(self, "_" + name.lower()) if name not in ALU_OPERATIONS else self._alu for name in OP_CODES
+        ]
+
+    def load(self, program: Union[bytes, Sequence[int]], address: int = 0) -> None:
+        """Write a `program` (or data) into memory from `address` onwards."""
+        for i, value in enumerate(program):
+            self.write(address + i, value)
+
+    def read(self, address: int) -> Byte:
+        return self.memory.read(address, Bit(1))
+
+    def write(self, address: int, value: Union[int, Byte]) -> None:
+        """Write a byte to memory and drop the decoded instructions that contain it."""
+        self.memory.write(address, Byte.from_int(value) if isinstance(value, int) else value, Bit(1))
+        if not self._observed:
+            self.invalidate(address)
+
+    def _memory_written(self, address: int, count: int) -> None:
+        for i in range(address, address + count):
+            self.invalidate(i)
+
+    def invalidate(self, address: int) -> None:
+        """Drop the decoded instructions that start at `address` or hold their second byte there and the translated
+        blocks that contain `address`."""
+        self._decoded.pop(address, None)
+        self._decoded.pop((address - 1) % 256, None)
+        for start in self._block_starts.pop(address, ()):
+            block = self._blocks.pop(start, None)
+            if block is not None:
+                for i in range(start, start + block.size):
+                    self._block_starts.get(i % 256, set()).discard(start)
+
+    @property
+    def pc(self) -> int:
+        return int(self.program_counter.read())
+
+    @pc.setter
+    def pc(self, address: int) -> None:
+        self.program_counter.write(Byte.from_int(address % 256), Bit(1))
+
+    def register(self, name: Union[str, int]) -> Byte:
+        return self.registers[REGISTERS.index(name) if isinstance(name, str) else name].read()
+
+    def fetch(self, address: int) -> Instruction:
+        """Fetch and decode the instruction at `address`, or take it from the cache of decoded instructions."""
+        instruction = self._decoded.get(address)
+        if instruction is None:
+            first = int(self.read(address))
+            second = int(self.read((address + 1) % 256)) if "a" in OPERANDS.get(list(OP_CODES)[first >> 4], "rs") else 0
+            instruction = decode(first, second)
+            self.decodes += 1
+            if self.cache:
+                self._decoded[address] = instruction
+        return instruction
+
+    def step(self) -> Instruction:
+        """Run a single fetch-decode-execute cycle and return the executed instruction."""
+        address = self.pc
+        instruction = self.fetch(address)
+        target = self._dispatch[OP_CODES[instruction.name]](instruction)
+        self.pc = address + instruction.size if target is None else target
+        self.instructions += 1
+        self.cycles += instruction.cycles
+        return instruction
+
+    def run(self, max_instructions: Optional[int] = None) -> CPUStats:
+        """Run until the CPU halts or `max_instructions` have been executed and return the statistics of the run.
+
+        Translated blocks that would run past `max_instructions` are interpreted instead, so the run stops after
+        exactly the same instruction either way.
+        """
+        start = time.perf_counter()
+        instructions, cycles = self.instructions, self.cycles
+        while not self.halted and (max_instructions is None or self.instructions - instructions < max_instructions):
+            if not self.translate:
+                self.step()
+                continue
+            address = self.pc
+            block = self._blocks.get(address)
+            if block is None:
+                self._heat[address] = heat = self._heat.get(address, 0) + 1
+                if heat >= self.hot_threshold:
+                    block = self.translate_block(address)
+            remaining = None if max_instructions is None else max_instructions - (self.instructions - instructions)
+            if block is None or (remaining is not None and block.instructions > remaining):
+                self.step()
+                continue
+            self.pc = block.function(self)
+            self.instructions += block.instructions
+            self.cycles += block.cycles
+        seconds = time.perf_counter() - start
+        self.seconds += seconds
+        return CPUStats(self.instructions - instructions, self.cycles - cycles, seconds)
+
+    @property
+    def stats(self) -> CPUStats:
+        """The statistics of all instructions executed so far."""
+        return CPUStats(self.instructions, self.cycles, self.seconds)
+
+    def _compiled_operation(self, name: str) -> Callable:
+        """Return the ALU operation `name` compiled into a flat function returning the output and a flag tuple."""
+        if name not in self._operations:
+            operation, n_operands = self.alu._operation(self.alu.OP_CODES[name])
+
+            def circuit(*operands):
+                output, flags = operation(*operands)
+                return output, tuple(flags[flag] for flag in FLAG_NAMES)
+
+            circuit.__name__ = name
+            self._operations[name] = trace(circuit, *[self.alu.precision] * n_operands).compile(Byte)
+        return self._operations[name]
+
+    def translate_block(self, address: int) -> Block:
+        """Translate the basic block starting at `address` into a single Python function and cache it.
+
+        The block runs up to and including the first jump, halt or store, or `MAX_BLOCK_LENGTH` instructions. Its
+        function reads the registers it uses into local variables, runs the instructions without any dispatch,
+        writes back the registers and flags it changed and returns the address of the next instruction.
+        """
+        namespace = dict(_registers=self.registers, _read=self.read, _write=self.write, _ONE=Bit(1), _FLAGS=FLAG_NAMES)
+        prologue, body = [], []
+        defined, changed = set(), set()
+        flags_changed = False
+
+        def use(*registers):
+            for register in registers:
+                if register not in defined:
+                    prologue.append(f"r{register} = _registers[{register}].read()")
+                    defined.add(register)
+
+        def define(register):
+            defined.add(register)
+            changed.add(register)
+
+        def epilogue():
+            lines = [f"_registers[{register}].write(r{register}, _ONE)" for register in sorted(changed)]
+            if flags_changed:
+                lines.append("_cpu.flags = dict(zip(_FLAGS, f))")
+            return lines
+
+        def flag(name):
+            return f"f[{FLAG_NAMES.index(name)}]" if flags_changed else f"_cpu.flags[{name!r}]"
+
+        position, n_instructions, cycles = address, 0, 0
+        while True:
+            instruction = self.fetch(position % 256)
+            n_instructions += 1
+            cycles += instruction.cycles
+            position += instruction.size
+            name, r, s, operand = instruction.name, instruction.register, instruction.source, instruction.operand
+            next = position % 256
+            if name == "HALT":
+                body += epilogue() + ["_cpu.halted = True", f"return {(position - instruction.size) % 256}"]
+                break
+            elif name == "LOAD":
+                define(r)
+                body.append(f"r{r} = _read({operand})")
+            elif name == "STORE":
+                use(r)
+                body += [f"_write({operand}, r{r})"] + epilogue() + [f"return {next}"]
+                break
+            elif name == "LOADI":
+                namespace[f"_c{operand}"] = Byte.from_int(operand)
+                define(r)
+                body.append(f"r{r} = _c{operand}")
+            elif name == "MOV":
+                use(s)
+                define(r)
+                body.append(f"r{r} = r{s}")
+            elif name == "LOADX":
+                use(s)
+                define(r)
+                body.append(f"r{r} = _read(r{s}._value)")
+            elif name == "STOREX":
+                use(r, s)
+                body += [f"_write(r{s}._value, r{r})"] + epilogue() + [f"return {next}"]
+                break
+            elif name == "JUMP":
+                condition = ("True", flag(ZERO), flag(NEGATIVE), f"not {flag(ZERO)}")[r]
+                body += epilogue() + [f"return {operand} if {condition} else {next}"]
+                break
+            else:
+                operation = ALU_OPERATIONS[name]
+                namespace[f"_{operation}"] = self._compiled_operation(operation)
+                n_operands = OPERANDS.get(name, "rs").count("r") + OPERANDS.get(name, "rs").count("s")
+                operands = [r, s][:n_operands]
+                use(*operands)
+                arguments = ", ".join(f"r{register}" for register in operands)
+                if name == "CMP":
+                    body.append(f"_, f = _{operation}({arguments})")
+                else:
+                    define(r)
+                    body.append(f"r{r}, f = _{operation}({arguments})")
+                flags_changed = True
+            if n_instructions == MAX_BLOCK_LENGTH:
+                body += epilogue() + [f"return {next}"]
+                break
+
+        function_name = f"block_{address}"
+        source = f"def {function_name}(_cpu):\n" + "".join(f"    {line}\n" for line in prologue + body)
+        exec(compile(source, f"<block {address}>", "exec"), namespace)
+        block = Block(address, position - address, n_instructions, cycles, namespace[function_name], source)
+        self._blocks[address] = block
+        for i in range(address, position):
+            self._block_starts.setdefault(i % 256, set()).add(address)
+        self.translations += 1
+        return block
+
+    def _halt(self, instruction: Instruction) -> Optional[int]:
+        self.halted = True
+        return self.pc
+
+    def _load(self, instruction: Instruction) -> Optional[int]:
+        self.registers[instruction.register].write(self.read(instruction.operand), Bit(1))
+
+    def _store(self, instruction: Instruction) -> Optional[int]:
+        self.write(instruction.operand, self.registers[instruction.register].read())
+
+    def _loadi(self, instruction: Instruction) -> Optional[int]:
+        self.registers[instruction.register].write(Byte.from_int(instruction.operand), Bit(1))
+
+    def _mov(self, instruction: Instruction) -> Optional[int]:
+        self.registers[instruction.register].write(self.registers[instruction.source].read(), Bit(1))
+
+    def _loadx(self, instruction: Instruction) -> Optional[int]:
+        address = int(self.registers[instruction.source].read())
+        self.registers[instruction.register].write(self.read(address), Bit(1))
+
+    def _storex(self, instruction: Instruction) -> Optional[int]:
+        address = int(self.registers[instruction.source].read())
+        self.write(address, self.registers[instruction.register].read())
+
+    def _alu(self, instruction: Instruction) -> Optional[int]:
+        register = self.registers[instruction.register]
+        op_code = self.alu.OP_CODES[ALU_OPERATIONS[instruction.name]]
+        output, self.flags = self.alu(op_code, register.read(), self.registers[instruction.source].read())
+        if instruction.name != "CMP":
+            register.write(output, Bit(1))
+
+    def _jump(self, instruction: Instruction) -> Optional[int]:
+        condition = (Bit(1), self.flags[ZERO], self.flags[NEGATIVE], NOT(self.flags[ZERO]))[instruction.register]
+        return instruction.operand if condition else None
+
+    def __repr__(self):
+        registers = ", ".join(f"{name}={int(self.register(name))}" for name in REGISTERS)
+        return f"CPU(pc={self.pc}, {registers})"
@@ -0,0 +1,101 @@
+"""Division circuits
+
+Both dividers compute one quotient bit per step from the most significant bit down: the partial remainder is shifted
+left by one bit, the next bit of the dividend is shifted in, and the divisor is subtracted from it.
+
+- Restoring: if the subtraction borrows, the quotient bit is 0 and the partial remainder is restored by selecting the
+  value from before the subtraction.
+- Non-restoring: a negative partial remainder is kept and the divisor is added back in the next step instead of
+  subtracted, which saves the selection. A final correction step restores a negative remainder.
+
+Dividing by zero gives a quotient of all ones and the dividend as remainder, as the circuits do in hardware.
+
+https://en.wikipedia.org/wiki/Division_algorithm#Restoring_division
+https://en.wikipedia.org/wiki/Division_algorithm#Non-restoring_division
+"""
+
+from typing import Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+from computer.adders import ripple_carry_adder
+from computer.analysis import MeasuredCircuit
+from computer.batch import bitslice
+from computer.bits_and_bytes import Bit, BitString, Word
+from computer.configuration import PRECISION
+from computer.gates import AND, NOT, OR, XOR
+
+
+def _select(select: Bit, a: Word, b: Word) -> Word:
+    """Return `a` if `select` is on else `b`, bit by bit."""
+    not_select = NOT(select)
+    return Word(OR(AND(select, x), AND(not_select, y)) for x, y in zip(a, b))
+
+
+def restoring_divider(a: BitString, b: BitString) -> Tuple[BitString, BitString]:
+    """Divide the unsigned `n` bit string `a` by `b` and return the `n` bit quotient and remainder."""
+    assert len(a) == len(b)
+    n = len(a)
+    divisor = Word([Bit(0)] + list(b))
+    not_divisor = Word(NOT(bit) for bit in divisor)
+    remainder = Word([Bit(0)] * (n + 1))
+    quotient = []
+    for i in range(n):
+        remainder = Word(list(remainder[1:]) + [a[i]])
+        difference, no_borrow = ripple_carry_adder(remainder, not_divisor, Bit(1))
+        quotient.append(no_borrow)
+        remainder = _select(no_borrow, difference, remainder)
+    return type(a).from_bits(quotient), type(a).from_bits(remainder[1:])
+
+
+def non_restoring_divider(a: BitString, b: BitString) -> Tuple[BitString, BitString]:
+    """Divide the unsigned `n` bit string `a` by `b` and return the `n` bit quotient and remainder.
+
+    The partial remainder is a two's complement number of `n + 2` bits. Its sign bit selects whether the divisor is
+    added or subtracted through a row of XOR gates and the carry in of a single adder.
+    """
+    assert len(a) == len(b)
+    n = len(a)
+    divisor = Word([Bit(0), Bit(0)] + list(b))
+    remainder = Word([Bit(0)] * (n + 2))
+    quotient = []
+    for i in range(n):
+        negative = remainder[0]
+        subtract = NOT(negative)
+        remainder = Word(list(remainder[1:]) + [a[i]])
+        remainder, _ = ripple_carry_adder(remainder, Word(XOR(bit, subtract) for bit in divisor), subtract)
+        quotient.append(NOT(remainder[0]))
+    correction = Word(AND(bit, remainder[0]) for bit in divisor)
+    remainder, _ = ripple_carry_adder(remainder, correction)
+    return type(a).from_bits(quotient), type(a).from_bits(remainder[2:])
+
+
+DIVIDERS: Dict[str, Callable] = dict(
+    restoring=restoring_divider,
+    non_restoring=non_restoring_divider,
+)
+
+
+class Divider(MeasuredCircuit):
+    def __init__(self, kind: str = "restoring", precision: int = PRECISION) -> None:
+        """A `precision` bit unsigned divider of the given `kind` producing a quotient and a remainder."""
+        assert kind in DIVIDERS, f"Unknown divider {kind!r}, expected one of {list(DIVIDERS)}"
+        self.kind = kind
+        self.precision = precision
+        self.circuit = DIVIDERS[kind]
+
+    def __call__(self, a: BitString, b: BitString) -> Tuple[BitString, BitString]:
+        assert len(a) == len(b) == self.precision
+        return self.circuit(a, b)
+
+    def batch(self, a: Sequence[int], b: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Divide arrays of unsigned integer operands, 64 divisions per gate evaluation."""
+        quotient, remainder = self(bitslice(a, self.precision), bitslice(b, self.precision))
+        return quotient.to_ints(len(a)), remainder.to_ints(len(a))
+
+    @property
+    def widths(self) -> Tuple[int, ...]:
+        return (self.precision, self.precision)
+
+    def __repr__(self):
+        return f"Divider({self.kind!r}, precision={self.precision})"
@@ -0,0 +1,233 @@
+"""Equivalence checking of circuits against reference functions
+
+A circuit is checked by evaluating it and a plain Python reference function on the same inputs and comparing the
+outputs. Narrow circuits are checked exhaustively over every possible input, wide ones on a large random sample. The
+inputs are split into chunks that are evaluated bit-sliced (64 inputs per gate evaluation, see `computer.batch`) and,
+if there are several, spread over a pool of processes. Circuits that cannot be traced into a netlist, e.g. because
+they branch on the value of a bit, cannot run batched either and are evaluated one input at a time.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from computer.batch import BitPlanes, bitslice, int_dtype, pack, unpack
+from computer.bits_and_bytes import Bit, BitString
+from computer.netlist import trace
+
+
+MAX_EXHAUSTIVE_INPUTS = 24
+CHUNK_SIZE = 1 << 16
+
+
+class Counterexample(NamedTuple):
+    """An input (one integer per circuit input) on which the circuit and the reference disagree."""
+
+    inputs: Tuple[int, ...]
+    expected: Tuple[int, ...]
+    actual: Tuple[int, ...]
+
+
+class EquivalenceResult(NamedTuple):
+    equivalent: bool
+    checked: int
+    exhaustive: bool
+    counterexample: Optional[Counterexample]
+
+
+def _flatten(outputs: Any) -> List[Any]:
+    if isinstance(outputs, tuple):
+        return [value for output in outputs for value in _flatten(output)]
+    return [outputs]
+
+
+def _plane(plane: Any, count: int) -> np.ndarray:
+    if isinstance(plane, Bit):
+        return np.full(count, bool(plane))
+    return unpack(plane, count)
+
+
+def _batched(circuit: Callable, widths: Sequence[int], operands: List[np.ndarray]) -> List[Tuple[np.ndarray, int]]:
+    """Evaluate `circuit` bit-sliced and return every output as an integer array and its width."""
+    count = len(operands[0])
+    arguments = [
+        pack(operand.astype(bool), np.uint64) if width == 0 else bitslice(operand, width)
+        for operand, width in zip(operands, widths)
+    ]
+    outputs = []
+    for output in _flatten(circuit(*arguments)):
+        planes = list(output) if isinstance(output, BitPlanes) else [output]
+        dtype = int_dtype(len(planes))
+        values = np.zeros(count, dtype=dtype)
+        for plane in planes:
+            values = (values << dtype.type(1)) | _plane(plane, count).astype(dtype)
+        outputs.append((values, len(planes)))
+    return outputs
+
+
+def _scalar(circuit: Callable, widths: Sequence[int], operands: List[np.ndarray]) -> List[Tuple[np.ndarray, int]]:
+    """Evaluate `circuit` on one input at a time and return every output as an integer array and its width."""
+    rows = []
+    for values in zip(*operands):
+        arguments = [
+            Bit(int(value)) if width == 0 else BitString.from_int(int(value), width)
+            for value, width in zip(values, widths)
+        ]
+        outputs = _flatten(circuit(*arguments))
+        rows.append([(int(output), len(output) if isinstance(output, BitString) else 1) for output in outputs])
+    return [
+        (np.array([row[k][0] for row in rows], dtype=int_dtype(rows[0][k][1])), rows[0][k][1])
+        for k in range(len(rows[0]))
+    ]
+
+
+def batchable(circuit: Callable, widths: Sequence[int]) -> bool:
+    """Return whether `circuit` can be evaluated bit-sliced, i.e. only combines its inputs with gates.
+
+    This is checked by tracing it into a netlist, which fails for circuits that branch on or convert their inputs.
+    """
+    try:
+        trace(circuit, *widths)
+    except TypeError:
+        return False
+    return True
+
+
+def _check_chunk(
+    circuit: Callable,
+    reference: Callable,
+    widths: Sequence[int],
+    vectorized: bool,
+    batched: bool,
+    operands: List[np.ndarray],
+) -> Optional[Counterexample]:
+    """Return the first counterexample among the inputs in `operands` (one array per circuit input), if any."""
+    actual = (_batched if batched else _scalar)(circuit, widths, operands)
+
+    if vectorized:
+        expected = [np.asarray(output) for output in _flatten(reference(*operands))]
+    else:
+        rows = [_flatten(reference(*values)) for values in zip(*(operand.tolist() for operand in operands))]
+        expected = list(zip(*rows))
+    assert len(expected) == len(actual), f"The reference returns {len(expected)} outputs, the circuit {len(actual)}"
+
+    mismatch = np.zeros(len(operands[0]), dtype=bool)
+    masked = []
+    for (values, width), reference_values in zip(actual, expected):
+        # the reference output is truncated to the width of the circuit output, e.g. the sum of an adder
+        mask = (1 << width) - 1
+        if width > 64 or not vectorized or np.asarray(reference_values).dtype == object:
+            reference_values = np.array([int(value) & mask for value in reference_values], dtype=int_dtype(width))
+        else:
+            reference_values = reference_values.astype(np.uint64) & np.uint64(mask)
+        masked.append(reference_values)
+        mismatch |= values != reference_values
+    failures = np.flatnonzero(mismatch)
+    if not failures.size:
+        return None
+    i = failures[0]
+    return Counterexample(
+        tuple(int(operand[i]) for operand in operands),
+        tuple(int(values[i]) for values in masked),
+        tuple(int(values[i]) for values, _ in actual),
+    )
+
+
+def _random_operand(rng: np.random.Generator, width: int, count: int) -> np.ndarray:
+    width = max(width, 1)
+    if width <= 63:
+        return rng.integers(0, 1 << width, size=count, dtype=np.uint64)
+    values = np.zeros(count, dtype=object)
+    for offset in range(0, width, 32):
+        bits = min(32, width - offset)
+        values = (values << bits) | rng.integers(0, 1 << bits, size=count, dtype=np.uint64).astype(object)
+    return values if width > 64 else values.astype(np.uint64)
+
+
+def _chunks(widths: Sequence[int], exhaustive: bool, n_inputs: int, samples: int, chunk_size: int, seed: int):
+    """Yield the inputs to check in chunks of one operand array per circuit input."""
+    if exhaustive:
+        total = 1 << n_inputs
+        for start in range(0, total, chunk_size):
+            indices = np.arange(start, min(start + chunk_size, total), dtype=np.uint64)
+            operands, shift = [], n_inputs
+            for width in widths:
+                shift -= max(width, 1)
+                operands.append((indices >> np.uint64(shift)) & np.uint64((1 << max(width, 1)) - 1))
+            yield operands
+    else:
+        rng = np.random.default_rng(seed)
+        for start in range(0, samples, chunk_size):
+            count = min(chunk_size, samples - start)
+            yield [_random_operand(rng, width, count) for width in widths]
+
+
+def check_equivalence(
+    circuit: Callable,
+    reference: Callable,
+    widths: Sequence[int],
+    *,
+    samples: int = 1 << 20,
+    max_exhaustive_inputs: int = MAX_EXHAUSTIVE_INPUTS,
+    processes: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    vectorized: bool = False,
+    batched: Optional[bool] = None,
+    seed: int = 0,
+) -> EquivalenceResult:
+    """Check that `circuit` computes the same as `reference` on every input, or on a random sample of inputs.
+
+    Args:
+        circuit (Callable): Circuit taking bits and bit strings and returning a bit, bit string or tuple of those.
+        reference (Callable): Function taking one unsigned integer per circuit input and returning an integer per
+            circuit output (a tuple for several outputs). Its outputs are truncated to the widths of the circuit
+            outputs, so `lambda a, b: (a + b, (a + b) >> 8)` is the reference of an 8-bit adder.
+        widths (Sequence[int]): Width of each circuit input; 0 for a `Bit`.
+        samples (int): Number of random inputs to check if the circuit has too many input bits to check all.
+        max_exhaustive_inputs (int): Maximum total number of input bits to check exhaustively.
+        processes (int): Number of worker processes. Defaults to the number of CPUs. Only used if there is more
+            than one chunk of inputs, and the circuit and reference must then be picklable (e.g. not lambdas).
+        chunk_size (int): Number of inputs evaluated together in one batch.
+        vectorized (bool): Call `reference` once per chunk with NumPy arrays instead of once per input.
+        batched (bool): Evaluate the circuit bit-sliced instead of one input at a time. Defaults to whether it is
+            `batchable`.
+        seed (int): Seed of the random sample.
+
+    Returns:
+        EquivalenceResult: Whether no counterexample was found, how many inputs were checked, whether that was all
+            of them and the first counterexample (in the order inputs are checked) if there is one.
+    """
+    widths = tuple(widths)
+    n_inputs = sum(max(width, 1) for width in widths)
+    exhaustive = n_inputs <= max_exhaustive_inputs
+    total = (1 << n_inputs) if exhaustive else samples
+    chunks = _chunks(widths, exhaustive, n_inputs, samples, chunk_size, seed)
+    processes = os.cpu_count() if processes is None else processes
+    batched = batchable(circuit, widths) if batched is None else batched
+
+    checked = 0
+    if processes <= 1 or total <= chunk_size:
+        for operands in chunks:
+            counterexample = _check_chunk(circuit, reference, widths, vectorized, batched, operands)
+            if counterexample is not None:
+                return EquivalenceResult(False, checked + len(operands[0]), exhaustive, counterexample)
+            checked += len(operands[0])
+        return EquivalenceResult(True, checked, exhaustive, None)
+
+    with ProcessPoolExecutor(processes) as executor:
+        pending = []
+        for operands in chunks:
+            count = len(operands[0])
+            arguments = (circuit, reference, widths, vectorized, batched, operands)
+            pending.append((count, executor.submit(_check_chunk, *arguments)))
+        # chunks are reported in order, so the first counterexample does not depend on the scheduling
+        for count, future in pending:
+            counterexample = future.result()
+            checked += count
+            if counterexample is not None:
+                for _, other in pending:
+                    other.cancel()
+                return EquivalenceResult(False, checked, exhaustive, counterexample)
+    return EquivalenceResult(True, checked, exhaustive, None)
@@ -4,11 +4,11 @@ from computer.bits_and_bytes import Bit
 
 
 def AND(a: Bit, b: Bit) -> Bit:
-    return a and b
+    return a & b
 
 
 def OR(a: Bit, b: Bit) -> Bit:
-    return a or b
+    return a | b
 
 
 def NOT(a: Bit) -> Bit:
@@ -24,4 +24,3 @@ def XOR(a: Bit, b: Bit) -> Bit:
 
 def NAND(a: Bit, b: Bit) -> Bit:
     return NOT(AND(a, b))
-    return NOT(AND(a, b))
@@ -0,0 +1,100 @@
+"""Gate activity instrumentation
+
+Counts how many primitive AND, OR and NOT gates are evaluated while running any code, in total and per enclosing
+circuit (the innermost function on the stack that is not itself a gate, e.g. `computer.adders.half_adder`). The counts
+are gathered with a profile hook that is only installed while a `GateActivity` is active, so the gates run completely
+untouched and at full speed when it is not.
+
+```
+with GateActivity() as activity:
+    ripple_carry_adder_8bit(a, b)
+print(activity.report())
+```
+"""
+
+import sys
+from collections import Counter, defaultdict
+from types import FrameType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from computer import gates
+from computer.analysis import enclosing_circuit
+
+
+PRIMITIVE_GATES = {gates.AND.__code__: "AND", gates.OR.__code__: "OR", gates.NOT.__code__: "NOT"}
+
+
+class GateActivity():
+    def __init__(self, inclusive: bool = False) -> None:
+        """Count the primitive gate evaluations while active, as a context manager.
+
+        Args:
+            inclusive (bool): Also count every gate towards all circuits on the stack down to where the activity
+                was entered, e.g. towards `MatrixRegister.write` and not only the `Gate.__call__` inside it. This
+                walks the whole stack on every gate and is correspondingly slower.
+        """
+        self.inclusive = inclusive
+        self.gates = Counter()
+        self.circuits: Dict[str, Counter] = defaultdict(Counter)
+        self.inclusive_circuits: Dict[str, Counter] = defaultdict(Counter)
+        self._previous = None
+        self._entry: Optional[FrameType] = None
+
+    @property
+    def total(self) -> int:
+        return sum(self.gates.values())
+
+    def _profile(self, frame: FrameType, event: str, arg: Any) -> None:
+        if event != "call":
+            return
+        gate = PRIMITIVE_GATES.get(frame.f_code)
+        if gate is None:
+            return
+        self.gates[gate] += 1
+        self.circuits[enclosing_circuit(frame)][gate] += 1
+        if self.inclusive:
+            seen = set()
+            caller = frame.f_back
+            while caller is not None and caller is not self._entry:
+                circuit = enclosing_circuit(caller)
+                if circuit not in seen:
+                    seen.add(circuit)
+                    self.inclusive_circuits[circuit][gate] += 1
+                caller = caller.f_back
+
+    def __enter__(self) -> "GateActivity":
+        self._previous = sys.getprofile()
+        self._entry = sys._getframe(1)
+        sys.setprofile(self._profile)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        sys.setprofile(self._previous)
+        self._entry = None
+
+    def reset(self) -> None:
+        self.gates.clear()
+        self.circuits.clear()
+        self.inclusive_circuits.clear()
+
+    def report(self, top: Optional[int] = None) -> str:
+        """Return a table of the gate evaluations per circuit, the busiest circuits first."""
+        circuits = self.inclusive_circuits if self.inclusive else self.circuits
+        summary = ", ".join(f"{n} {gate}" for gate, n in sorted(self.gates.items()))
+        lines = [f"{self.total} gate evaluations: {summary}"]
+        lines.append(f"{'AND':>10} {'OR':>10} {'NOT':>10} {'total':>10}  circuit")
+        ranked = sorted(circuits.items(), key=lambda item: -sum(item[1].values()))
+        for circuit, counts in ranked[:top]:
+            total = sum(counts.values())
+            lines.append(f"{counts['AND']:>10} {counts['OR']:>10} {counts['NOT']:>10} {total:>10}  {circuit}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"GateActivity(total={self.total})"
+
+
+def count_gates(function: Callable, *args, inclusive: bool = False, **kwargs) -> Tuple[Any, GateActivity]:
+    """Call `function` and return its result and the `GateActivity` of the call."""
+    with GateActivity(inclusive) as activity:
+        result = function(*args, **kwargs)
+    return result, activity
@@ -1,34 +1,179 @@
-"""Logic circuits"""
+"""Reduction circuits
 
+Circuits that reduce the bits of one or two words to a flag or a count: zero detection, parity, population count and
+equality and magnitude comparison. The bits are combined pairwise in balanced trees, so the depth of every circuit
+grows with the logarithm of the width instead of linearly as when the bits are chained one after the other.
 
-from gates import OR
+Like all circuits built from `computer.gates` they also run on `BitPlanes`, see `Reduction.batch`.
 
+https://en.wikipedia.org/wiki/Digital_comparator
+https://en.wikipedia.org/wiki/Hamming_weight
+"""
 
-def is_zero_8bit(a: str) -> bool:
-    """Return 1 if the 8bit number is zero."""
-    o1 = OR(a[0], a[1])
-    o2 = OR(a[2], a[3])
-    o3 = OR(a[4], a[5])
-    o4 = OR(a[6], a[7])
-    
-    o5 = OR(o1, o2)
-    o6 = OR(o3, o4)
-    
-    o7 = OR(o5, o6)
-    return o7
+from functools import partial
+from typing import Any, Callable, Dict, Sequence, Tuple
 
+import numpy as np
 
-def is_zero(a: str) -> str:
-    """Return 1 if the number is zero"""
-    def single_step(bits: str) -> str:
-        n_out = len(bits) // 2
-        ors = ["0"] * n_out
-        for i in range(0, n_out, 2):
-            ors[i] = OR(bits[i], bits[i - 1])
-        ors = "".join(ors)
-        return ors
+from computer.adders import carry_look_ahead_adder
+from computer.analysis import MeasuredCircuit
+from computer.batch import BitPlanes, bitslice, unpack
+from computer.bits_and_bytes import Bit, BitString, Byte
+from computer.configuration import PRECISION
+from computer.gates import AND, NOT, OR, XOR
+from computer.multipliers import final_addition, reduce_dadda
 
-    while len(a) > 1:
-        a = single_step(a)
 
-    return a
+def _tree(nodes: Sequence[Any], combine: Callable[[Any, Any], Any]) -> Any:
+    """Combine neighbouring `nodes` pairwise, left with right, in a balanced tree of `ceil(log2(len(nodes)))` levels."""
+    assert len(nodes) > 0, "Cannot reduce an empty word"
+    level = list(nodes)
+    while len(level) > 1:
+        paired = [combine(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def any_set(a: BitString) -> Bit:
+    """Return 1 if any bit of `a` is 1."""
+    return _tree(list(a), OR)
+
+
+def all_set(a: BitString) -> Bit:
+    """Return 1 if all bits of `a` are 1."""
+    return _tree(list(a), AND)
+
+
+def is_zero(a: BitString) -> Bit:
+    """Return 1 if all bits of `a` are 0."""
+    return NOT(any_set(a))
+
+
+def is_zero_8bit(a: BitString) -> Bit:
+    """Return 1 if the 8 bit number `a` is zero. Kept for compatibility, use `is_zero` for any width.
+
+    It used to return the OR of the bits, i.e. 1 if the number is not zero, contrary to its name.
+    """
+    assert len(a) == 8
+    return is_zero(a)
+
+
+def parity(a: BitString) -> Bit:
+    """Return 1 if an odd number of bits of `a` are 1."""
+    return _tree(list(a), XOR)
+
+
+def popcount(a: BitString) -> BitString:
+    """Return the number of bits of `a` that are 1 as a bit string of `len(a).bit_length()` bits.
+
+    The bits form a single column that is reduced with a Dadda tree of full and half adders, like the partial
+    products of a multiplier, and the two rows left are added with a carry look-ahead adder.
+    """
+    width = len(a).bit_length()
+    columns = [list(a)] + [[] for _ in range(width - 1)]
+    word_type = BitString if isinstance(a, Byte) else type(a)
+    return final_addition(reduce_dadda(columns), width, word_type, carry_look_ahead_adder)
+
+
+def equal(a: BitString, b: BitString) -> Bit:
+    """Return 1 if `a` and `b` hold the same bits."""
+    assert len(a) == len(b)
+    return is_zero([XOR(x, y) for x, y in zip(a, b)])
+
+
+def _compare(a: BitString, b: BitString, signed: bool, greater: bool) -> Tuple[Bit, ...]:
+    """Return whether `a` equals, is less than and (if `greater`) is greater than `b`.
+
+    Every bit position is compared on its own and the results are combined from the left-most bit: `a` is less than
+    `b` if the more significant half is less, or it is equal and the less significant half is less. Swapping the
+    sign bits of the operands turns the unsigned comparison into a two's complement one.
+    """
+    assert len(a) == len(b)
+    nodes = []
+    for i in range(len(a)):
+        x, y = (b[i], a[i]) if signed and i == 0 else (a[i], b[i])
+        less_bit, greater_bit = AND(NOT(x), y), AND(x, NOT(y))
+        equal_bit = NOT(OR(less_bit, greater_bit))
+        nodes.append((equal_bit, less_bit, greater_bit) if greater else (equal_bit, less_bit))
+
+    def combine(high: Tuple[Bit, ...], low: Tuple[Bit, ...]) -> Tuple[Bit, ...]:
+        return (AND(high[0], low[0]),) + tuple(OR(h, AND(high[0], l)) for h, l in zip(high[1:], low[1:]))
+
+    return _tree(nodes, combine)
+
+
+def less_than(a: BitString, b: BitString, signed: bool = False) -> Bit:
+    """Return 1 if `a` is less than `b`, as two's complement numbers if `signed`."""
+    return _compare(a, b, signed, greater=False)[1]
+
+
+def greater_than(a: BitString, b: BitString, signed: bool = False) -> Bit:
+    """Return 1 if `a` is greater than `b`, as two's complement numbers if `signed`."""
+    return _compare(b, a, signed, greater=False)[1]
+
+
+def compare(a: BitString, b: BitString, signed: bool = False) -> Tuple[Bit, Bit, Bit]:
+    """Return whether `a` is less than, equal to and greater than `b`, as two's complement numbers if `signed`."""
+    equal_bit, less_bit, greater_bit = _compare(a, b, signed, greater=True)
+    return less_bit, equal_bit, greater_bit
+
+
+REDUCTIONS: Dict[str, Callable] = dict(
+    any_set=any_set,
+    all_set=all_set,
+    is_zero=is_zero,
+    parity=parity,
+    popcount=popcount,
+    equal=equal,
+    less_than=less_than,
+    greater_than=greater_than,
+    compare=compare,
+)
+OPERANDS = dict(equal=2, less_than=2, greater_than=2, compare=2)
+SIGNED = ("less_than", "greater_than", "compare")
+
+
+def _unbatch(output: Any, count: int) -> Any:
+    """Return a batched output as a boolean array for a bit, an array of unsigned integers for a word."""
+    if isinstance(output, tuple):
+        return tuple(_unbatch(value, count) for value in output)
+    if isinstance(output, BitPlanes):
+        return output.to_ints(count)
+    if isinstance(output, Bit):
+        return np.full(count, bool(output))
+    return unpack(output, count)
+
+
+class Reduction(MeasuredCircuit):
+    def __init__(self, kind: str, precision: int = PRECISION, signed: bool = False) -> None:
+        """A reduction circuit of the given `kind` over `precision` bit words.
+
+        Only the magnitude comparators can be `signed`, comparing two's complement numbers.
+        """
+        assert kind in REDUCTIONS, f"Unknown reduction {kind!r}, expected one of {list(REDUCTIONS)}"
+        assert not signed or kind in SIGNED, f"Only the reductions {SIGNED} are signed"
+        self.kind = kind
+        self.precision = precision
+        self.signed = signed
+        self.operands = OPERANDS.get(kind, 1)
+        self.circuit = partial(REDUCTIONS[kind], signed=signed) if kind in SIGNED else REDUCTIONS[kind]
+
+    def __call__(self, *words: BitString) -> Any:
+        assert len(words) == self.operands and all(len(word) == self.precision for word in words)
+        return self.circuit(*words)
+
+    def batch(self, *words: Sequence[int]) -> Any:
+        """Reduce arrays of unsigned integer operands, 64 reductions per gate evaluation.
+
+        Bit outputs are returned as boolean arrays and the count of `popcount` as an array of unsigned integers.
+        """
+        return _unbatch(self(*(bitslice(word, self.precision) for word in words)), len(words[0]))
+
+    @property
+    def widths(self) -> Tuple[int, ...]:
+        return (self.precision,) * self.operands
+
+    def __repr__(self):
+        return f"Reduction({self.kind!r}, precision={self.precision})"
@@ -0,0 +1,214 @@
+"""Multiplication circuits
+
+All multipliers form partial products of the two `n` bit operands, reduce them to two rows with full and half adders
+and add those two rows into a `2n` bit product. They differ in how the partial products are formed and reduced:
+
+- Array: the partial products are accumulated row by row in carry-save form, so the depth grows linearly with `n`.
+- Wallace and Dadda trees: the columns of partial product bits are reduced in parallel in a logarithmic number of
+  stages, Wallace as early as possible and Dadda as late as possible (fewer adders).
+- Radix-4 Booth: the multiplier is recoded into digits -2..2 so that only `n / 2` partial products are formed, which
+  are then reduced with a Dadda tree. Booth multiplication is signed (two's complement).
+
+https://en.wikipedia.org/wiki/Binary_multiplier
+https://en.wikipedia.org/wiki/Wallace_tree
+https://en.wikipedia.org/wiki/Dadda_multiplier
+https://en.wikipedia.org/wiki/Booth%27s_multiplication_algorithm
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from computer.adders import carry_look_ahead_adder, full_adder, half_adder, ripple_carry_adder
+from computer.analysis import MeasuredCircuit
+from computer.batch import bitslice
+from computer.bits_and_bytes import Bit, BitString, Byte, Word
+from computer.configuration import PRECISION
+from computer.gates import AND, NOT, OR, XOR
+
+
+def _product_type(a: BitString) -> type:
+    """Return the word type of a product of `a`, which is twice as wide so never a `Byte`."""
+    return BitString if isinstance(a, Byte) else type(a)
+
+
+def _partial_products(a: BitString, b: BitString) -> List[List]:
+    """Return the columns of the unsigned partial product bits `a_j AND b_i`, from the right-most column."""
+    n = len(a)
+    columns = [[] for _ in range(2 * n)]
+    for i in range(n):
+        for j in range(n):
+            columns[i + j].append(AND(a[-1 - j], b[-1 - i]))
+    return columns
+
+
+def final_addition(columns: List[List], width: int, word_type: type, adder: Callable) -> BitString:
+    """Add the (at most) two rows of bits left in the columns and return the `width` bit result."""
+    assert all(len(column) <= 2 for column in columns)
+    rows = [
+        Word(column[k] if k < len(column) else Bit(0) for column in reversed(columns[:width])) for k in range(2)
+    ]
+    product, _ = adder(rows[0], rows[1])
+    return word_type.from_bits(product)
+
+
+def reduce_wallace(columns: List[List]) -> List[List]:
+    """Reduce every column with as many full and half adders as possible until no column holds more than 2 bits."""
+    while any(len(column) > 2 for column in columns):
+        reduced = [[] for _ in range(len(columns) + 1)]
+        for k, column in enumerate(columns):
+            i = 0
+            while len(column) - i >= 3:
+                sum, carry = full_adder(column[i], column[i + 1], column[i + 2])
+                reduced[k].append(sum)
+                reduced[k + 1].append(carry)
+                i += 3
+            if len(column) - i == 2:
+                sum, carry = half_adder(column[i], column[i + 1])
+                reduced[k].append(sum)
+                reduced[k + 1].append(carry)
+                i += 2
+            reduced[k].extend(column[i:])
+        columns = reduced[: len(columns)]  # carries out of the product width are discarded (modular arithmetic)
+    return columns
+
+
+def reduce_dadda(columns: List[List]) -> List[List]:
+    """Reduce every column only as far as needed to reach the next height of the Dadda sequence 2, 3, 4, 6, 9, ..."""
+    heights = [2]
+    while heights[-1] < max(len(column) for column in columns):
+        heights.append(heights[-1] * 3 // 2)
+    for target in reversed(heights[:-1]):
+        reduced = [[] for _ in range(len(columns) + 1)]
+        for k, column in enumerate(columns):
+            column = list(column)
+            # the carries from the previous column in this stage count towards the height of this column
+            while len(column) + len(reduced[k]) > target:
+                excess = len(column) + len(reduced[k]) - target
+                if excess == 1:
+                    sum, carry = half_adder(column.pop(), column.pop())
+                else:
+                    sum, carry = full_adder(column.pop(), column.pop(), column.pop())
+                reduced[k].append(sum)
+                reduced[k + 1].append(carry)
+            reduced[k].extend(column)
+        columns = reduced[: len(columns)]
+    return columns
+
+
+def array_multiplier(a: BitString, b: BitString) -> BitString:
+    """Multiply two unsigned `n` bit strings and return the `2n` bit product.
+
+    Every row of partial products is added to the running sum and carry bits by one row of full adders. The sum and
+    carry bits left after the last row are added by a ripple carry adder.
+    """
+    assert len(a) == len(b)
+    n = len(a)
+    sums: Dict[int, object] = {j: AND(a[-1 - j], b[-1]) for j in range(n)}
+    carries: Dict[int, object] = {}
+    for i in range(1, n):
+        row = {i + j: AND(a[-1 - j], b[-1 - i]) for j in range(n)}
+        new_sums, new_carries = dict(), dict()
+        for k in sorted(set(sums) | set(carries) | set(row)):
+            bits = [bits[k] for bits in (sums, carries, row) if k in bits]
+            if len(bits) == 3:
+                new_sums[k], new_carries[k + 1] = full_adder(*bits)
+            elif len(bits) == 2:
+                new_sums[k], new_carries[k + 1] = half_adder(*bits)
+            else:
+                new_sums[k] = bits[0]
+        sums, carries = new_sums, new_carries
+    columns = [[bits[k] for bits in (sums, carries) if k in bits] for k in range(2 * n)]
+    return final_addition(columns, 2 * n, _product_type(a), ripple_carry_adder)
+
+
+def wallace_tree_multiplier(a: BitString, b: BitString) -> BitString:
+    """Multiply two unsigned `n` bit strings with a Wallace tree and return the `2n` bit product."""
+    assert len(a) == len(b)
+    columns = reduce_wallace(_partial_products(a, b))
+    return final_addition(columns, 2 * len(a), _product_type(a), carry_look_ahead_adder)
+
+
+def dadda_tree_multiplier(a: BitString, b: BitString) -> BitString:
+    """Multiply two unsigned `n` bit strings with a Dadda tree and return the `2n` bit product."""
+    assert len(a) == len(b)
+    columns = reduce_dadda(_partial_products(a, b))
+    return final_addition(columns, 2 * len(a), _product_type(a), carry_look_ahead_adder)
+
+
+def booth_multiplier(a: BitString, b: BitString, signed: bool = True) -> BitString:
+    """Multiply two `n` bit strings with radix-4 Booth recoding and return the `2n` bit product.
+
+    The operands are two's complement numbers if `signed`, otherwise they are zero extended by a bit first. Each pair
+    of multiplier bits `b_2i+1, b_2i` (with `b_2i-1`) becomes a digit `-2..2` that selects `0, a` or `2a` and whether
+    to negate it. A negative partial product is inverted and a 1 is added in its right-most column. Partial products
+    are sign extended to the product width and reduced with a Dadda tree.
+    """
+    assert len(a) == len(b)
+    n = len(a)
+    a_bits = [a[-1 - j] for j in range(n)]
+    b_bits = [b[-1 - i] for i in range(n)]
+    if not signed:
+        a_bits.append(Bit(0))
+        b_bits.append(Bit(0))
+    m = len(a_bits)
+    if m % 2:
+        b_bits.append(b_bits[-1])  # sign extend the multiplier to whole pairs of bits
+    width = 2 * m
+    a_bits.append(a_bits[-1])  # 2a needs one more bit
+
+    columns = [[] for _ in range(width)]
+    for i in range(0, len(b_bits), 2):
+        previous = b_bits[i - 1] if i > 0 else Bit(0)
+        low, high = b_bits[i], b_bits[i + 1]
+        one = XOR(low, previous)
+        two = OR(AND(high, AND(NOT(low), NOT(previous))), AND(NOT(high), AND(low, previous)))
+        negative = high
+        partial = [
+            XOR(OR(AND(one, a_bits[j]), AND(two, a_bits[j - 1] if j > 0 else Bit(0))), negative) for j in range(m + 1)
+        ]
+        for k in range(i, width):
+            columns[k].append(partial[min(k - i, m)])  # the sign bit is repeated up to the product width
+        columns[i].append(negative)
+    columns = reduce_dadda(columns)
+    product = final_addition(columns, width, Word, carry_look_ahead_adder)
+    return _product_type(a).from_bits(product[width - 2 * n :])
+
+
+MULTIPLIERS: Dict[str, Callable] = dict(
+    array=array_multiplier,
+    wallace=wallace_tree_multiplier,
+    dadda=dadda_tree_multiplier,
+    booth=booth_multiplier,
+)
+
+
+class Multiplier(MeasuredCircuit):
+    def __init__(self, kind: str = "dadda", precision: int = PRECISION, signed: Optional[bool] = None) -> None:
+        """A `precision` by `precision` bit multiplier of the given `kind` producing a `2 * precision` bit product.
+
+        Only the Booth multiplier can be signed, and it is by default. The others are unsigned.
+        """
+        assert kind in MULTIPLIERS, f"Unknown multiplier {kind!r}, expected one of {list(MULTIPLIERS)}"
+        assert not signed or kind == "booth", "Only the Booth multiplier is signed"
+        self.kind = kind
+        self.precision = precision
+        self.signed = kind == "booth" if signed is None else signed
+        self.circuit = MULTIPLIERS[kind]
+
+    def __call__(self, a: BitString, b: BitString) -> BitString:
+        assert len(a) == len(b) == self.precision
+        if self.kind == "booth":
+            return self.circuit(a, b, self.signed)
+        return self.circuit(a, b)
+
+    def batch(self, a: Sequence[int], b: Sequence[int]) -> np.ndarray:
+        """Multiply arrays of unsigned integer encodings of operands, 64 products per gate evaluation."""
+        return self(bitslice(a, self.precision), bitslice(b, self.precision)).to_ints(len(a))
+
+    @property
+    def widths(self) -> Tuple[int, ...]:
+        return (self.precision, self.precision)
+
+    def __repr__(self):
+        return f"Multiplier({self.kind!r}, precision={self.precision})"
@@ -0,0 +1,245 @@
+"""Netlists of combinational circuits
+
+The circuits in this package are nested Python functions. Evaluating one on `Wire` signals instead of bits traces it
+into a `Netlist`: an explicit graph of primitive gates connected by wires. A netlist can be optimized and compiled into
+a single straight-line Python function that evaluates all of its gates on plain integers without any per-gate calls.
+"""
+
+import marshal
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from typing_extensions import Self
+
+from computer.artifacts import ArtifactCache
+from computer.bits_and_bytes import Bit, BitString, ONE, Word, ZERO
+
+
+class Wire():
+    """A signal that records every gate evaluated on it in a netlist."""
+
+    __slots__ = ("netlist", "node")
+
+    def __init__(self, netlist: "Netlist", node: int) -> None:
+        self.netlist = netlist
+        self.node = node
+
+    def __and__(self, other: Any) -> Any:
+        if isinstance(other, Bit):
+            return self if other else other
+        return self.netlist.add_gate("AND", self, other)
+
+    def __or__(self, other: Any) -> Any:
+        if isinstance(other, Bit):
+            return other if other else self
+        return self.netlist.add_gate("OR", self, other)
+
+    def __invert__(self) -> Self:
+        return self.netlist.add_gate("NOT", self)
+
+    __rand__ = __and__
+    __ror__ = __or__
+
+    def __bool__(self) -> bool:
+        raise TypeError("The value of a wire is unknown so a traced circuit cannot branch on it")
+
+    def __repr__(self) -> str:
+        return f"Wire({self.node})"
+
+
+class Netlist():
+    def __init__(self, name: str = "circuit") -> None:
+        """A combinational circuit as a graph of primitive AND, OR and NOT gates.
+
+        Nodes are numbered in the order they are created. A node is either an input or a gate given as a tuple of its
+        type and input nodes. Identical gates are created only once. The outputs are kept in the structure the traced
+        circuit returned them in, with wires replaced by their nodes.
+        """
+        self.name = name
+        self.nodes: List[Tuple] = []
+        self.inputs: List[Any] = []
+        self.outputs: Any = None
+        self._gates: Dict[Tuple, int] = dict()
+
+    def add_input(self) -> Wire:
+        self.nodes.append(("INPUT",))
+        return Wire(self, len(self.nodes) - 1)
+
+    def add_gate(self, gate: str, *inputs: Wire) -> Wire:
+        key = (gate,) + tuple(sorted(wire.node for wire in inputs))
+        if key not in self._gates:
+            self.nodes.append(key)
+            self._gates[key] = len(self.nodes) - 1
+        return Wire(self, self._gates[key])
+
+    @property
+    def gate_count(self) -> int:
+        return sum(1 for node in self.nodes if node[0] != "INPUT")
+
+    def output_nodes(self) -> List[int]:
+        """Return the nodes that drive the outputs."""
+        nodes = []
+
+        def collect(output):
+            if isinstance(output, tuple) and output and output[0] == "WORD":
+                nodes.extend(node for node in output[2] if isinstance(node, int))
+            elif isinstance(output, tuple):
+                for value in output:
+                    collect(value)
+            elif isinstance(output, int):
+                nodes.append(output)
+
+        collect(self.outputs)
+        return nodes
+
+    def topological_order(self) -> List[int]:
+        """Return the gates that the outputs depend on, ordered so that every gate comes after its inputs."""
+        live = set()
+        stack = self.output_nodes()
+        while stack:
+            node = stack.pop()
+            if node not in live and self.nodes[node][0] != "INPUT":
+                live.add(node)
+                stack.extend(self.nodes[node][1:])
+
+        fan_out = {node: [] for node in live}
+        n_pending = dict()
+        for node in live:
+            pending = [source for source in self.nodes[node][1:] if source in live]
+            n_pending[node] = len(pending)
+            for source in pending:
+                fan_out[source].append(node)
+
+        order = []
+        ready = sorted(node for node, n in n_pending.items() if n == 0)
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for sink in fan_out[node]:
+                n_pending[sink] -= 1
+                if n_pending[sink] == 0:
+                    ready.append(sink)
+        assert len(order) == len(live), "The netlist has a combinational loop"
+        return order
+
+    def to_source(self) -> str:
+        """Generate the source of a flat Python function that evaluates the netlist.
+
+        The function takes the same arguments as the traced circuit. Inside it every wire is a Python integer 0 or 1
+        so that each gate is a single integer operation. Output words are returned as the `word_type` of `compile`.
+        """
+        lines = []
+        arguments = []
+        for i, spec in enumerate(self.inputs):
+            arguments.append(f"x{i}")
+            if isinstance(spec, int):
+                lines.append(f"n{spec} = x{i}._value")
+            else:
+                width = len(spec)
+                lines.append(f"v{i} = x{i}._value")
+                lines.extend(f"n{node} = (v{i} >> {width - 1 - j}) & 1" for j, node in enumerate(spec))
+
+        for node in self.topological_order():
+            gate, *sources = self.nodes[node]
+            if gate == "NOT":
+                lines.append(f"n{node} = n{sources[0]} ^ 1")
+            else:
+                operator = "&" if gate == "AND" else "|"
+                lines.append(f"n{node} = n{sources[0]} {operator} n{sources[1]}")
+
+        def expression(output):
+            if isinstance(output, tuple) and output and output[0] == "WORD":
+                width = len(output[2])
+                terms = [
+                    (f"(n{node} << {width - 1 - j})" if isinstance(node, int) else f"{int(node) << (width - 1 - j)}")
+                    for j, node in enumerate(output[2])
+                ]
+                return f"_word({' | '.join(terms) or '0'}, {width})"
+            if isinstance(output, tuple):
+                return "(" + "".join(expression(value) + ", " for value in output) + ")"
+            if isinstance(output, int):
+                return f"_bits[n{output}]"
+            return f"_bits[{int(output)}]"
+
+        lines.append(f"return {expression(self.outputs)}")
+        body = "".join(f"    {line}\n" for line in lines)
+        return f"def {self.name}({', '.join(arguments)}):\n{body}"
+
+    def code(self, source: Optional[str] = None) -> CodeType:
+        """Compile the `source` of the flat Python function that evaluates the netlist, by default `to_source`."""
+        return compile(self.to_source() if source is None else source, f"<netlist {self.name}>", "exec")
+
+    def compile(
+        self, word_type: Type[BitString] = BitString, source: Optional[str] = None, code: Optional[CodeType] = None
+    ) -> Callable:
+        """Compile the netlist into a flat Python function, see `to_source`.
+
+        The `source` and its compiled `code` are generated unless given, e.g. when they were loaded from a cache.
+        """
+        source = self.to_source() if source is None else source
+        namespace = dict(_bits=(ZERO, ONE), _word=word_type._new)
+        exec(self.code(source) if code is None else code, namespace)
+        function = namespace[self.name]
+        function.netlist = self
+        function.source = source
+        return function
+
+    def __repr__(self):
+        return f"Netlist({self.name}, inputs={len(self.inputs)}, gates={self.gate_count})"
+
+
+def trace(circuit: Callable, *widths: int) -> Netlist:
+    """Trace `circuit` called with inputs of the given `widths` into a netlist.
+
+    A width of 0 stands for a single `Bit` input, any other width for a bit string of that many bits. The circuit may
+    return bits, bit strings and (nested) tuples of those.
+    """
+    name = circuit.__name__ if circuit.__name__.isidentifier() else "circuit"
+    netlist = Netlist(name)
+    arguments = []
+    for width in widths:
+        if width == 0:
+            wire = netlist.add_input()
+            netlist.inputs.append(wire.node)
+            arguments.append(wire)
+        else:
+            word = Word(netlist.add_input() for _ in range(width))
+            netlist.inputs.append([wire.node for wire in word])
+            arguments.append(word)
+
+    def template(output):
+        if isinstance(output, Word):
+            return ("WORD", len(output), tuple(template(value) for value in output))
+        if isinstance(output, tuple):
+            return tuple(template(value) for value in output)
+        if isinstance(output, Wire):
+            return output.node
+        if isinstance(output, Bit):
+            return output
+        raise TypeError(f"Cannot trace output {output!r} of {circuit.__name__}")
+
+    netlist.outputs = template(circuit(*arguments))
+    return netlist
+
+
+def _traced_code(circuit: Callable, widths: Tuple[int, ...]) -> Tuple[Netlist, str, bytes]:
+    """Return the netlist of `circuit`, the source of its compiled function and its marshalled code to be pickled."""
+    netlist = trace(circuit, *widths)
+    source = netlist.to_source()
+    return netlist, source, marshal.dumps(netlist.code(source))
+
+
+@lru_cache(maxsize=None)
+def compile_circuit(
+    circuit: Callable, *widths: int, word_type: Type[BitString] = BitString, cache: Optional[ArtifactCache] = None
+) -> Callable:
+    """Trace `circuit` with inputs of the given `widths` and compile it into a flat Python function.
+
+    The compiled function is built once and cached. It only accepts `Bit` and bit string inputs of the traced widths.
+    With an artifact `cache` the netlist and compiled code are also kept on disk for the next process.
+    """
+    if cache is None:
+        return trace(circuit, *widths).compile(word_type)
+    netlist, source, code = cache.get_or_build(_traced_code, circuit, widths)
+    return netlist.compile(word_type, source, marshal.loads(code))
@@ -1,5 +1,199 @@
-"""Persistent memory"""
+"""Persistent memory
 
+Non-volatile memory that keeps its contents across process restarts, e.g. to hold simulated disk images.
 
+The memory image is a file that is memory mapped, so reads are served straight from the page cache as zero-copy
+`memoryview`s. Writes go through a write-ahead journal: every write is first appended to the journal together with a
+checksum and only then copied into the image. The image is flushed to disk one dirty page at a time when the journal
+is checkpointed. If the process dies halfway through a write, the journal is replayed the next time the memory is
+opened. A torn journal record fails its checksum and is discarded, so the image always holds either the old or the new
+data of a write and is never corrupted.
 
+https://en.wikipedia.org/wiki/Write-ahead_logging
+"""
 
+import mmap
+import os
+import struct
+import zlib
+from typing import Optional, Set, Union
+
+from computer.bits_and_bytes import Bit, BitString
+
+
+JOURNAL_MAGIC = b"PMJ1"
+JOURNAL_HEADER = struct.Struct("<4sQII")  # magic, offset, length, checksum
+
+
+def _checksum(offset: int, data: bytes) -> int:
+    return zlib.crc32(data, zlib.crc32(struct.pack("<QI", offset, len(data))))
+
+
+def journal_record(offset: int, data: bytes) -> bytes:
+    """Return the journal record of writing `data` at byte `offset`."""
+    return JOURNAL_HEADER.pack(JOURNAL_MAGIC, offset, len(data), _checksum(offset, data)) + bytes(data)
+
+
+class PersistentMemory():
+    def __init__(
+        self,
+        path: str,
+        size: Optional[int] = None,
+        page_size: int = mmap.PAGESIZE,
+        journal_limit: int = 1 << 20,
+        fsync: bool = True,
+    ) -> None:
+        """A memory mapped file of `size` bytes with journaled, crash-consistent writes.
+
+        It is bit addressed like a `MemoryCell` through `read` and `write` and byte addressed through `read_block`
+        and `write_block`.
+
+        Args:
+            path (str): Path of the memory image. The journal is kept next to it with a `.journal` suffix.
+            size (int): Size of the image in bytes. Defaults to the size of an existing image. A smaller existing
+                image is extended with zeros.
+            page_size (int): Granularity in bytes at which dirty parts of the image are flushed. Must be a multiple
+                of `mmap.ALLOCATIONGRANULARITY`.
+            journal_limit (int): Size in bytes beyond which the journal is checkpointed, i.e. the dirty pages are
+                flushed and the journal is emptied.
+            fsync (bool): Force the journal to disk after every `write_block`. Without it a write is only durable
+                after the next `sync` or `flush`, and the image is only consistent after the process crashes. If the
+                operating system crashes, pages of the image may have been written back before the journal reached
+                the disk, so a block write can be torn.
+        """
+        assert page_size % mmap.ALLOCATIONGRANULARITY == 0
+        assert size is None or size > 0, "The size of a persistent memory must be positive"
+        assert size is not None or os.path.exists(path), "The size of a new persistent memory must be given"
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.page_size = page_size
+        self.journal_limit = journal_limit
+        self.fsync = fsync
+
+        exists = os.path.exists(path)
+        self._file = open(path, "r+b" if exists else "w+b")
+        current = os.fstat(self._file.fileno()).st_size
+        size = current if size is None else size
+        assert size > 0, f"The image {path} is empty"
+        if current < size:
+            self._file.truncate(size)
+        self.size = size
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        self._dirty: Set[int] = set()
+        self._unsynced = False
+
+        self._journal = open(self.journal_path, "a+b")
+        self.recover()
+
+    def _address(self, address: Union[int, BitString]) -> int:
+        address = int(address)
+        assert 0 <= address < 8 * self.size, f"Bit address {address} is outside of the memory"
+        return address
+
+    def read(self, address: Union[int, BitString], read_enable: Bit) -> Bit:
+        """Read the bit at `address` if `read_enable` is on."""
+        if read_enable:
+            address = self._address(address)
+            return Bit(1) if self._mmap[address >> 3] & (0x80 >> (address & 7)) else Bit(0)
+        return Bit(0)
+
+    def write(self, address: Union[int, BitString], data: Bit, write_enable: Bit) -> None:
+        """Write `data` to the bit at `address` if `write_enable` is on.
+
+        A bit write changes a single byte, which cannot be torn, so its journal record is not forced to disk. It is
+        durable after the next `write_block` with `fsync`, `sync` or `flush`.
+        """
+        if write_enable:
+            address = self._address(address)
+            byte = self._mmap[address >> 3]
+            byte = byte | (0x80 >> (address & 7)) if data else byte & ~(0x80 >> (address & 7))
+            self._write(address >> 3, bytes([byte]), sync=False)
+
+    def read_block(self, offset: int, length: int) -> memoryview:
+        """Return a zero-copy view of `length` bytes starting at byte `offset`.
+
+        The view reflects later writes. It must be released before the memory is closed.
+        """
+        assert 0 <= offset and offset + length <= self.size
+        return memoryview(self._mmap)[offset : offset + length]
+
+    def write_block(self, offset: int, data: Union[bytes, bytearray, memoryview]) -> None:
+        """Write `data` starting at byte `offset` as a single crash-consistent transaction."""
+        data = bytes(data)
+        assert 0 <= offset and offset + len(data) <= self.size
+        if data:
+            self._write(offset, data, sync=self.fsync)
+
+    def _write(self, offset: int, data: bytes, sync: bool) -> None:
+        # the record reaches the operating system before the image changes, so it survives the process
+        self._journal.write(journal_record(offset, data))
+        self._journal.flush()
+        self._unsynced = True
+        if sync:
+            self.sync()
+        self._apply(offset, data)
+        if self._journal.tell() > self.journal_limit:
+            self.flush()
+
+    def sync(self) -> None:
+        """Force the journal to disk, which makes all writes so far durable."""
+        if self._unsynced:
+            os.fsync(self._journal.fileno())
+            self._unsynced = False
+
+    def _apply(self, offset: int, data: bytes) -> None:
+        self._mmap[offset : offset + len(data)] = data
+        self._dirty.update(range(offset // self.page_size, (offset + len(data) - 1) // self.page_size + 1))
+
+    def flush(self) -> None:
+        """Flush the dirty pages of the image to disk and empty the journal (a checkpoint)."""
+        for page in sorted(self._dirty):
+            start = page * self.page_size
+            self._mmap.flush(start, min(self.page_size, self.size - start))
+        self._dirty.clear()
+        self._journal.seek(0)
+        self._journal.truncate()
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._unsynced = False
+
+    def recover(self) -> int:
+        """Replay the complete records in the journal onto the image and return how many were replayed.
+
+        Replay stops at the first torn or corrupt record, which belongs to a write that never completed.
+        """
+        self._journal.seek(0)
+        journal = self._journal.read()
+        position = replayed = 0
+        while position + JOURNAL_HEADER.size <= len(journal):
+            magic, offset, length, checksum = JOURNAL_HEADER.unpack_from(journal, position)
+            data = journal[position + JOURNAL_HEADER.size : position + JOURNAL_HEADER.size + length]
+            if magic != JOURNAL_MAGIC or len(data) != length or _checksum(offset, data) != checksum:
+                break
+            if offset + length <= self.size:
+                self._apply(offset, data)
+                replayed += 1
+            position += JOURNAL_HEADER.size + length
+        self.flush()
+        return replayed
+
+    def close(self) -> None:
+        """Checkpoint and close the memory."""
+        if self._mmap.closed:
+            return
+        self.flush()
+        self._mmap.close()
+        self._file.close()
+        self._journal.close()
+
+    def __enter__(self) -> "PersistentMemory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self):
+        return f"PersistentMemory({self.path!r}, size={self.size})"
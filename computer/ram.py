@@ -5,7 +5,10 @@ https://www.youtube.com/watch?v=fpnE6UAfbtU&list=PLH2l6uzC4UEW0s7-KewFLBC1D0l6XR
 
 import math
 
-from typing import Tuple
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
 from computer.bits_and_bytes import Bit, BitString, Byte
 from computer.gates import AND, NOT, OR
 
@@ -59,20 +62,46 @@ class GatedLatch():
         set, reset = self.gate(data, write_enable)
         self.and_or_latch.write(set, reset)
 
+    def __reduce__(self):
+        # pickle the stored bit only, the latch and gate objects are rebuilt on load
+        return (_gated_latch, (self.read(),))
+
     def __repr__(self) -> str:
         return f"GatedLatch({self.and_or_latch.is_set})"
 
 
+def _gated_latch(bit: Bit) -> GatedLatch:
+    """Return a new `GatedLatch` that stores `bit`."""
+    latch = GatedLatch()
+    latch.and_or_latch.is_set = bit
+    return latch
+
+
 class LinearRegister():
-    def __init__(self) -> None:
+    def __init__(self, width: int = 8) -> None:
         """A single `width` long linear register.
         
         These linear registers are inefficient in terms of wires needed.
         
         For a 256-bit linear register we need 513 wires in the linear construction;
         256 wires running to the data pins and 256 running to the outputs along with 1 write enable wire.
+
+        Every bit is stored in its own `GatedLatch` and all latches share the write enable wire.
         """
-        pass
+        self.width = width
+        self.latches = [GatedLatch() for _ in range(width)]
+
+    def read(self) -> BitString:
+        word_type = Byte if self.width == 8 else BitString
+        return word_type.from_bits(latch.read() for latch in self.latches)
+
+    def write(self, data: BitString, write_enable: Bit):
+        assert len(data) == self.width
+        for latch, bit in zip(self.latches, data):
+            latch.write(bit, write_enable)
+
+    def __repr__(self):
+        return f"LinearRegister({self.read()})"
 
 
 class MatrixRegister():
@@ -106,7 +135,9 @@ class MatrixRegister():
 
     def read(self, row: int, col: int, read_enable: Bit) -> Bit:
         """Read data from the register address at `(row, col)` indexed by a multiplexer."""
-        selected = AND(row, col)
+        # the multiplexers drive only the wires of the addressed row and column high
+        row_wire, col_wire = Bit(1), Bit(1)
+        selected = self.and_gates_r[row][col](row_wire, col_wire)
         read_enabled = AND(selected, read_enable)
         if read_enabled:
             return self.latches[row][col].read()
@@ -116,10 +147,92 @@ class MatrixRegister():
         """Write `data` to the register address at `(row, col)` indexed by a MultiPlexer."""
         return self.latches[row][col].write(data, write_enable)
 
+    def __reduce__(self):
+        # pickle the bits packed into bytes as a `PackedMatrixRegister` stores them, instead of width^2 latch objects
+        bits = [bool(latch.read()) for row in self.latches for latch in row]
+        return (_matrix_register, (self.width, np.packbits(bits).tobytes()))
+
     def __repr__(self):
         return f"MatrixRegister(width={self.width})"
 
 
+def _matrix_register(width: int, packed: bytes) -> MatrixRegister:
+    """Return a new `MatrixRegister` of `width` storing the bits `packed` in row major order."""
+    register = MatrixRegister(width)
+    bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=width * width)
+    for index in np.flatnonzero(bits).tolist():
+        register.latches[index // width][index % width].and_or_latch.is_set = Bit(1)
+    return register
+
+
+class PackedMatrixRegister():
+    def __init__(self, width: int = 16) -> None:
+        """A `width` by `width` matrix register that stores its `width^2` bits in a single bit-packed buffer.
+
+        It reads and writes exactly like a `MatrixRegister` but holds the state of all latches in one `bytearray`
+        instead of one `GatedLatch` object per bit. The latch at `(row, col)` is bit `row * width + col` of the buffer,
+        counted from the most significant bit of the first byte. This takes `width^2 / 8` bytes and constructs in
+        constant time, which makes registers of width 256 and more practical.
+        """
+        self.width = width
+        self.buffer = bytearray((width * width + 7) // 8)
+
+    def _index(self, row: int, col: int) -> int:
+        assert 0 <= row < self.width and 0 <= col < self.width, f"({row}, {col}) is outside of the register"
+        return row * self.width + col
+
+    def read(self, row: int, col: int, read_enable: Bit) -> Bit:
+        """Read data from the register address at `(row, col)` indexed by a multiplexer."""
+        index = self._index(row, col)
+        if read_enable:
+            return Bit(1) if self.buffer[index >> 3] & (0x80 >> (index & 7)) else Bit(0)
+        return Bit(0)
+
+    def write(self, row: int, col: int, data: Bit, write_enable: Bit) -> None:
+        """Write `data` to the register address at `(row, col)` indexed by a MultiPlexer."""
+        index = self._index(row, col)
+        if write_enable:
+            if data:
+                self.buffer[index >> 3] |= 0x80 >> (index & 7)
+            else:
+                self.buffer[index >> 3] &= ~(0x80 >> (index & 7)) & 0xFF
+
+    def read_range(self, start: int, count: int) -> np.ndarray:
+        """Return the `count` bits from latch index `start = row * width + col` onwards as a boolean array."""
+        assert 0 <= start and start + count <= self.width * self.width
+        first, last = start >> 3, (start + count + 7) >> 3
+        bits = np.unpackbits(np.frombuffer(self.buffer, dtype=np.uint8, count=last - first, offset=first))
+        return bits[start - 8 * first : start - 8 * first + count].astype(bool)
+
+    def write_range(self, start: int, bits: np.ndarray) -> None:
+        """Store a boolean array of bits from latch index `start = row * width + col` onwards."""
+        assert 0 <= start and start + len(bits) <= self.width * self.width
+        first, last = start >> 3, (start + len(bits) + 7) >> 3
+        unpacked = np.unpackbits(np.frombuffer(self.buffer, dtype=np.uint8, count=last - first, offset=first))
+        unpacked[start - 8 * first : start - 8 * first + len(bits)] = bits
+        self.buffer[first:last] = np.packbits(unpacked).tobytes()
+
+    def read_bits(self, indices: np.ndarray) -> np.ndarray:
+        """Return the bits at an array of latch indices `row * width + col` as a boolean array of the same shape."""
+        indices = np.asarray(indices)
+        assert indices.size == 0 or (0 <= indices.min() and indices.max() < self.width * self.width)
+        buffer = np.frombuffer(self.buffer, dtype=np.uint8)
+        return (buffer[indices >> 3] & (0x80 >> (indices & 7))) != 0
+
+    def write_bits(self, indices: np.ndarray, bits: np.ndarray) -> None:
+        """Store a boolean array of `bits` at an array of distinct latch indices `row * width + col`."""
+        indices, bits = np.asarray(indices).ravel(), np.asarray(bits, dtype=bool).ravel()
+        assert indices.size == 0 or (0 <= indices.min() and indices.max() < self.width * self.width)
+        buffer = np.frombuffer(self.buffer, dtype=np.uint8)  # a writable view, bytearrays are mutable
+        masks = (0x80 >> (indices & 7)).astype(np.uint8)
+        # several bits can share a byte, which `at` updates once for each of them
+        np.bitwise_or.at(buffer, indices[bits] >> 3, masks[bits])
+        np.bitwise_and.at(buffer, indices[~bits] >> 3, ~masks[~bits])
+
+    def __repr__(self):
+        return f"PackedMatrixRegister(width={self.width})"
+
+
 class MultiPlexer():
     def __init__(self, width: int = 16) -> None:
         """A multiplexer that converts binary addresses to column and row indexes into the register.
@@ -147,23 +260,80 @@ class MultiPlexer():
         Returns:
             str: the binary value 
         """
+        assert width > 0 and width & (width - 1) == 0, "The width must be a power of two"
         self.width = width
-        self.address_bits = int(math.sqrt(width))
+        self.address_bits = int(math.log2(width))
 
-    def binary2int(self, binary: str):
-        """Convert binary representation of integer as a string to an integer type."""
-        return int(binary, 2)
+    def binary2int(self, binary: Union[str, BitString]):
+        """Convert binary representation of integer as a string or bit string to an integer type."""
+        return int(binary, 2) if isinstance(binary, str) else int(binary)
 
-    def select(self, address: BitString) -> int:
+    def select(self, address: Union[str, BitString, int]) -> int:
         """Converts a memory address to an interger wire index."""
-        assert len(address) == self.address_bits
-        idx = self.binary2int(address)
-        return idx
+        if not isinstance(address, int):
+            assert len(address) == self.address_bits
+            address = self.binary2int(address)
+        assert 0 <= address < self.width
+        return address
 
 
-class MemoryCell():
+class Decoder():
     def __init__(self, width: int = 16) -> None:
-        """A unit of memory comprising a register and two multiplexers.
+        """An address decoder that selects one row and one column wire of a `width` by `width` matrix register.
+
+        A memory address holds the row in its upper and the column in its lower `log2(width)` bits. The decoder
+        precomputes the one-hot select wires of every row and column once, so decoding an address is a shift, a mask
+        and a table lookup. Arrays of addresses are decoded in a single vectorized call.
+        """
+        assert width > 0 and width & (width - 1) == 0, "The width must be a power of two"
+        self.width = width
+        self.address_bits = int(math.log2(width))
+        self.precision = 2 * self.address_bits
+        self.mask = width - 1
+        self.one_hot = tuple(tuple(Bit(int(i == j)) for j in range(width)) for i in range(width))
+        self.one_hot_table = np.eye(width, dtype=bool)
+
+    def _int(self, address: Union[int, BitString]) -> int:
+        if isinstance(address, BitString):
+            assert len(address) == self.precision
+        address = int(address)
+        assert 0 <= address < self.width * self.width, f"Address {address} is outside of the register"
+        return address
+
+    def decode(self, address: Union[int, BitString]) -> Tuple[int, int]:
+        """Return the row and column index of an address given as an integer, `Byte` or `BitString`."""
+        address = self._int(address)
+        return address >> self.address_bits, address & self.mask
+
+    def select(self, address: Union[int, BitString]) -> Tuple[Tuple[Bit, ...], Tuple[Bit, ...]]:
+        """Return the one-hot row and column select wires of an address."""
+        row, col = self.decode(address)
+        return self.one_hot[row], self.one_hot[col]
+
+    def decode_batch(self, addresses: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the row and column indices of an array of integer addresses."""
+        addresses = np.asarray(addresses)
+        assert np.all((0 <= addresses) & (addresses < self.width * self.width)), "Addresses outside of the register"
+        return addresses >> self.address_bits, addresses & self.mask
+
+    def select_batch(self, addresses: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the one-hot row and column select wires of an array of addresses as boolean arrays.
+
+        The select wires are added as a last axis of size `width`.
+        """
+        rows, cols = self.decode_batch(addresses)
+        return self.one_hot_table[rows], self.one_hot_table[cols]
+
+    def __repr__(self):
+        return f"Decoder(width={self.width})"
+
+
+REGISTER_STORAGE = dict(latches=MatrixRegister, packed=PackedMatrixRegister)
+
+
+class MemoryCell():
+    def __init__(self, width: int = 16, storage: str = "latches") -> None:
+        """A unit of memory comprising a register and an address decoder.
 
         one write enable wire
         one read enable wire
@@ -171,43 +341,143 @@ class MemoryCell():
         one wire for each row
         one wire for each column
         and gate for row+column selection
+
+        The register stores its bits in `GatedLatch`es with `storage="latches"` or in a single bit-packed buffer with
+        `storage="packed"`.
         """
-        self.row_multiplexer = MultiPlexer(width)
-        self.col_multiplexer = MultiPlexer(width)
-        self.register = MatrixRegister(width)  # width ^ 2 bits of memory
-
-    def read(self, address: Byte, read_enable: str):
-        row_address = address[:4]
-        col_address = address[4:]
-        row_idx = self.row_multiplexer.select(row_address)
-        col_idx = self.col_multiplexer.select(col_address)
+        self.decoder = Decoder(width)
+        self.register = REGISTER_STORAGE[storage](width)  # width ^ 2 bits of memory
+
+    def read(self, address: Union[int, BitString], read_enable: Bit) -> Bit:
+        row_idx, col_idx = self.decoder.decode(address)
         return self.register.read(row_idx, col_idx, read_enable)
 
-    def write(self, address: str, data: str, write_enable: str):
-        row_address = address[:4]
-        col_address = address[4:]
-        row_idx = self.row_multiplexer.select(row_address)
-        col_idx = self.col_multiplexer.select(col_address)
+    def write(self, address: Union[int, BitString], data: Bit, write_enable: Bit):
+        row_idx, col_idx = self.decoder.decode(address)
         return self.register.write(row_idx, col_idx, data, write_enable)
 
+    def read_batch(self, addresses: np.ndarray, read_enable: Bit) -> np.ndarray:
+        """Read the bits at an array of addresses into a boolean array, the same as one `read` per address."""
+        rows, cols = self.decoder.decode_batch(addresses)
+        if not read_enable:
+            return np.zeros(rows.shape, dtype=bool)
+        if isinstance(self.register, PackedMatrixRegister):
+            return self.register.read_bits(rows * self.decoder.width + cols)
+        bits = [self.register.read(int(row), int(col), read_enable) for row, col in zip(rows.ravel(), cols.ravel())]
+        return np.array([bool(bit) for bit in bits], dtype=bool).reshape(rows.shape)
+
+    def write_batch(self, addresses: np.ndarray, data: np.ndarray, write_enable: Bit) -> None:
+        """Write an array of bits to an array of addresses, the same as one `write` per address in order."""
+        rows, cols = self.decoder.decode_batch(addresses)
+        data = np.broadcast_to(np.asarray(data, dtype=bool), rows.shape)
+        if not write_enable:
+            return
+        if isinstance(self.register, PackedMatrixRegister):
+            indices = (rows * self.decoder.width + cols).ravel()
+            # later writes to the same address win, like they would one after the other
+            last = len(indices) - 1 - np.unique(indices[::-1], return_index=True)[1]
+            self.register.write_bits(indices[last], data.ravel()[last])
+            return
+        for row, col, bit in zip(rows.ravel(), cols.ravel(), data.ravel()):
+            self.register.write(int(row), int(col), Bit(bool(bit)), write_enable)
+
 
 class SRAM():
-    def __init__(self, n_registers: int = 16, register_width: int = 16, precision: int = 8) -> None:
+    def __init__(
+        self, n_registers: int = 16, register_width: int = 16, precision: int = 8, storage: str = "latches"
+    ) -> None:
         """A unit of Static Random Access Memory which uses latches
         
         A `width^2` by `n_registers` bit memory cell that can store `n_registers` bits at each of the 
         `width^2` addresses.
+
+        A word of `n_registers` bits is stored across the memory cells with bit `k` of the word in cell `k`, all at
+        the same address. Addresses are `precision` bits, i.e. `2 * log2(register_width)`.
+
+        Every enabled write calls the functions in `observers` with the address and number of words written, e.g. so
+        that a CPU can drop the instructions it decoded from that memory.
         """
+        assert precision == Decoder(register_width).precision, "Addresses must select a row and a column"
+        self.n_registers = n_registers
+        self.register_width = register_width
+        self.precision = precision
+        self.storage = storage
+        self.decoder = Decoder(register_width)
+        self.observers: List[Callable[[int, int], None]] = []
         self.cells = dict()
         for address in range(n_registers):
-            self.cells[address] = MemoryCell(register_width)
-
-    def write(self, address: str, data: str, write_enable: str):
-        """Write..."""
-        pass
-        # for cell in self.cells:
-        #     cell.write(address, )
+            self.cells[address] = MemoryCell(register_width, storage)
+
+    @property
+    def n_addresses(self) -> int:
+        return self.register_width ** 2
+
+    @property
+    def word_bytes(self) -> int:
+        assert self.n_registers % 8 == 0, "Block transfers need words of whole bytes"
+        return self.n_registers // 8
+
+    def write(self, address: Union[int, BitString], data: BitString, write_enable: Bit):
+        """Write the `n_registers` bit word `data` to `address` if `write_enable` is on."""
+        assert len(data) == self.n_registers
+        # the cells share their address wires so the address is decoded once for all of them
+        row, col = self.decoder.decode(address)
+        for k, bit in enumerate(data):
+            self.cells[k].register.write(row, col, bit, write_enable)
+        if write_enable:
+            for observer in self.observers:
+                observer(row * self.register_width + col, 1)
+
+    def read(self, address: Union[int, BitString], read_enable: Bit) -> BitString:
+        """Read the `n_registers` bit word at `address`, all zeros unless `read_enable` is on."""
+        row, col = self.decoder.decode(address)
+        word_type = Byte if self.n_registers == 8 else BitString
+        return word_type.from_bits(self.cells[k].register.read(row, col, read_enable) for k in range(self.n_registers))
+
+    def read_block(
+        self, address: int, count: int, read_enable: Bit = Bit(1), out: Optional[Union[bytearray, memoryview]] = None
+    ) -> Union[bytes, bytearray, memoryview]:
+        """Read the `count` words from `address` onwards as bytes, the same as `count` calls to `read`.
+
+        Each word takes `n_registers / 8` bytes, big-endian. The bytes are written into `out` if it is given.
+        """
+        assert 0 <= address and address + count <= self.n_addresses
+        if not read_enable:
+            data = bytes(count * self.word_bytes)
+        elif self.storage == "packed":
+            bits = np.stack([self.cells[k].register.read_range(address, count) for k in range(self.n_registers)], 1)
+            data = np.packbits(bits, axis=1).tobytes()
+        else:
+            data = b"".join(self.read(address + i, read_enable).to_bytes() for i in range(count))
+        if out is None:
+            return data
+        out[: len(data)] = data
+        return out
+
+    def write_block(
+        self, address: int, data: Union[bytes, bytearray, memoryview], write_enable: Bit = Bit(1)
+    ) -> None:
+        """Write the words in `data` to `address` onwards, the same as one call to `write` per word.
+
+        Each word takes `n_registers / 8` bytes, big-endian.
+        """
+        assert len(data) % self.word_bytes == 0
+        count = len(data) // self.word_bytes
+        assert 0 <= address and address + count <= self.n_addresses
+        if not write_enable:
+            return
+        if self.storage == "packed":
+            words = np.frombuffer(data, dtype=np.uint8).reshape(count, self.word_bytes)
+            bits = np.unpackbits(words, axis=1).astype(bool)
+            for k in range(self.n_registers):
+                self.cells[k].register.write_range(address, bits[:, k])
+            for observer in self.observers:
+                observer(address, count)
+        else:
+            data = bytes(data)
+            for i in range(count):
+                word = data[i * self.word_bytes : (i + 1) * self.word_bytes]
+                self.write(address + i, BitString.from_bytes(word), write_enable)
 
-    def read(self, address: str, read_enable: str):
-        """Read... """
-        pass
+    def __repr__(self):
+        return f"SRAM(n_registers={self.n_registers}, register_width={self.register_width}, storage={self.storage!r})"
@@ -0,0 +1,261 @@
+"""Sharded random access memory
+
+A memory with the interface of an `SRAM` whose address space is partitioned into contiguous shards, each owned by a
+worker process. The state of every shard lives in `multiprocessing.shared_memory`, one byte per latch, so the front-end
+object reads single words straight from the shards without copying them or asking a worker.
+
+Batches of accesses are staged in one more shared memory block and all workers are told to process the batch at
+once. Each worker picks out the accesses to its own shard and gathers or scatters them in place, so a stream of
+accesses is processed by as many cores as there are shards.
+
+https://docs.python.org/3/library/multiprocessing.shared_memory.html
+"""
+
+import multiprocessing
+import os
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from computer.bits_and_bytes import Bit, BitString, Byte
+from computer.ram import Decoder
+from computer.utils.conversion import bits2ints, ints2bits
+
+
+def _staged(buffer: memoryview, count: int, width: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the addresses, enables and word bits of a batch of `count` accesses staged in `buffer`."""
+    addresses = np.ndarray((count,), dtype=np.uint64, buffer=buffer)
+    enables = np.ndarray((count,), dtype=bool, buffer=buffer, offset=8 * count)
+    bits = np.ndarray((count, width), dtype=bool, buffer=buffer, offset=9 * count)
+    return addresses, enables, bits
+
+
+def _gather(state: np.ndarray, start: int, addresses: np.ndarray, enables: np.ndarray, bits: np.ndarray) -> None:
+    """Read the words of the accesses to the shard of addresses `start` onwards into `bits`, zeros if not enabled."""
+    mask = (addresses >= start) & (addresses < start + len(state))
+    bits[mask] = state[(addresses[mask] - np.uint64(start)).astype(np.intp)] & enables[mask, None]
+
+
+def _scatter(state: np.ndarray, start: int, addresses: np.ndarray, enables: np.ndarray, bits: np.ndarray) -> None:
+    """Write the words in `bits` of the enabled accesses to the shard of addresses `start` onwards, in order."""
+    mask = (addresses >= start) & (addresses < start + len(state)) & enables
+    offsets = (addresses[mask] - np.uint64(start)).astype(np.intp)
+    # later writes to the same address win, like they would one after the other
+    last = len(offsets) - 1 - np.unique(offsets[::-1], return_index=True)[1]
+    state[offsets[last]] = bits[mask][last]
+
+
+OPERATIONS: Dict[str, Callable] = dict(read=_gather, write=_scatter)
+
+
+def _serve(connection: Connection, name: str, shape: Tuple[int, int], start: int) -> None:
+    """Process the batches of accesses sent over `connection` to the shard held in the shared memory `name`."""
+    memory = SharedMemory(name)
+    state = np.ndarray(shape, dtype=bool, buffer=memory.buf)
+    staging: Optional[SharedMemory] = None
+    try:
+        while (message := connection.recv()) is not None:
+            operation, staging_name, count = message
+            if staging is None or staging.name != staging_name:
+                if staging is not None:
+                    staging.close()
+                staging = SharedMemory(staging_name)
+            addresses, enables, bits = _staged(staging.buf, count, shape[1])
+            OPERATIONS[operation](state, start, addresses, enables, bits)
+            del addresses, enables, bits
+            connection.send(True)
+    finally:
+        del state
+        memory.close()
+        if staging is not None:
+            staging.close()
+
+
+class ShardedSRAM():
+    def __init__(
+        self,
+        n_registers: int = 16,
+        register_width: int = 16,
+        precision: int = 8,
+        n_shards: Optional[int] = None,
+        processes: bool = True,
+    ) -> None:
+        """A memory of `register_width^2` words of `n_registers` bits, partitioned into shards of contiguous addresses.
+
+        It reads and writes exactly like an `SRAM`, and `read_batch` and `write_batch` access whole arrays of
+        addresses at once, spread over one worker process per shard. The memory holds shared memory blocks and
+        processes until it is closed, e.g. by using it as a context manager.
+
+        Args:
+            n_registers (int): Number of bits in a word.
+            register_width (int): Width of the matrix registers, which holds `register_width^2` words.
+            precision (int): Number of bits of an address, `2 * log2(register_width)`.
+            n_shards (int): Number of shards. Defaults to the number of CPUs.
+            processes (bool): Start a worker process per shard. Without them batches are processed one shard after
+                the other by the front-end, which is faster for small batches and on a single core.
+        """
+        self.decoder = Decoder(register_width)
+        assert precision == self.decoder.precision, "Addresses must select a row and a column"
+        self.n_registers = n_registers
+        self.register_width = register_width
+        self.precision = precision
+        self.n_shards = min(os.cpu_count() if n_shards is None else n_shards, self.n_addresses)
+        self.shard_size = -(-self.n_addresses // self.n_shards)
+        self.observers: List[Callable[[int, int], None]] = []
+
+        self._memories: List[SharedMemory] = []
+        self.shards: List[np.ndarray] = []
+        for start in range(0, self.n_addresses, self.shard_size):
+            size = min(self.shard_size, self.n_addresses - start)
+            memory = SharedMemory(create=True, size=size * n_registers)
+            self._memories.append(memory)
+            self.shards.append(np.ndarray((size, n_registers), dtype=bool, buffer=memory.buf))
+            self.shards[-1][:] = False
+        # ceil-sized shards can cover the addresses with fewer shards than requested
+        self.n_shards = len(self.shards)
+
+        self._staging: Optional[SharedMemory] = None
+        self._workers: List[Tuple[multiprocessing.Process, Connection]] = []
+        if processes:
+            for k, (memory, shard) in enumerate(zip(self._memories, self.shards)):
+                connection, worker_connection = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=_serve,
+                    args=(worker_connection, memory.name, shard.shape, k * self.shard_size),
+                    daemon=True,
+                )
+                process.start()
+                self._workers.append((process, connection))
+
+    @property
+    def n_addresses(self) -> int:
+        return self.register_width ** 2
+
+    @property
+    def word_bytes(self) -> int:
+        assert self.n_registers % 8 == 0, "Block transfers need words of whole bytes"
+        return self.n_registers // 8
+
+    def _locate(self, address: Union[int, BitString]) -> Tuple[int, np.ndarray, int]:
+        """Return the integer address, the shard holding it and the offset of the address in the shard."""
+        row, col = self.decoder.decode(address)
+        address = row * self.register_width + col
+        return address, self.shards[address // self.shard_size], address % self.shard_size
+
+    def read(self, address: Union[int, BitString], read_enable: Bit) -> BitString:
+        """Read the `n_registers` bit word at `address`, all zeros unless `read_enable` is on."""
+        _, shard, offset = self._locate(address)
+        word_type = Byte if self.n_registers == 8 else BitString
+        if not read_enable:
+            return word_type._new(0, self.n_registers)
+        value = int.from_bytes(np.packbits(shard[offset]).tobytes(), "big") >> (-self.n_registers % 8)
+        return word_type._new(value, self.n_registers)
+
+    def write(self, address: Union[int, BitString], data: BitString, write_enable: Bit) -> None:
+        """Write the `n_registers` bit word `data` to `address` if `write_enable` is on."""
+        assert len(data) == self.n_registers
+        address, shard, offset = self._locate(address)
+        if write_enable:
+            shard[offset] = [bool(bit) for bit in data]
+            for observer in self.observers:
+                observer(address, 1)
+
+    def _stage(self, addresses: np.ndarray, enables: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Copy a batch of accesses into the staging block, growing it if needed, and return the staged arrays."""
+        count = len(addresses)
+        size = max(count * (9 + self.n_registers), 1)
+        if self._staging is None or self._staging.size < size:
+            if self._staging is not None:
+                self._staging.close()
+                self._staging.unlink()
+            # grow geometrically so that a stream of growing batches does not reallocate every time
+            previous = 0 if self._staging is None else self._staging.size
+            self._staging = SharedMemory(create=True, size=max(size, 2 * previous))
+        staged = _staged(self._staging.buf, count, self.n_registers)
+        staged[0][:] = addresses
+        staged[1][:] = enables
+        return staged
+
+    def _run(self, operation: str, staged: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+        """Process the staged batch on every shard, in the worker processes if there are any."""
+        if not self._workers:
+            for k, shard in enumerate(self.shards):
+                OPERATIONS[operation](shard, k * self.shard_size, *staged)
+            return
+        for _, connection in self._workers:
+            connection.send((operation, self._staging.name, len(staged[0])))
+        for _, connection in self._workers:
+            connection.recv()
+
+    def _addresses(self, addresses: np.ndarray) -> np.ndarray:
+        rows, cols = self.decoder.decode_batch(np.asarray(addresses, dtype=np.int64))
+        return (rows * self.register_width + cols).astype(np.uint64)
+
+    def _enables(self, enable: Union[Bit, np.ndarray], addresses: np.ndarray) -> np.ndarray:
+        """Return one enable per access from a single `Bit` or an array of them."""
+        enable = bool(enable) if isinstance(enable, Bit) else np.asarray(enable, dtype=bool)
+        return np.broadcast_to(enable, addresses.shape)
+
+    def read_batch(self, addresses: np.ndarray, read_enable: Union[Bit, np.ndarray] = Bit(1)) -> np.ndarray:
+        """Read the words at an array of addresses as unsigned integers, the same as one `read` per address."""
+        addresses = self._addresses(addresses)
+        staged = self._stage(addresses, self._enables(read_enable, addresses))
+        self._run("read", staged)
+        return bits2ints(staged[2]).astype(np.uint64)
+
+    def write_batch(
+        self, addresses: np.ndarray, data: np.ndarray, write_enable: Union[Bit, np.ndarray] = Bit(1)
+    ) -> None:
+        """Write an array of unsigned integer words to an array of addresses, the same as one `write` per address."""
+        addresses = self._addresses(addresses)
+        enables = self._enables(write_enable, addresses)
+        staged = self._stage(addresses, enables)
+        staged[2][:] = ints2bits(np.asarray(data, dtype=np.uint64), self.n_registers)
+        self._run("write", staged)
+        if self.observers:
+            for address in np.unique(addresses[enables]):
+                for observer in self.observers:
+                    observer(int(address), 1)
+
+    def read_block(self, address: int, count: int, read_enable: Bit = Bit(1)) -> bytes:
+        """Read the `count` words from `address` onwards as bytes, `n_registers / 8` big-endian bytes per word."""
+        assert 0 <= address and address + count <= self.n_addresses
+        words = self.read_batch(np.arange(address, address + count), read_enable)
+        return np.packbits(ints2bits(words, self.n_registers), axis=1).tobytes()
+
+    def write_block(
+        self, address: int, data: Union[bytes, bytearray, memoryview], write_enable: Bit = Bit(1)
+    ) -> None:
+        """Write the words in `data` to `address` onwards, `n_registers / 8` big-endian bytes per word."""
+        assert len(data) % self.word_bytes == 0
+        count = len(data) // self.word_bytes
+        assert 0 <= address and address + count <= self.n_addresses
+        words = np.frombuffer(data, dtype=np.uint8).reshape(count, self.word_bytes)
+        self.write_batch(np.arange(address, address + count), bits2ints(np.unpackbits(words, axis=1)), write_enable)
+
+    def close(self) -> None:
+        """Stop the workers and release the shared memory."""
+        for process, connection in self._workers:
+            connection.send(None)
+            process.join()
+            connection.close()
+        self._workers = []
+        self.shards = []
+        for memory in self._memories + ([self._staging] if self._staging is not None else []):
+            memory.close()
+            memory.unlink()
+        self._memories, self._staging = [], None
+
+    def __enter__(self) -> "ShardedSRAM":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self):
+        return (
+            f"ShardedSRAM(n_registers={self.n_registers}, register_width={self.register_width}, "
+            f"n_shards={self.n_shards})"
+        )
@@ -0,0 +1,249 @@
+"""Event-driven simulation of gate networks
+
+The classes in `computer.ram` recompute every one of their gates whenever they are written. The `Simulator` instead
+keeps the value of every wire ("net") in a network of gates and only re-evaluates the gates whose inputs changed.
+Evaluation proceeds in delta cycles: all gates triggered by the changes of one delta cycle are evaluated on the values
+from that cycle, and the nets whose values change as a result trigger their fan-out in the next one. This settles
+feedback loops like the one in the AND-OR latch and makes the cost of a change proportional to the activity it causes.
+
+https://en.wikipedia.org/wiki/Discrete-event_simulation
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from computer.bits_and_bytes import Bit
+from computer.gates import AND, NOT, OR
+from computer.netlist import Netlist
+
+
+GATES: Dict[str, Callable] = dict(AND=AND, OR=OR, NOT=NOT)
+
+
+class Simulator():
+    def __init__(self, max_deltas: int = 1000) -> None:
+        """An event-driven simulator of a network of primitive gates.
+
+        Args:
+            max_deltas (int): Number of delta cycles after which a network that keeps changing (e.g. a NOT gate
+                feeding itself) is considered to oscillate.
+        """
+        self.max_deltas = max_deltas
+        self.values: List[Bit] = []
+        self.names: List[Optional[str]] = []
+        self.fan_out: List[List[int]] = []
+        self.drivers: List[Optional[int]] = []
+        self.gates: List[Tuple[Callable, Tuple[int, ...], int]] = []
+        self.evaluations = 0
+        self.events = 0
+        self._pending: Set[int] = set()
+
+    def net(self, name: Optional[str] = None, value: Bit = Bit(0)) -> int:
+        """Add a net (wire) with an initial `value` and return its index."""
+        self.values.append(value)
+        self.names.append(name)
+        self.fan_out.append([])
+        self.drivers.append(None)
+        return len(self.values) - 1
+
+    def gate(self, kind: str, inputs: Sequence[int], output: Optional[int] = None) -> int:
+        """Add a gate of the given `kind` ("AND", "OR" or "NOT") driving `output` and return the output net.
+
+        A new net is created if no `output` is given. The gate is evaluated on the next `settle`.
+        """
+        output = self.net() if output is None else output
+        assert self.drivers[output] is None, f"Net {output} already has a driver"
+        index = len(self.gates)
+        self.gates.append((GATES[kind], tuple(inputs), output))
+        self.drivers[output] = index
+        for net in inputs:
+            self.fan_out[net].append(index)
+        self._pending.add(index)
+        return output
+
+    def add_netlist(self, netlist: Netlist, inputs: Sequence[Any]) -> Any:
+        """Add the gates of a combinational `netlist` fed by the `inputs` nets and return its output nets.
+
+        `inputs` holds one net per bit input and a list of nets per word input of the netlist. The outputs are
+        returned in the structure of the traced circuit with a net in place of every bit and a list of nets for
+        every word. Constant outputs are returned as `Bit`s.
+        """
+        nets = dict()
+        for spec, net in zip(netlist.inputs, inputs):
+            if isinstance(spec, int):
+                nets[spec] = net
+            else:
+                nets.update(zip(spec, net))
+        for node in netlist.topological_order():
+            kind, *sources = netlist.nodes[node]
+            nets[node] = self.gate(kind, [nets[source] for source in sources])
+
+        def outputs(output):
+            if isinstance(output, tuple) and output and output[0] == "WORD":
+                return [nets[node] if isinstance(node, int) else node for node in output[2]]
+            if isinstance(output, tuple):
+                return tuple(outputs(value) for value in output)
+            return nets[output] if isinstance(output, int) else output
+
+        return outputs(netlist.outputs)
+
+    def get(self, net: int) -> Bit:
+        return self.values[net]
+
+    def set(self, net: int, value: Bit) -> None:
+        """Drive an input `net` to `value`, scheduling its fan-out if the value changes."""
+        assert self.drivers[net] is None, f"Net {net} is driven by a gate"
+        self._update(net, value)
+
+    def _update(self, net: int, value: Bit) -> None:
+        if self.values[net] is not value:
+            self.values[net] = value
+            self.events += 1
+            self._pending.update(self.fan_out[net])
+
+    def settle(self) -> int:
+        """Propagate all pending changes until the network is stable and return the number of delta cycles."""
+        values = self.values
+        deltas = 0
+        while self._pending:
+            if deltas == self.max_deltas:
+                raise RuntimeError(f"The network did not settle within {self.max_deltas} delta cycles")
+            triggered, self._pending = self._pending, set()
+            changes = []
+            for index in triggered:
+                function, inputs, output = self.gates[index]
+                changes.append((output, function(*[values[net] for net in inputs])))
+            self.evaluations += len(triggered)
+            for net, value in changes:
+                self._update(net, value)
+            deltas += 1
+        return deltas
+
+    def __repr__(self):
+        return f"Simulator(nets={len(self.values)}, gates={len(self.gates)})"
+
+
+class AndOrLatchComponent():
+    def __init__(self, simulator: Simulator, set: Optional[int] = None, reset: Optional[int] = None) -> None:
+        """An `AndOrLatch` built from gates in an event-driven `simulator`.
+
+        The output is fed back into the OR gate so the latch keeps its value while `set` and `reset` are off.
+        """
+        self.simulator = simulator
+        self.set = simulator.net("set") if set is None else set
+        self.reset = simulator.net("reset") if reset is None else reset
+        self.output = simulator.net("output")
+        set_or_output = simulator.gate("OR", [self.set, self.output])
+        not_reset = simulator.gate("NOT", [self.reset])
+        simulator.gate("AND", [set_or_output, not_reset], self.output)
+        simulator.settle()
+
+    def read(self) -> Bit:
+        return self.simulator.get(self.output)
+
+    def write(self, set: Bit, reset: Bit):
+        self.simulator.set(self.set, set)
+        self.simulator.set(self.reset, reset)
+        self.simulator.settle()
+
+    def __repr__(self):
+        return f"AndOrLatchComponent(output={self.read()})"
+
+
+class GatedLatchComponent():
+    def __init__(self, simulator: Simulator, data: Optional[int] = None, write_enable: Optional[int] = None) -> None:
+        """A `GatedLatch` built from gates in an event-driven `simulator`."""
+        self.simulator = simulator
+        self.data = simulator.net("data") if data is None else data
+        self.write_enable = simulator.net("write_enable") if write_enable is None else write_enable
+        set = simulator.gate("AND", [self.data, self.write_enable])
+        reset = simulator.gate("AND", [simulator.gate("NOT", [self.data]), self.write_enable])
+        self.and_or_latch = AndOrLatchComponent(simulator, set, reset)
+        self.output = self.and_or_latch.output
+
+    def read(self) -> Bit:
+        return self.simulator.get(self.output)
+
+    def write(self, data: Bit, write_enable: Bit):
+        self.simulator.set(self.data, data)
+        self.simulator.set(self.write_enable, write_enable)
+        self.simulator.settle()
+
+    def __repr__(self) -> str:
+        return f"GatedLatchComponent({self.read()})"
+
+
+class MatrixRegisterComponent():
+    def __init__(self, simulator: Simulator, width: int = 16) -> None:
+        """A `MatrixRegister` built from gates in an event-driven `simulator`.
+
+        The data, write enable and read enable wires are first ANDed with each row wire, and the resulting row wires
+        are ANDed with the column wires at every latch. A change on one of the shared wires therefore only reaches the
+        latches of the selected row, and a change of address only the gates of the rows and columns whose wires
+        changed. The selected latch drives the output wire, an OR tree over all latches, when read enable is on.
+        """
+        self.simulator = simulator
+        self.width = width
+        self.rows = [simulator.net(f"row{r}") for r in range(width)]
+        self.cols = [simulator.net(f"col{c}") for c in range(width)]
+        self.data = simulator.net("data")
+        self.write_enable = simulator.net("write_enable")
+        self.read_enable = simulator.net("read_enable")
+        not_data = simulator.gate("NOT", [self.data])
+        self.latches = []
+        outputs = []
+        for r in range(width):
+            row_data = simulator.gate("AND", [self.rows[r], self.data])
+            row_not_data = simulator.gate("AND", [self.rows[r], not_data])
+            row_write_enable = simulator.gate("AND", [self.rows[r], self.write_enable])
+            row_read_enable = simulator.gate("AND", [self.rows[r], self.read_enable])
+            row = []
+            for c in range(width):
+                write_enabled = simulator.gate("AND", [row_write_enable, self.cols[c]])
+                set = simulator.gate("AND", [row_data, write_enabled])
+                reset = simulator.gate("AND", [row_not_data, write_enabled])
+                latch = AndOrLatchComponent(simulator, set, reset)
+                read_enabled = simulator.gate("AND", [row_read_enable, self.cols[c]])
+                outputs.append(simulator.gate("AND", [read_enabled, latch.output]))
+                row.append(latch)
+            self.latches.append(row)
+        while len(outputs) > 1:
+            outputs = [
+                simulator.gate("OR", outputs[i : i + 2]) if i + 1 < len(outputs) else outputs[i]
+                for i in range(0, len(outputs), 2)
+            ]
+        self.output = outputs[0]
+        self._row = self._col = None
+        simulator.settle()
+
+    def _select(self, row: int, col: int):
+        """Drive the wire of the addressed row and column high and all others low."""
+        if row != self._row:
+            if self._row is not None:
+                self.simulator.set(self.rows[self._row], Bit(0))
+            self.simulator.set(self.rows[row], Bit(1))
+            self._row = row
+        if col != self._col:
+            if self._col is not None:
+                self.simulator.set(self.cols[self._col], Bit(0))
+            self.simulator.set(self.cols[col], Bit(1))
+            self._col = col
+
+    def read(self, row: int, col: int, read_enable: Bit) -> Bit:
+        """Read data from the register address at `(row, col)`."""
+        self._select(row, col)
+        self.simulator.set(self.read_enable, read_enable)
+        self.simulator.settle()
+        return self.simulator.get(self.output)
+
+    def write(self, row: int, col: int, data: Bit, write_enable: Bit):
+        """Write `data` to the register address at `(row, col)` with a pulse on the write enable wire."""
+        self._select(row, col)
+        self.simulator.set(self.data, data)
+        self.simulator.settle()
+        self.simulator.set(self.write_enable, write_enable)
+        self.simulator.settle()
+        self.simulator.set(self.write_enable, Bit(0))
+        self.simulator.settle()
+
+    def __repr__(self):
+        return f"MatrixRegisterComponent(width={self.width})"
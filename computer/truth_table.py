@@ -0,0 +1,149 @@
+"""Truth table compilation of combinational circuits
+
+A combinational circuit has no state, so its outputs are fully determined by its inputs. A circuit with few inputs
+can therefore be evaluated once for every possible input and afterwards be served from the resulting truth table
+instead of walking its gates on every call.
+"""
+
+import functools
+import inspect
+import itertools
+import warnings
+from typing import Any, Callable, Optional, Sequence
+
+from computer.artifacts import ArtifactCache
+from computer.bits_and_bytes import Bit, BitString
+
+
+MAX_INPUTS = 16
+
+
+def _inputs(widths: Sequence[int]):
+    """Yield every possible input to a circuit with inputs of the given `widths` (0 meaning a single `Bit`)."""
+    ranges = [(Bit(0), Bit(1)) if width == 0 else range(1 << width) for width in widths]
+    for values in itertools.product(*ranges):
+        yield tuple(
+            value if width == 0 else BitString.from_int(value, width) for value, width in zip(values, widths)
+        )
+
+
+def _copy(output: Any) -> Any:
+    """Copy the mutable bit strings in `output` so that callers cannot modify the table."""
+    if isinstance(output, BitString):
+        return type(output).from_bits(output)
+    if isinstance(output, tuple):
+        return tuple(_copy(value) for value in output)
+    return output
+
+
+def _contains_bitstring(output: Any) -> bool:
+    if isinstance(output, tuple):
+        return any(_contains_bitstring(value) for value in output)
+    return isinstance(output, BitString)
+
+
+def tabulate(circuit: Callable, widths: Sequence[int]) -> list:
+    """Return the outputs of `circuit` for every possible input, in the order of `_inputs`."""
+    return [circuit(*inputs) for inputs in _inputs(widths)]
+
+
+def truth_table(
+    circuit: Optional[Callable] = None,
+    *,
+    widths: Optional[Sequence[int]] = None,
+    max_inputs: int = MAX_INPUTS,
+    strict: bool = False,
+    verify: bool = False,
+    cache: Optional[ArtifactCache] = None,
+) -> Callable:
+    """Compile a combinational `circuit` into a lookup table built from every possible input on its first call.
+
+    Can be used as `@truth_table` or `@truth_table(...)`.
+
+    Args:
+        circuit (Callable): Function of bits and/or bit strings returning a bit, bit string or a tuple of those.
+        widths (Sequence[int]): Width of each input; 0 for a `Bit`. Defaults to one `Bit` per parameter that has no
+            default value.
+        max_inputs (int): Maximum total number of input bits to tabulate, i.e. a table of `2^max_inputs` entries.
+        strict (bool): Raise a `ValueError` for circuits wider than `max_inputs` instead of warning and returning the
+            circuit uncompiled.
+        verify (bool): Also evaluate the original circuit on every call and assert that the table agrees with it.
+        cache (ArtifactCache): Load the table from this cache instead of building it if it was built before, see
+            `computer.artifacts`. The circuit must then be defined at module level.
+
+    Returns:
+        Callable: The compiled circuit. Calls with inputs outside the table (e.g. batched NumPy signals or probes)
+            fall back to the original circuit. The original is available as `.original`, `.build()` (re)builds and
+            returns the table and `.verify()` checks the whole table against the original.
+    """
+    if circuit is None:
+        return functools.partial(
+            truth_table, widths=widths, max_inputs=max_inputs, strict=strict, verify=verify, cache=cache
+        )
+
+    if widths is None:
+        parameters = inspect.signature(circuit).parameters.values()
+        widths = [0 for parameter in parameters if parameter.default is inspect.Parameter.empty]
+    widths = tuple(widths)
+
+    n_inputs = sum(max(width, 1) for width in widths)
+    if n_inputs > max_inputs:
+        message = f"{circuit.__name__} has {n_inputs} input bits which is more than the maximum of {max_inputs}"
+        if strict:
+            raise ValueError(message)
+        warnings.warn(message + ", it is not compiled")
+        return circuit
+
+    table = None
+    copy_outputs = False
+    # the index of every input of circuits of single bits only, by their tuple of interned `Bit`s
+    lookup = dict()
+    shifts = tuple(itertools.accumulate((max(width, 1) for width in reversed(widths[1:])), initial=0))[::-1]
+
+    def build():
+        nonlocal table, copy_outputs
+        # the table is indexed by the inputs packed into an integer, in the order of `_inputs`
+        table = tabulate(circuit, widths) if cache is None else cache.get_or_build(tabulate, circuit, widths)
+        copy_outputs = any(_contains_bitstring(output) for output in table)
+        if not any(widths):
+            lookup.update((inputs, index) for index, inputs in enumerate(_inputs(widths)))
+        return table
+
+    def key(args) -> Optional[int]:
+        """Return the index of the inputs `args` in the table, or None if they are outside of it."""
+        if len(args) != len(widths):
+            return None
+        index = 0
+        for arg, width, shift in zip(args, widths, shifts):
+            if not isinstance(arg, Bit if width == 0 else BitString) or (width and len(arg) != width):
+                return None
+            index |= int(arg) << shift
+        return index
+
+    @functools.wraps(circuit)
+    def compiled(*args):
+        try:
+            # bits have no `__eq__`, so only the interned bits of the table match and not e.g. integers
+            output = table[lookup[args]]
+        except (KeyError, TypeError):  # not all bits, unhashable like NumPy signals and bit strings, or not built
+            index = key(args)
+            if index is None:
+                return circuit(*args)
+            output = (build() if table is None else table)[index]
+        if verify:
+            expected = circuit(*args)
+            assert output == expected, f"{circuit.__name__}{args} is {expected} but the truth table holds {output}"
+        return _copy(output) if copy_outputs else output
+
+    def verify_table() -> bool:
+        """Check every entry of the table against the original circuit and raise an `AssertionError` on mismatch."""
+        for inputs in _inputs(widths):
+            output, expected = compiled(*inputs), circuit(*inputs)
+            assert output == expected, f"{circuit.__name__}{inputs} is {expected} but the truth table holds {output}"
+        return True
+
+    compiled.original = circuit
+    compiled.widths = widths
+    compiled.verify = verify_table
+    compiled.build = build
+    return compiled
@@ -0,0 +1,157 @@
+"""Conversion between Python values and their binary representations
+
+Single values are converted to and from strings of "0" and "1" of an exact width, with unsigned or two's complement
+integers and IEEE 754 floats. Bulk data is converted to and from boolean bit arrays (one row per value, left-most bit
+first like a `BitString`) with NumPy, and text is streamed to and from UTF-8 bit arrays chunk by chunk.
+"""
+
+import codecs
+import struct
+from typing import Iterable, Iterator, Union
+
+import numpy as np
+
+
+FLOAT_FORMATS = {16: ">e", 32: ">f", 64: ">d"}
+
+
+def _check_range(integer: int, precision: int, signed: bool) -> None:
+    low, high = (-(1 << (precision - 1)), 1 << (precision - 1)) if signed else (0, 1 << precision)
+    if not low <= integer < high:
+        kind = "signed" if signed else "unsigned"
+        raise ValueError(f"{integer} does not fit in {precision} bits as a {kind} integer")
+
+
+def to_twos_complement(integer: int, precision: int) -> int:
+    """Return the unsigned integer with the same bits as the `precision` bit two's complement of `integer`."""
+    _check_range(integer, precision, signed=True)
+    return integer & ((1 << precision) - 1)
+
+
+def from_twos_complement(value: int, precision: int) -> int:
+    """Return the signed integer whose `precision` bit two's complement is the unsigned `value`."""
+    _check_range(value, precision, signed=False)
+    return value - (1 << precision) if value >> (precision - 1) else value
+
+
+def int2binary(integer: int, precision: int, signed: bool = False) -> str:
+    """Convert an integer to a string of exactly `precision` bits, in two's complement if `signed`."""
+    _check_range(integer, precision, signed)
+    if signed:
+        integer = to_twos_complement(integer, precision)
+    return format(integer, f"0{precision}b") if precision else ""
+
+
+def binary2int(binary: str, signed: bool = False) -> int:
+    """Convert binary representation of integer as a string to an integer type, in two's complement if `signed`"""
+    value = int(binary, 2)
+    return from_twos_complement(value, len(binary)) if signed else value
+
+
+def float2binary(number: float, precision: int = 32) -> str:
+    """Convert float to its IEEE 754 binary representation of `precision` (16, 32 or 64) bits.
+
+    The bits are the sign bit, the exponent and the fraction, e.g. 1 + 8 + 23 bits for 32 bit precision.
+
+    https://ryanstutorials.net/binary-tutorial/binary-floating-point.php
+    """
+    if precision not in FLOAT_FORMATS:
+        raise ValueError(f"Floats have a precision of {list(FLOAT_FORMATS)} bits but got {precision}")
+    data = struct.pack(FLOAT_FORMATS[precision], number)
+    return int2binary(int.from_bytes(data, "big"), precision)
+
+
+def binary2float(binary: str) -> float:
+    """Convert an IEEE 754 binary representation of 16, 32 or 64 bits to a float."""
+    if len(binary) not in FLOAT_FORMATS:
+        raise ValueError(f"Floats have a precision of {list(FLOAT_FORMATS)} bits but got {len(binary)}")
+    data = int(binary, 2).to_bytes(len(binary) // 8, "big")
+    return struct.unpack(FLOAT_FORMATS[len(binary)], data)[0]
+
+
+def bytes2bits(data: Union[bytes, bytearray, memoryview, np.ndarray]) -> np.ndarray:
+    """Convert bytes to a boolean array of `8 * len(data)` bits, the left-most bit of every byte first."""
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8)).astype(bool)
+
+
+def bits2bytes(bits: np.ndarray) -> bytes:
+    """Convert an array of bits to bytes, padding the last byte with zeros on the right."""
+    return np.packbits(np.asarray(bits, dtype=bool)).tobytes()
+
+
+def ints2bits(values: Union[np.ndarray, Iterable[int]], precision: int, signed: bool = False) -> np.ndarray:
+    """Convert integers to an array of shape `(len(values), precision)` bits, in two's complement if `signed`.
+
+    Raises a `ValueError` if a value does not fit in `precision` bits.
+    """
+    if not 0 < precision <= 64:
+        raise ValueError(f"Bulk conversion supports a precision of 1 to 64 bits but got {precision}")
+    # lists go through Python integers, as NumPy would turn a mix of large and small integers into floats
+    values = values if isinstance(values, np.ndarray) else np.array(list(values), dtype=object)
+    if values.dtype.kind not in "biuO":
+        raise TypeError(f"Bulk conversion needs integer values but got {values.dtype}")
+    if values.size:
+        low, high = (-(1 << (precision - 1)), (1 << (precision - 1)) - 1) if signed else (0, (1 << precision) - 1)
+        if values.min() < low or values.max() > high:
+            kind = "signed" if signed else "unsigned"
+            raise ValueError(f"Values do not fit in {precision} bits as {kind} integers")
+    # negative values wrap around to their two's complement
+    values = values.astype(np.int64).astype(np.uint64) if signed else values.astype(np.uint64)
+    as_bytes = values.astype(">u8").view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1)[:, 64 - precision :].astype(bool)
+
+
+def bits2ints(bits: np.ndarray, signed: bool = False) -> np.ndarray:
+    """Convert an array of shape `(n, precision)` bits to `n` integers, in two's complement if `signed`."""
+    bits = np.asarray(bits, dtype=bool)
+    precision = bits.shape[-1]
+    if not 0 < precision <= 64:
+        raise ValueError(f"Bulk conversion supports a precision of 1 to 64 bits but got {precision}")
+    padded = np.zeros(bits.shape[:-1] + (64,), dtype=bool)
+    padded[..., 64 - precision :] = bits
+    values = np.packbits(padded, axis=-1).view(">u8")[..., 0].astype(np.uint64)
+    if not signed:
+        return values
+    if precision < 64:
+        values = values.astype(np.int64) - (bits[..., 0].astype(np.int64) << precision)
+        return values
+    return values.astype(np.int64)
+
+
+def encode_utf8(chunks: Iterable[str]) -> Iterator[np.ndarray]:
+    """Encode a stream of text chunks as UTF-8 and yield the bits of every chunk as a boolean array."""
+    encoder = codecs.getincrementalencoder("utf-8")()
+    for chunk in chunks:
+        yield bytes2bits(encoder.encode(chunk))
+    yield bytes2bits(encoder.encode("", final=True))
+
+
+def decode_utf8(chunks: Iterable[np.ndarray]) -> Iterator[str]:
+    """Decode a stream of UTF-8 bit arrays and yield the text of every chunk.
+
+    Chunks can split bytes and multi-byte characters anywhere, the remainder is carried over to the next chunk.
+    Raises a `ValueError` if the stream ends in the middle of a byte or a character.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    carry = np.zeros(0, dtype=bool)
+    for chunk in chunks:
+        bits = np.concatenate([carry, np.asarray(chunk, dtype=bool)])
+        whole = len(bits) - len(bits) % 8
+        carry = bits[whole:]
+        yield decoder.decode(bits2bytes(bits[:whole]))
+    if len(carry):
+        raise ValueError(f"The UTF-8 bit stream ends with {len(carry)} bits of an incomplete byte")
+    yield decoder.decode(b"", final=True)
+
+
+def utf8tobinary(string: str) -> str:
+    """Convert UTF-8 representation of a string to binary"""
+    return (bytes2bits(string.encode("utf-8")).astype(np.uint8) + ord("0")).tobytes().decode("ascii")
+
+
+def binary2utf8(binary: str) -> str:
+    """Convert binary representation of a string to UTF-8"""
+    if len(binary) % 8:
+        raise ValueError(f"A UTF-8 binary string must have whole bytes but has {len(binary)} bits")
+    bits = np.frombuffer(binary.encode("ascii"), dtype=np.uint8) == ord("1")
+    return bits2bytes(bits).decode("utf-8")
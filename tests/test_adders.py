@@ -1,6 +1,20 @@
+import random
+
+import numpy as np
 import pytest
 
-from computer.adders import half_adder, full_adder, ripple_carry_adder_8bit
+from computer.adders import (
+    PREFIX_TOPOLOGIES,
+    _prefix_levels,
+    carry_look_ahead_adder,
+    full_adder,
+    half_adder,
+    parallel_prefix_adder,
+    ripple_carry_adder,
+    ripple_carry_adder_8bit,
+)
+from computer.analysis import measure
+from computer.batch import bitslice, unpack
 from computer.bits_and_bytes import Bit, BitString, Byte
 
 
@@ -60,3 +74,50 @@ def test_ripple_carry_adder(a, b, sum, carry):
     assert s == sum
     assert c == carry
 
+
+
+@pytest.mark.parametrize("width", [1, 3, 8, 16, 70])
+def test_ripple_carry_adder_any_width(width):
+    rng = random.Random(width)
+    for _ in range(20):
+        x, y, c = rng.getrandbits(width), rng.getrandbits(width), rng.getrandbits(1)
+        s, carry = ripple_carry_adder(BitString.from_int(x, width), BitString.from_int(y, width), Bit(c))
+        assert int(s) == (x + y + c) % (1 << width)
+        assert carry == Bit((x + y + c) >> width)
+
+
+@pytest.mark.parametrize("topology", PREFIX_TOPOLOGIES)
+@pytest.mark.parametrize("width", [1, 2, 3, 5, 8, 13, 32])
+def test_carry_look_ahead_adder(topology, width):
+    rng = random.Random(width)
+    for _ in range(20):
+        x, y, c = rng.getrandbits(width), rng.getrandbits(width), rng.getrandbits(1)
+        a, b = BitString.from_int(x, width), BitString.from_int(y, width)
+        s, carry = carry_look_ahead_adder(a, b, Bit(c), topology=topology)
+        assert (s, carry) == ripple_carry_adder(a, b, Bit(c))
+
+
+@pytest.mark.parametrize("topology", PREFIX_TOPOLOGIES)
+def test_carry_look_ahead_adder_exhaustive_8bit(topology):
+    x, y = (grid.ravel() for grid in np.meshgrid(np.arange(256), np.arange(256)))
+    sum, carry = carry_look_ahead_adder(bitslice(x, 8), bitslice(y, 8), topology=topology)
+    np.testing.assert_array_equal(sum.to_ints(len(x)), (x + y) % 256)
+    np.testing.assert_array_equal(unpack(carry, len(x)), (x + y) > 255)
+
+
+@pytest.mark.parametrize("topology", PREFIX_TOPOLOGIES)
+@pytest.mark.parametrize("width", [3, 5, 8, 13])
+def test_prefix_levels_are_not_empty(topology, width):
+    levels = _prefix_levels(width, topology)
+    assert all(levels)
+    if topology == "brent-kung":
+        assert len(levels) == {3: 2, 5: 3, 8: 5, 13: 6}[width]
+
+
+@pytest.mark.parametrize("width", [8, 32, 64])
+def test_carry_look_ahead_adder_depth_and_gate_count(width):
+    ripple = measure(ripple_carry_adder, width, width, 0)
+    kogge_stone, brent_kung, sklansky = (parallel_prefix_adder(width, topology) for topology in PREFIX_TOPOLOGIES)
+    assert kogge_stone.depth < brent_kung.depth < ripple.depth
+    assert sklansky.depth < brent_kung.depth
+    assert ripple.gate_count < brent_kung.gate_count < sklansky.gate_count < kogge_stone.gate_count
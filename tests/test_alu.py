@@ -0,0 +1,91 @@
+import random
+
+import numpy as np
+import pytest
+
+from computer.alu import ALU8Bit
+from computer.bits_and_bytes import Bit, BitString, Byte
+
+
+def signed(value, precision=8):
+    return value - (1 << precision) if value >> (precision - 1) else value
+
+
+REFERENCE = dict(
+    add=lambda a, b, c: a + b,
+    add_with_carry=lambda a, b, c: a + b + c,
+    subtact=lambda a, b, c: a - b,
+    subtract_with_borrow=lambda a, b, c: a - b - c,
+    negate=lambda a, b, c: -a,
+    increment=lambda a, b, c: a + 1,
+    decrement=lambda a, b, c: a - 1,
+    pass_through=lambda a, b, c: a,
+    multiply=lambda a, b, c: a * b,
+)
+
+
+def divide(a, b):
+    """Signed division rounding towards zero."""
+    quotient = abs(a) // abs(b)
+    return -quotient if (a < 0) != (b < 0) else quotient
+
+
+@pytest.mark.parametrize("name", REFERENCE)
+def test_alu_operations(name):
+    alu = ALU8Bit()
+    rng = random.Random(0)
+    for _ in range(100):
+        a, b, c = rng.getrandbits(8), rng.getrandbits(8), rng.getrandbits(1)
+        output, flags = alu(ALU8Bit.OP_CODES[name], Byte.from_int(a), Byte.from_int(b), Bit(c))
+        expected = REFERENCE[name](signed(a), signed(b), c)
+        assert signed(int(output)) == signed(expected % 256)
+        assert flags["overflow"] == Bit(not -128 <= expected <= 127)
+        assert flags["zero"] == Bit(expected % 256 == 0)
+        assert flags["negative"] == output[0]
+
+
+def test_alu_carry_chains_multi_word_arithmetic():
+    alu = ALU8Bit()
+    x, y = 0x1234, 0x0FF0
+    low, flags = alu("0000", Byte.from_int(x & 0xFF), Byte.from_int(y & 0xFF))
+    high, _ = alu("0001", Byte.from_int(x >> 8), Byte.from_int(y >> 8), flags["carry"])
+    assert (int(high) << 8) | int(low) == x + y
+    low, flags = alu("0010", Byte.from_int(x & 0xFF), Byte.from_int(y & 0xFF))
+    high, _ = alu("0011", Byte.from_int(x >> 8), Byte.from_int(y >> 8), ~flags["carry"])
+    assert (int(high) << 8) | int(low) == x - y
+
+
+def test_alu_dispatch():
+    alu = ALU8Bit(precision=12)
+    a = BitString.from_int(1000, 12)
+    assert alu(0b0101, a)[0] == alu("0101", a)[0] == alu(BitString("0101"), a)[0] == BitString.from_int(1001, 12)
+    with pytest.raises(ValueError):
+        alu("1111", a)
+    assert alu("1000", a, BitString.from_int(3, 12))[0] == BitString.from_int(3000, 12)
+    assert alu("1001", a, BitString.from_int(3, 12))[0] == BitString.from_int(333, 12)
+
+
+def test_alu_divide():
+    alu = ALU8Bit()
+    a, b = np.arange(256).repeat(256), np.tile(np.arange(256), 256)
+    outputs, flags = alu.batch("1001", a, b)
+    assert flags["overflow"][b == 0].all()
+    for i in np.flatnonzero(b):
+        expected = divide(signed(int(a[i])), signed(int(b[i])))
+        assert signed(int(outputs[i])) == signed(expected % 256)
+        assert flags["overflow"][i] == (expected == 128)
+        assert flags["zero"][i] == (expected == 0)
+
+
+@pytest.mark.parametrize("name", list(REFERENCE) + ["divide"])
+def test_alu_batch_matches_scalar(name):
+    alu = ALU8Bit()
+    rng = np.random.default_rng(0)
+    a, b, c = rng.integers(0, 256, size=(3, 300))
+    c = c % 2
+    op_code = ALU8Bit.OP_CODES[name]
+    outputs, flags = alu.batch(op_code, a, b, c)
+    for i in range(len(a)):
+        output, expected_flags = alu(op_code, Byte.from_int(int(a[i])), Byte.from_int(int(b[i])), Bit(int(c[i])))
+        assert outputs[i] == int(output)
+        assert {flag: Bit(bool(values[i])) for flag, values in flags.items()} == expected_flags
@@ -0,0 +1,60 @@
+import pytest
+
+from computer.adders import ParallelPrefixAdder, full_adder, half_adder, ripple_carry_adder_8bit
+from computer.analysis import MeasuredCircuit, critical_path, measure, report
+from computer.bits_and_bytes import Bit
+from computer.gates import AND, NOT, XOR
+
+
+def test_measure_gates():
+    assert measure(AND, 0, 0).depth == 1
+    assert measure(NOT, 0).gates == {"NOT": 1}
+    assert measure(XOR, 0, 0).gates == {"AND": 2, "OR": 1, "NOT": 1}
+    assert measure(XOR, 0, 0).depth == 3
+
+
+def test_measure_adders():
+    assert measure(half_adder, 0, 0).gate_count == 5
+    stats = measure(full_adder, 0, 0, 0)
+    assert stats.gate_count == 11
+    assert stats.depth == 6
+
+
+def test_measure_folds_constants():
+    assert measure(lambda a: full_adder(a, Bit(0), Bit(0)), 0).gate_count == 0
+    assert measure(lambda a: XOR(a, Bit(1)), 0).gates == {"NOT": 1}
+
+
+def test_critical_path():
+    path = critical_path(full_adder, 0, 0, 0)
+    assert path.depth == measure(full_adder, 0, 0, 0).depth
+    assert [gate for gate, _ in path.gates] == ["AND", "NOT", "AND", "AND", "NOT", "AND"]
+    assert path.circuits() == {"computer.adders.half_adder": 6}
+    # the carry ripples through every full adder
+    path = critical_path(ripple_carry_adder_8bit, 8, 8)
+    assert path.depth == measure(ripple_carry_adder_8bit, 8, 8).depth
+    assert set(path.circuits()) == {"computer.adders.half_adder", "computer.adders.full_adder"}
+    assert [gate for gate, _ in critical_path(NOT, 0).gates] == ["NOT"]
+
+
+def test_report():
+    adder = ParallelPrefixAdder(8)
+    text = report(adder, 8, 8, 0)
+    assert f"depth {adder.depth}, {adder.gate_count} gates" in text
+    assert "computer.adders.ParallelPrefixAdder.__call__" in text
+
+
+def test_measured_circuit_needs_widths():
+    class Inverter(MeasuredCircuit):
+        def __call__(self, a):
+            return NOT(a)
+
+    with pytest.raises(TypeError):
+        Inverter()
+
+    class MeasuredInverter(Inverter):
+        @property
+        def widths(self):
+            return (0,)
+
+    assert MeasuredInverter().gate_count == 1
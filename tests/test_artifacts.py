@@ -0,0 +1,114 @@
+import functools
+
+import numpy as np
+import pytest
+
+from computer import artifacts
+from computer.adders import full_adder, ripple_carry_adder
+from computer.artifacts import ArtifactCache, cached, describe
+from computer.bits_and_bytes import Bit, BitString, ONE, ZERO
+from computer.netlist import Netlist, compile_circuit
+from computer.ram import SRAM
+from computer.truth_table import truth_table
+
+
+def test_get_or_build_stores_and_loads(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    memory = cache.get_or_build(SRAM, 8, 4, 4, storage="packed")
+    memory.write(3, BitString.from_int(0xA5, 8), Bit(1))
+    assert (cache.hits, cache.misses) == (0, 1)
+    loaded = ArtifactCache(tmp_path).get_or_build(SRAM, 8, 4, 4, storage="packed")
+    assert isinstance(loaded, SRAM) and loaded is not memory
+    # the artifact is the structure as built, not as modified afterwards
+    assert int(loaded.read(3, Bit(1))) == 0
+    assert cache.get_or_build(SRAM, 8, 4, 4, storage="latches").storage == "latches"
+    assert cache.misses == 2
+
+
+def test_artifacts_keep_bit_singletons(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    cache.store("bits", [Bit(0), Bit(1)])
+    zero, one = cache.load("bits")
+    assert zero is ZERO and one is ONE
+
+
+def test_keys_depend_on_builder_arguments_and_source(tmp_path, monkeypatch):
+    cache = ArtifactCache(tmp_path)
+    key = cache.key(ripple_carry_adder, 4, width=8)
+    assert key == cache.key(ripple_carry_adder, 4, width=8)
+    assert key != cache.key(ripple_carry_adder, 5, width=8)
+    assert key != cache.key(full_adder, 4, width=8)
+    assert key.startswith("ripple_carry_adder-")
+
+    cache.get_or_build(list, (1, 2))
+    monkeypatch.setattr(artifacts, "source_fingerprint", lambda: "f" * 64)
+    assert cache.key(ripple_carry_adder, 4, width=8) != key
+    assert cache.get_or_build(list, (1, 2)) == [1, 2]
+    assert cache.misses == 2
+    assert cache.prune() == 1
+    assert len(list(cache.directory.glob("*.pkl"))) == 1
+
+
+def test_describe():
+    assert describe(ripple_carry_adder) == "computer.adders.ripple_carry_adder"
+    assert describe(functools.partial(truth_table, widths=(4, 4))) == (
+        "partial(computer.truth_table.truth_table, widths=tuple(4, 4))"
+    )
+    assert describe(np.arange(3)) != describe(np.arange(4))
+    with pytest.raises(ValueError):
+        describe(lambda a: a)
+    with pytest.raises(ValueError):
+        describe(object())
+    # methods of different instances share their name, e.g. the `read` of memories of different sizes
+    with pytest.raises(ValueError):
+        describe(SRAM(8, 4, 4).read)
+    with pytest.raises(ValueError):
+        describe([].append)
+    assert describe(len) == "builtins.len"
+
+
+def test_unreadable_artifact_is_rebuilt(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    key = cache.key(list, (1, 2))
+    cache.directory.mkdir(parents=True)
+    cache.path(key).write_bytes(b"\x80\x05truncated")
+    with pytest.raises(KeyError):
+        cache.load(key)
+    assert cache.get_or_build(list, (1, 2)) == [1, 2]
+    assert cache.load(key) == [1, 2]
+
+
+def test_disabled_cache_builds(tmp_path):
+    cache = ArtifactCache(tmp_path, enabled=False)
+    assert cache.get_or_build(list, (1,)) == [1]
+    assert not cache.directory.exists()
+
+
+def test_cached_decorator(tmp_path):
+    build = cached(SRAM, ArtifactCache(tmp_path))
+    assert isinstance(build(8, 4, 4), SRAM)
+    assert isinstance(build(8, 4, 4), SRAM)
+    assert (build.cache.hits, build.cache.misses) == (1, 1)
+
+
+def test_truth_table_from_cache(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    table = truth_table(ripple_carry_adder, widths=(3, 3, 0), cache=cache).build()
+    compiled = truth_table(ripple_carry_adder, widths=(3, 3, 0), cache=cache)
+    assert compiled.build() == table and len(table) == 1 << 7
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert compiled(BitString("011"), BitString("110"), Bit(1)) == (BitString("010"), Bit(1))
+    assert truth_table(full_adder, cache=cache).build()[0b110] == (Bit(0), Bit(1))
+
+
+def test_compiled_circuit_from_cache(tmp_path, monkeypatch):
+    cache = ArtifactCache(tmp_path)
+    adder = compile_circuit(ripple_carry_adder, 8, 8, cache=cache)
+    compile_circuit.cache_clear()
+    # the source is loaded with the code rather than generated again
+    monkeypatch.setattr(Netlist, "to_source", None)
+    loaded = compile_circuit(ripple_carry_adder, 8, 8, cache=cache)
+    assert loaded is not adder and cache.hits == 1
+    assert loaded.source == adder.source
+    a, b = BitString.from_int(200, 8), BitString.from_int(100, 8)
+    assert loaded(a, b) == ripple_carry_adder(a, b)
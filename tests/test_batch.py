@@ -0,0 +1,90 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from computer.adders import full_adder, half_adder, ripple_carry_adder_8bit
+from computer.batch import BitPlanes, bitslice, bitsliced_add, pack, signal, unpack
+from computer.bits_and_bytes import Bit, Byte
+from computer.gates import AND, NAND, NOT, OR, XOR
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.uint64])
+@pytest.mark.parametrize("count", [1, 7, 64, 130])
+def test_pack_unpack_roundtrip(dtype, count):
+    bits = np.random.default_rng(0).integers(0, 2, size=(3, count)).astype(bool)
+    packed = pack(bits, dtype)
+    assert packed.dtype == dtype
+    np.testing.assert_array_equal(unpack(packed, count), bits)
+
+
+def test_signal_rejects_signed_arrays():
+    with pytest.raises(TypeError):
+        signal(np.array([0, 1], dtype=np.int64))
+
+
+@pytest.mark.parametrize("gate", [AND, OR, XOR, NAND])
+def test_batched_gates_match_scalar_gates(gate):
+    a, b = np.array([0, 0, 1, 1], dtype=bool), np.array([0, 1, 0, 1], dtype=bool)
+    expected = [bool(gate(Bit(int(x)), Bit(int(y)))) for x, y in zip(a, b)]
+    np.testing.assert_array_equal(gate(a, b), expected)
+    np.testing.assert_array_equal(unpack(gate(pack(a), pack(b)), 4), expected)
+    np.testing.assert_array_equal(NOT(a), ~a)
+
+
+@pytest.mark.parametrize("dtype", [np.bool_, np.uint8, np.uint64])
+def test_batched_full_adder(dtype):
+    inputs = np.array(list(itertools.product([0, 1], repeat=3)), dtype=bool).T
+    if dtype != np.bool_:
+        a, b, c = (pack(x, dtype) for x in inputs)
+    else:
+        a, b, c = inputs
+    sum, carry = full_adder(a, b, c)
+    if dtype != np.bool_:
+        sum, carry = unpack(sum, 8), unpack(carry, 8)
+    for (x, y, z), s, k in zip(inputs.T, sum, carry):
+        assert (Bit(s), Bit(k)) == full_adder(Bit(x), Bit(y), Bit(z))
+
+
+def test_batched_half_adder_with_constant():
+    a = np.array([False, True])
+    sum, carry = half_adder(a, Bit(1))
+    np.testing.assert_array_equal(sum, [True, False])
+    np.testing.assert_array_equal(carry, [False, True])
+
+
+@pytest.mark.parametrize("dtype", [np.bool_, np.uint8, np.uint64])
+def test_batched_ripple_carry_adder(dtype):
+    rng = np.random.default_rng(0)
+    x, y = rng.integers(0, 256, size=(2, 1000))
+    a, b = BitPlanes.from_ints(x, 8, dtype), BitPlanes.from_ints(y, 8, dtype)
+    sum, carry = ripple_carry_adder_8bit(a, b)
+    carry = unpack(carry, 1000) if dtype != np.bool_ else carry
+    np.testing.assert_array_equal(sum.to_ints(1000), (x + y) % 256)
+    np.testing.assert_array_equal(carry, (x + y) > 255)
+    for i in range(10):
+        s, c = ripple_carry_adder_8bit(Byte.from_int(int(x[i])), Byte.from_int(int(y[i])))
+        assert sum.to_bitstrings(1000)[i] == s
+        assert bool(carry[i]) == bool(c)
+
+
+def test_bitsliced_add_matches_scalar_adder_exhaustively():
+    x, y = (grid.ravel() for grid in np.meshgrid(np.arange(256), np.arange(256)))
+    sum, carry = bitsliced_add(x, y, 8)
+    expected = [ripple_carry_adder_8bit(Byte.from_int(int(i)), Byte.from_int(int(j))) for i, j in zip(x, y)]
+    assert [int(s) for s, _ in expected] == sum.tolist()
+    assert [bool(c) for _, c in expected] == carry.tolist()
+
+
+@pytest.mark.parametrize("width", [1, 5, 32, 64, 100])
+def test_bitsliced_add_any_width(width):
+    rng = random.Random(width)
+    x = [rng.getrandbits(width) for _ in range(200)]
+    y = [rng.getrandbits(width) for _ in range(200)]
+    c = [rng.getrandbits(1) for _ in range(200)]
+    sum, carry = bitsliced_add(np.array(x, dtype=object), np.array(y, dtype=object), width, c)
+    assert [int(s) for s in sum] == [(i + j + k) % (1 << width) for i, j, k in zip(x, y, c)]
+    assert carry.tolist() == [(i + j + k) >> width == 1 for i, j, k in zip(x, y, c)]
+    planes = bitslice(np.array(x, dtype=object), width)
+    assert len(planes) == width and planes[0].shape == (4,) and planes[0].dtype == np.uint64
@@ -0,0 +1,27 @@
+import json
+
+from benchmarks.suite import BENCHMARKS, compare, main
+
+
+def test_benchmarks_cover_all_areas():
+    areas = {name.split(".")[0] for name in BENCHMARKS}
+    assert areas == {"bits", "gates", "adders", "latches", "registers", "conversions"}
+
+
+def test_compare_flags_regressions():
+    baseline = {"a": dict(seconds=1.0), "b": dict(seconds=1.0), "c": dict(seconds=1.0)}
+    results = {"a": dict(seconds=1.1), "b": dict(seconds=1.5), "d": dict(seconds=1.0)}
+    rows = compare(baseline, results, threshold=0.25)
+    assert [(name, regressed) for name, *_, regressed in rows] == [("a", False), ("b", True)]
+
+
+def test_main_writes_json_and_fails_on_regression(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(["--quick", "--filter", "^bits.Bit$", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())["results"]
+    assert list(results) == ["bits.Bit"] and results["bits.Bit"]["seconds"] > 0
+
+    baseline = tmp_path / "baseline.json"
+    results["bits.Bit"]["seconds"] /= 100
+    baseline.write_text(json.dumps(dict(results=results)))
+    assert main(["--quick", "--filter", "^bits.Bit$", "--compare", str(baseline)]) == 1
@@ -0,0 +1,79 @@
+import copy
+import pickle
+
+import pytest
+
+from computer.adders import ripple_carry_adder
+from computer.bits_and_bytes import Bit, BitString, Byte, ONE, Word, ZERO
+
+
+@pytest.mark.parametrize("bits", ["", "0", "1", "0110", "10000001", "1" * 70])
+def test_bitstring_roundtrip(bits):
+    bitstring = BitString(bits)
+    assert bitstring.bits == bits
+    assert len(bitstring) == len(bits)
+    assert BitString.from_int(int(bitstring), len(bits)) == bitstring
+    assert BitString.from_bits(bitstring) == bitstring
+    assert [b for b in bitstring] == [Bit(b) for b in bits]
+
+
+def test_bitstring_bytes():
+    bitstring = BitString.from_bytes(b"\x01\xff")
+    assert bitstring.bits == "0000000111111111"
+    assert bytes(bitstring) == b"\x01\xff"
+    assert Byte.from_int(5) == Byte("00000101")
+
+
+@pytest.mark.parametrize(
+    "index, expected",
+    [
+        (slice(None, 4), "1100"),
+        (slice(4, None), "1010"),
+        (slice(2, 6), "0010"),
+        (slice(None, None, 2), "1011"),
+        (slice(None, None, -1), "01010011"),
+        (slice(5, 2), ""),
+    ]
+)
+def test_bitstring_slicing(index, expected):
+    byte = Byte("11001010")
+    assert byte[index] == BitString(expected)
+
+
+def test_bitstring_setitem():
+    byte = Byte("00000000")
+    byte[0] = Bit(1)
+    byte[-1] = Bit(1)
+    assert byte == Byte("10000001")
+    byte[2:6] = BitString("1011")
+    assert byte == Byte("10101101")
+    byte[0] = Bit(0)
+    assert byte == Byte("00101101")
+    with pytest.raises(IndexError):
+        byte[8]
+
+
+def test_bitstring_equality():
+    assert BitString("0101") == BitString("0101")
+    assert BitString("0101") != BitString("00101")
+    assert BitString("0101") != "0101"
+
+
+@pytest.mark.parametrize("state", [0, 1, "0", "1", False, True])
+def test_bit_is_interned(state):
+    assert Bit(state) is (ONE if int(state) else ZERO)
+    assert Bit(Bit(state)) is Bit(state)
+    assert copy.deepcopy(Bit(state)) is Bit(state)
+    assert pickle.loads(pickle.dumps(Bit(state))) is Bit(state)
+
+
+@pytest.mark.parametrize("state", [2, "01", "", None])
+def test_bit_rejects_invalid_states(state):
+    with pytest.raises(ValueError):
+        Bit(state)
+
+
+def test_word_of_signals():
+    a, b = Word([ZERO, ONE, ONE]), Word([ZERO, ZERO, ONE])
+    total, carry = ripple_carry_adder(a, b)
+    assert type(total) is Word and total == [ONE, ZERO, ZERO] and carry is ZERO
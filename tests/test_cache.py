@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from computer.bits_and_bytes import Bit, BitString, Byte
+from computer.cache import FIFO, LRU, PLRU, REPLACEMENT_POLICIES, WRITE_POLICIES, Cache, CacheConfig, cache_hierarchy
+from computer.cpu import CPU, assemble
+from computer.ram import SRAM
+from computer.sharded_memory import ShardedSRAM
+
+
+def test_replacement_policies():
+    lru, plru, fifo = LRU(4), PLRU(4), FIFO(4)
+    for policy in (lru, plru, fifo):
+        for way in range(4):
+            policy.insert(way)
+        policy.access(0)
+    assert lru.victim() == 1
+    assert fifo.victim() == 0
+    # the root points away from the access to 0, and its right child away from the insert of 3
+    assert plru.victim() == 2
+    plru.access(2)
+    assert plru.victim() == 1
+    with pytest.raises(AssertionError):
+        PLRU(3)
+
+
+@pytest.mark.parametrize("write_policy", WRITE_POLICIES)
+@pytest.mark.parametrize("replacement", REPLACEMENT_POLICIES)
+def test_reads_and_writes_like_memory(replacement, write_policy):
+    reference = SRAM(16, 16, 8, storage="packed")
+    cache = Cache(SRAM(16, 16, 8, storage="packed"), 32, 4, 2, replacement, write_policy)
+    rng = np.random.default_rng(0)
+    for address, value, write in zip(rng.integers(0, 64, 500), rng.integers(0, 1 << 16, 500), rng.integers(0, 2, 500)):
+        address = int(address)
+        if write:
+            data = BitString.from_int(int(value), 16)
+            cache.write(address, data, Bit(1))
+            reference.write(address, data, Bit(1))
+        else:
+            assert cache.read(address, Bit(1)) == reference.read(address, Bit(1))
+    assert cache.stats.accesses == 500 and cache.evictions > 0
+    assert int(cache.read(3, Bit(0))) == 0 and cache.stats.accesses == 500
+
+    cache.flush()
+    assert cache.memory.read_block(0, 64) == reference.read_block(0, 64)
+
+
+def test_hits_do_not_touch_memory():
+    class Counting(SRAM):
+        reads = 0
+
+        def read(self, address, read_enable):
+            self.reads += 1
+            return super().read(address, read_enable)
+
+    memory = Counting(8, 4, 4)
+    cache = Cache(memory, 8, 4, 1)
+    cache.write(5, Byte.from_int(9), Bit(1))
+    reads = memory.reads
+    assert reads == 4  # one line filled word by word from latches
+    for _ in range(10):
+        assert cache.read(5, Bit(1)) == Byte.from_int(9)
+        cache.read(6, Bit(1))
+    assert memory.reads == reads and int(memory.read(5, Bit(1))) == 0
+    assert cache.stats == (20, 1, 0, 0)
+    assert cache.stats.hit_rate == 20 / 21
+
+
+def test_write_back_and_evictions():
+    memory = SRAM(8, 4, 4, storage="packed")
+    cache = Cache(memory, 8, 4, 2, "fifo", "write-back")
+    cache.write(0, Byte.from_int(1), Bit(1))
+    cache.read(4, Bit(1))
+    cache.read(8, Bit(1))  # evicts the dirty line of address 0
+    assert cache.stats == (0, 3, 1, 1)
+    assert memory.read(0, Bit(1)) == Byte.from_int(1)
+    cache.read(12, Bit(1))  # evicts the clean line of address 4
+    assert cache.stats == (0, 4, 2, 1)
+
+
+def test_write_through_does_not_allocate():
+    memory = SRAM(8, 4, 4, storage="packed")
+    cache = Cache(memory, 8, 4, 2, write_policy="write-through")
+    cache.write(2, Byte.from_int(7), Bit(1))
+    assert memory.read(2, Bit(1)) == Byte.from_int(7)
+    assert cache.stats == (0, 1, 0, 0)
+    assert cache.read(2, Bit(1)) == Byte.from_int(7)
+    cache.write(3, Byte.from_int(8), Bit(1))
+    assert memory.read(3, Bit(1)) == Byte.from_int(8) and cache.read(3, Bit(1)) == Byte.from_int(8)
+    assert cache.stats == (2, 2, 0, 0)
+
+
+def test_blocks():
+    memory = SRAM(16, 16, 8, storage="packed")
+    cache = Cache(memory, 32, 4, 4)
+    data = bytes(range(2 * 21))
+    cache.write_block(6, data)
+    assert cache.read_block(6, 21) == data
+    assert int(cache.read(6, Bit(1))) == 0x0001
+    assert cache.read_block(6, 2, Bit(0)) == bytes(4)
+    assert memory.read_block(6, 21) != data
+    cache.flush()
+    assert memory.read_block(6, 21) == data
+
+
+def test_hierarchy():
+    memory = SRAM(8, 16, 8, storage="packed")
+    l1, l2 = cache_hierarchy(memory, (CacheConfig(16, 2, 2, "plru"), CacheConfig(64, 8, 4, "lru")))
+    assert l1.memory is l2 and l2.memory is memory
+    for address in range(64):
+        l1.write(address, Byte.from_int(address), Bit(1))
+    for address in range(64):
+        assert int(l1.read(address, Bit(1))) == address
+    # L1 misses once per line of 2 words, L2 once per line of 8
+    assert l1.misses == 64 and l2.misses == 8
+    l1.flush()
+    assert memory.read_block(0, 64) == bytes(range(64))
+
+
+def test_cpu_through_caches():
+    with ShardedSRAM(8, 16, 8, n_shards=2, processes=False) as memory:
+        l1, l2 = cache_hierarchy(memory)
+        cpu = CPU(l1)
+        cpu.load(assemble("LOADI A 5\nLOADI B 7\nADD A B\nSTORE A 100\nHALT"))
+        cpu.run()
+        assert l1.read(100, Bit(1)) == Byte.from_int(12)
+        assert l1.hits > 0 and l2.misses > 0
+        l1.flush()
+        assert memory.read(100, Bit(1)) == Byte.from_int(12)
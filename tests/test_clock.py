@@ -0,0 +1,132 @@
+import numpy as np
+
+from computer.bits_and_bytes import Bit, BitString, Byte
+from computer.clock import EDGES, Clock, ClockedRegister, Component, gated_latches
+
+
+def test_shift_register_samples_simultaneously():
+    clock = Clock()
+    # registered back to front, which must not let a value through more than one stage per cycle
+    stages = [ClockedRegister(8) for _ in range(4)]
+    for stage in reversed(stages):
+        clock.register(stage)
+    for previous, stage in zip(stages, stages[1:]):
+        stage.connect(previous)
+    stages[0].drive(42)
+    history = []
+    for _ in range(4):
+        clock.tick()
+        history.append([int(stage.read()) for stage in stages])
+    assert history == [[42, 0, 0, 0], [42, 42, 0, 0], [42, 42, 42, 0], [42, 42, 42, 42]]
+    assert clock.cycle == 4
+
+
+def test_ring_rotates():
+    clock = Clock()
+    ring = [clock.register(ClockedRegister(4)) for _ in range(3)]
+    for k, register in enumerate(ring):
+        register.value = k + 1
+        register.connect(ring[k - 1])
+    clock.tick()
+    assert [register.value for register in ring] == [3, 1, 2]
+
+
+def test_write_enable():
+    clock = Clock()
+    register = clock.register(ClockedRegister(8))
+    register.drive(Byte.from_int(200))
+    clock.tick()
+    register.drive(17, Bit(0))
+    clock.tick()
+    assert register.read() == Byte.from_int(200)
+    register.drive(17, Bit(1))
+    clock.tick()
+    assert register.read() == Byte.from_int(17) and isinstance(register.read(), Byte)
+
+
+def test_gated_latches_per_bit():
+    for value, data, enable in [(0b1100, 0b1010, 0b1111), (0b1100, 0b1010, 0b0110), (0b1100, 0b1010, 0)]:
+        expected = (data & enable) | (value & ~enable)
+        assert gated_latches(value, data, enable) & 0b1111 == expected
+
+
+def test_batched_like_one_at_a_time():
+    rng = np.random.default_rng(0)
+    widths = [8, 16, 64, 100]
+    batched, single = Clock(), [Clock() for _ in range(40)]
+    registers = []
+    for k, clock in enumerate(single):
+        width = widths[k % len(widths)]
+        pair = batched.register(ClockedRegister(width)), clock.register(ClockedRegister(width))
+        registers.append(pair)
+    for _ in range(5):
+        for a, b in registers:
+            value, enable = int.from_bytes(rng.bytes(16), "big"), Bit(int(rng.integers(2)))
+            a.drive(value, enable)
+            b.drive(value, enable)
+        batched.tick()
+        for clock in single:
+            clock.tick()
+        assert [a.value for a, _ in registers] == [b.value for _, b in registers]
+    assert registers[3][0].value.bit_length() > 64
+    assert isinstance(registers[3][0].read(), BitString) and len(registers[3][0].read()) == 100
+
+
+class Counter():
+    def __init__(self) -> None:
+        self.count = 0
+
+    def rising(self) -> None:
+        self.count += 1
+
+    def falling(self) -> None:
+        self.count += 10
+
+
+class Toggle(Component):
+    def __init__(self) -> None:
+        self.state = False
+
+    def falling(self) -> None:
+        self.state = not self.state
+
+
+def test_components_on_their_edges():
+    clock = Clock()
+    counter = clock.register(Counter(), EDGES)
+    rising = clock.register(Counter())
+    toggle = clock.register(Toggle(), ("falling",))
+    clock.run(3)
+    assert (counter.count, rising.count, toggle.state) == (33, 3, True)
+    clock.unregister(counter)
+    clock.tick()
+    assert (counter.count, rising.count, toggle.state) == (33, 4, False)
+    assert repr(clock) == "Clock(cycle=4, components=2)"
+
+
+def test_run_stats():
+    clock = Clock()
+    for _ in range(100):
+        clock.register(ClockedRegister(16)).drive(7)
+    stats = clock.run(50)
+    assert stats.cycles == 50 and clock.cycle == 50
+    assert stats.seconds > 0 and stats.cycles_per_second == 50 / stats.seconds
+
+
+def test_rewired_after_scheduling():
+    clock = Clock()
+    a, b = clock.register(ClockedRegister(8)), clock.register(ClockedRegister(8))
+    outside = ClockedRegister(8)  # not driven by the clock
+    outside.value = 9
+    a.drive(5)
+    b.connect(a)
+    clock.tick()
+    clock.tick()
+    assert (a.value, b.value) == (5, 5)
+    b.connect(outside)
+    a.drive(6, Bit(0))
+    clock.tick()
+    assert (a.value, b.value, outside.value) == (5, 9, 9)
+    b.drive(3)
+    clock.tick()
+    assert b.read() == Byte.from_int(3) and b.source is None and b.data == 3
@@ -0,0 +1,151 @@
+import math
+
+import numpy as np
+import pytest
+
+from computer.bits_and_bytes import BitString
+from computer.utils.conversion import (
+    binary2float,
+    binary2int,
+    binary2utf8,
+    bits2bytes,
+    bits2ints,
+    bytes2bits,
+    decode_utf8,
+    encode_utf8,
+    float2binary,
+    from_twos_complement,
+    int2binary,
+    ints2bits,
+    to_twos_complement,
+    utf8tobinary,
+)
+
+
+TEXT = "Bits ⊕ bytes: ÆØÅ, 日本語 and 🙂"
+
+
+@pytest.mark.parametrize("precision", [1, 4, 8, 12, 64])
+def test_int2binary_has_exact_width(precision):
+    for integer in (0, 1, (1 << precision) - 1):
+        binary = int2binary(integer, precision)
+        assert len(binary) == precision
+        assert binary2int(binary) == integer
+        assert BitString(binary) == BitString.from_int(integer, precision)
+
+
+def test_int2binary_signed():
+    assert int2binary(-3, 8, signed=True) == "11111101"
+    assert int2binary(-128, 8, signed=True) == "10000000"
+    assert int2binary(127, 8, signed=True) == "01111111"
+    for integer in range(-8, 8):
+        assert binary2int(int2binary(integer, 4, signed=True), signed=True) == integer
+
+
+@pytest.mark.parametrize(
+    "integer, precision, signed", [(256, 8, False), (-1, 8, False), (128, 8, True), (-129, 8, True)]
+)
+def test_int2binary_out_of_range(integer, precision, signed):
+    with pytest.raises(ValueError):
+        int2binary(integer, precision, signed)
+
+
+def test_twos_complement():
+    assert to_twos_complement(-1, 8) == 0xFF
+    assert to_twos_complement(5, 8) == 5
+    assert from_twos_complement(0xFF, 8) == -1
+    assert from_twos_complement(0x80, 8) == -128
+    assert all(from_twos_complement(to_twos_complement(i, 6), 6) == i for i in range(-32, 32))
+
+
+@pytest.mark.parametrize("precision", [16, 32, 64])
+@pytest.mark.parametrize("number", [0.0, -0.0, 1.0, -2.5, 0.15625, math.inf])
+def test_float_roundtrip(number, precision):
+    binary = float2binary(number, precision)
+    assert len(binary) == precision
+    assert binary2float(binary) == number
+    assert math.copysign(1, binary2float(binary)) == math.copysign(1, number)
+
+
+def test_float2binary_layout():
+    # sign, 8 exponent and 23 fraction bits
+    assert float2binary(0.15625) == "0" + "01111100" + "01000000000000000000000"
+    assert float2binary(-1.0) == "1" + "01111111" + "0" * 23
+    assert math.isnan(binary2float(float2binary(math.nan, 64)))
+    with pytest.raises(ValueError):
+        float2binary(1.0, 8)
+
+
+def test_bytes_bits_roundtrip():
+    data = bytes(range(256))
+    bits = bytes2bits(data)
+    assert bits.dtype == bool and bits.shape == (2048,)
+    np.testing.assert_array_equal(bits[8:16], [0, 0, 0, 0, 0, 0, 0, 1])
+    assert bits2bytes(bits) == data
+    assert bits2bytes([1, 0, 1]) == b"\xa0"
+
+
+@pytest.mark.parametrize("precision", [1, 7, 8, 33, 64])
+def test_ints_bits_roundtrip(precision):
+    values = np.random.default_rng(0).integers(0, 1 << min(precision, 63), size=1000, dtype=np.uint64)
+    bits = ints2bits(values, precision)
+    assert bits.shape == (1000, precision)
+    np.testing.assert_array_equal(bits2ints(bits), values)
+    assert "".join("1" if bit else "0" for bit in bits[0]) == int2binary(int(values[0]), precision)
+
+
+def test_ints_bits_signed():
+    values = list(range(-128, 128))
+    bits = ints2bits(values, 8, signed=True)
+    assert [int2binary(value, 8, signed=True) for value in values] == ["".join(map(str, row * 1)) for row in bits]
+    np.testing.assert_array_equal(bits2ints(bits, signed=True), values)
+    np.testing.assert_array_equal(bits2ints(bits), [value & 0xFF for value in values])
+
+
+def test_ints2bits_full_width():
+    bits = ints2bits([2**64 - 1, 5], 64)
+    assert bits[0].all()
+    np.testing.assert_array_equal(bits2ints(bits), np.array([2**64 - 1, 5], dtype=np.uint64))
+    np.testing.assert_array_equal(bits2ints(ints2bits([-(2**63), 2**63 - 1], 64, True), True), [-(2**63), 2**63 - 1])
+
+
+def test_ints2bits_errors():
+    with pytest.raises(ValueError):
+        ints2bits([256], 8)
+    with pytest.raises(ValueError):
+        ints2bits(np.array([-1]), 8)
+    with pytest.raises(ValueError):
+        ints2bits([128], 8, signed=True)
+    with pytest.raises(TypeError):
+        ints2bits(np.array([1.5]), 8)
+    with pytest.raises(ValueError):
+        ints2bits([1], 65)
+
+
+def test_utf8_binary_roundtrip():
+    assert utf8tobinary("A") == "01000001"
+    assert binary2utf8(utf8tobinary(TEXT)) == TEXT
+    assert len(utf8tobinary(TEXT)) == 8 * len(TEXT.encode("utf-8"))
+    with pytest.raises(ValueError):
+        binary2utf8("0100000")
+
+
+def test_encode_utf8_streaming():
+    chunks = [TEXT[i : i + 3] for i in range(0, len(TEXT), 3)]
+    bits = np.concatenate(list(encode_utf8(chunks)))
+    np.testing.assert_array_equal(bits, bytes2bits(TEXT.encode("utf-8")))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 8, 13, 1000])
+def test_decode_utf8_streaming_splits_characters(chunk_size):
+    bits = bytes2bits(TEXT.encode("utf-8"))
+    chunks = (bits[i : i + chunk_size] for i in range(0, len(bits), chunk_size))
+    assert "".join(decode_utf8(chunks)) == TEXT
+
+
+def test_decode_utf8_incomplete_stream():
+    bits = bytes2bits("日".encode("utf-8"))
+    with pytest.raises(ValueError):
+        "".join(decode_utf8([bits[:-3]]))
+    with pytest.raises(ValueError):
+        "".join(decode_utf8([bits[:-8]]))
@@ -0,0 +1,194 @@
+import pytest
+
+from computer.bits_and_bytes import Bit, Byte
+from computer.cpu import CPU, assemble, decode, encode
+
+
+SUM = """
+    LOADI A 0      ; sum
+    LOAD B 100     ; counter
+loop:
+    ADD A B
+    DEC B
+    JNZ loop
+    STORE A 101
+    HALT
+"""
+
+
+def test_encode_decode():
+    assert encode("LOADI", "C", 42) == bytes([0b0011_1000, 42])
+    assert encode("ADD", "A", "D") == bytes([0b0100_0011])
+    assert encode("JNZ", 7) == bytes([0b1101_1100, 7])
+    for instruction in ["LOADI C 42", "ADD A D", "JNZ 7", "JUMP 3", "NEG B", "HALT", "STOREX A B"]:
+        code = assemble(instruction)
+        assert str(decode(*code)) == instruction
+
+
+def test_assemble_labels_and_data():
+    program = assemble("start:\n JUMP end\n DATA 1 2 0x03\nend: HALT")
+    assert program == bytes([0b1101_0000, 5, 1, 2, 3, 0])
+
+
+@pytest.mark.parametrize("cache", [True, False])
+def test_cpu_runs_loop(cache):
+    cpu = CPU(cache=cache)
+    cpu.load(assemble(SUM))
+    cpu.write(100, 10)
+    stats = cpu.run()
+    assert cpu.halted
+    assert int(cpu.read(101)) == 55
+    assert stats.instructions == 2 + 3 * 10 + 2
+    assert stats.cycles == 3 + 4 + 10 * (2 + 2 + 3) + 4 + 2
+    assert stats.cpi == stats.cycles / stats.instructions
+    assert stats.ips > 0
+    # with the cache every instruction is decoded once, without it on every execution
+    assert cpu.decodes == (7 if cache else stats.instructions)
+
+
+def test_cpu_arithmetic_and_memory():
+    cpu = CPU()
+    cpu.load(assemble("""
+        LOADI A 12
+        LOADI B 5
+        MOV C A
+        MUL C B     ; 60
+        MOV D A
+        DIV D B     ; 2
+        LOADI B 200
+        STOREX C B
+        LOADX A B
+        NEG A
+        HALT
+    """))
+    cpu.run()
+    assert int(cpu.register("C")) == 60
+    assert int(cpu.register("D")) == 2
+    assert int(cpu.read(200)) == 60
+    assert cpu.register("A") == Byte.from_int(-60 % 256)
+    assert cpu.flags["negative"]
+
+
+def test_cpu_self_modifying_code_invalidates_decoded_instruction():
+    # the loop rewrites the immediate of the LOADI at address 2, so each pass must run the new instruction
+    cpu = CPU()
+    cpu.load(assemble("""
+        JUMP start
+    patched:
+        LOADI A 0
+        ADD B A
+        DEC D
+        JNZ loop
+        HALT
+    start:
+        LOADI D 3
+    loop:
+        INC C
+        STORE C 3
+        JUMP patched
+    """))
+    cpu.run()
+    assert int(cpu.register("B")) == 1 + 2 + 3
+    assert str(cpu.fetch(2)) == "LOADI A 3"
+
+
+def test_cpu_run_limit_and_cmp():
+    cpu = CPU()
+    cpu.load(assemble("LOADI A 3\nLOADI B 3\nCMP A B\nJZ equal\nHALT\nequal: LOADI C 1\nHALT"))
+    assert cpu.run(max_instructions=2).instructions == 2
+    assert not cpu.halted
+    cpu.run()
+    assert int(cpu.register("C")) == 1
+    assert int(cpu.register("A")) == 3
+    assert cpu.stats.instructions == 6
+
+
+NESTED = """
+    LOADI C 4
+outer:
+    LOADI D 2
+    LOADI A 0
+    LOADI B 200
+inner:
+    LOADX A B      ; A = memory[B]
+    MUL A D
+    CMP A C
+    JNEG small
+    SUB A C
+small:
+    STOREX A B
+    INC B
+    JNZ inner
+    DEC C
+    JNZ outer
+    HALT
+"""
+
+
+def state(cpu):
+    return (
+        cpu.pc,
+        [int(cpu.register(name)) for name in "ABCD"],
+        cpu.flags,
+        cpu.halted,
+        cpu.instructions,
+        cpu.cycles,
+        bytes(int(cpu.read(address)) for address in range(256)),
+    )
+
+
+@pytest.mark.parametrize("program", [SUM, NESTED], ids=["sum", "nested"])
+def test_translated_execution_matches_interpreted_cycle_for_cycle(program):
+    cpus = [CPU(translate=False), CPU(translate=True)]
+    for cpu in cpus:
+        cpu.load(assemble(program))
+        cpu.load(range(200, 256), 200)
+        cpu.write(100, 9)
+    while not cpus[0].halted:
+        for cpu in cpus:
+            cpu.run(max_instructions=37)
+        assert state(cpus[0]) == state(cpus[1])
+    assert cpus[1].translations > 0
+    assert cpus[1].stats.cpi == cpus[0].stats.cpi
+
+
+def test_translated_block_source():
+    cpu = CPU(translate=True, hot_threshold=1)
+    cpu.load(assemble(SUM))
+    block = cpu.translate_block(4)
+    assert (block.start, block.size, block.instructions, block.cycles) == (4, 4, 3, 7)
+    assert "_add(r0, r1)" in block.source and "_decrement(r1)" in block.source
+
+
+def test_translated_self_modifying_code():
+    program = assemble("""
+        JUMP start
+    patched:
+        LOADI A 0
+        ADD B A
+        DEC D
+        JNZ loop
+        HALT
+    start:
+        LOADI D 5
+    loop:
+        INC C
+        STORE C 3
+        JUMP patched
+    """)
+    cpu = CPU(translate=True, hot_threshold=1)
+    cpu.load(program)
+    cpu.run()
+    assert int(cpu.register("B")) == 1 + 2 + 3 + 4 + 5
+    assert cpu.translations > 5  # the patched block is translated again after every store
+
+
+def test_external_memory_writes_invalidate_translations():
+    cpu = CPU(translate=True, hot_threshold=1)
+    cpu.load(assemble("LOADI A 1\nHALT"))
+    cpu.run()
+    assert int(cpu.register("A")) == 1 and cpu.translations == 1
+    cpu.memory.write(1, Byte.from_int(7), Bit(1))  # bypasses the CPU
+    cpu.halted, cpu.pc = False, 0
+    cpu.run()
+    assert int(cpu.register("A")) == 7 and cpu.translations == 2
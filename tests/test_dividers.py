@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from computer.bits_and_bytes import BitString
+from computer.dividers import DIVIDERS, Divider
+
+
+@pytest.mark.parametrize("kind", DIVIDERS)
+@pytest.mark.parametrize("precision", [1, 2, 3, 5])
+def test_divider_exhaustive(kind, precision):
+    divider = Divider(kind, precision)
+    for a in range(1 << precision):
+        for b in range(1 << precision):
+            quotient, remainder = divider(BitString.from_int(a, precision), BitString.from_int(b, precision))
+            if b == 0:
+                assert (int(quotient), int(remainder)) == ((1 << precision) - 1, a)
+            else:
+                assert (int(quotient), int(remainder)) == divmod(a, b)
+
+
+@pytest.mark.parametrize("kind", DIVIDERS)
+def test_divider_batch(kind):
+    a = np.arange(256).repeat(255)
+    b = np.tile(np.arange(1, 256), 256)
+    quotient, remainder = Divider(kind, 8).batch(a, b)
+    assert (quotient == a // b).all()
+    assert (remainder == a % b).all()
+
+
+@pytest.mark.parametrize("kind", DIVIDERS)
+def test_divider_stats(kind):
+    small, large = Divider(kind, 4), Divider(kind, 8)
+    assert 0 < small.gate_count < large.gate_count
+    assert 0 < small.depth < large.depth
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from computer.adders import carry_look_ahead_adder, full_adder, ripple_carry_adder, ripple_carry_adder_8bit
+from computer.bits_and_bytes import Bit
+from computer.equivalence import batchable, check_equivalence
+from computer.gates import XOR
+
+
+def add_8bit(a, b):
+    return a + b, (a + b) >> 8
+
+
+def add_6bit(a, b):
+    return a + b, (a + b) >> 6
+
+
+def add_with_carry_16bit(a, b, c):
+    return a + b + c, (a + b + c) >> 16
+
+
+def broken_adder(a, b):
+    """A ripple carry adder that branches on its inputs and gets the carry wrong for one of them."""
+    sum, carry = ripple_carry_adder(a, b)
+    if int(a) == 50 and int(b) == 20:
+        return sum, ~carry
+    return sum, carry
+
+
+def test_ripple_carry_adder_8bit_exhaustively():
+    result = check_equivalence(ripple_carry_adder_8bit, add_8bit, (8, 8))
+    assert result.equivalent and result.exhaustive
+    assert result.checked == 1 << 16
+
+
+def test_bit_inputs_and_outputs():
+    assert check_equivalence(full_adder, lambda a, b, c: ((a + b + c) & 1, (a + b + c) >> 1), (0, 0, 0)).equivalent
+    assert check_equivalence(XOR, lambda a, b: a ^ b, (0, 0)).checked == 4
+
+
+def test_first_counterexample_is_reported():
+    result = check_equivalence(ripple_carry_adder, lambda a, b: (a - b, 0), (4, 4))
+    assert not result.equivalent
+    assert result.counterexample.inputs == (0, 1)
+    assert result.counterexample.expected == (15, 0)
+    assert result.counterexample.actual == (1, 0)
+
+
+def test_circuits_that_branch_fall_back_to_scalar_evaluation():
+    result = check_equivalence(broken_adder, add_6bit, (6, 6))
+    assert result.counterexample == ((50, 20), (6, 1), (6, 0))
+    assert result.checked == 1 << 12
+
+
+def test_batched_errors_are_not_hidden():
+    assert batchable(ripple_carry_adder, (6, 6)) and not batchable(broken_adder, (6, 6))
+    with pytest.raises(TypeError):
+        check_equivalence(broken_adder, add_6bit, (6, 6), batched=True)
+
+
+def test_random_sample_of_wide_circuit_with_vectorized_reference():
+    def reference(a, b):
+        return np.array([x + y for x, y in zip(a.tolist(), b.tolist())], dtype=object), 0
+
+    result = check_equivalence(
+        lambda a, b: (carry_look_ahead_adder(a, b)[0], Bit(0)),
+        reference,
+        (64, 64),
+        samples=3000,
+        chunk_size=1000,
+        processes=1,
+        vectorized=True,
+    )
+    assert result.equivalent and not result.exhaustive
+    assert result.checked == 3000
+
+
+def test_process_pool():
+    result = check_equivalence(
+        ripple_carry_adder, add_with_carry_16bit, (16, 16, 0), samples=4096, chunk_size=1024, processes=2
+    )
+    assert result.equivalent and result.checked == 4096
+    result = check_equivalence(broken_adder, add_6bit, (6, 6), chunk_size=1 << 10, processes=2)
+    assert result.counterexample.inputs == (50, 20)
+    assert result.checked == 4 * (1 << 10)  # the counterexample is in the fourth chunk
@@ -1,4 +1,6 @@
-from computer.bits_and_bytes import Bit
+import pytest
+
+from computer.bits_and_bytes import Bit, ONE, ZERO
 from computer.gates import AND, OR, NOT, XOR, NAND
 
 
@@ -33,3 +35,15 @@ def test_nand():
     assert NAND(Bit(0), Bit(1)) == Bit(1)
     assert NAND(Bit(1), Bit(0)) == Bit(1)
     assert NAND(Bit(1), Bit(1)) == Bit(0)
+
+
+@pytest.mark.parametrize("gate", [AND, OR, XOR, NAND])
+def test_binary_gates_return_singletons(gate):
+    for a in (ZERO, ONE):
+        for b in (ZERO, ONE):
+            assert gate(a, b) is ZERO or gate(a, b) is ONE
+
+
+def test_not_returns_singletons():
+    assert NOT(ZERO) is ONE
+    assert NOT(ONE) is ZERO
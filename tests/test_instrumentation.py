@@ -0,0 +1,41 @@
+import sys
+
+from computer import gates
+from computer.adders import full_adder, ripple_carry_adder_8bit
+from computer.bits_and_bytes import Bit, Byte
+from computer.instrumentation import GateActivity, count_gates
+from computer.ram import MatrixRegister
+
+
+def test_count_gates_per_type_and_circuit():
+    (sum, carry), activity = count_gates(full_adder, Bit(1), Bit(0), Bit(1))
+    assert (sum, carry) == (Bit(0), Bit(1))
+    # two XORs of 4 gates and an AND in each half adder plus the OR of the full adder
+    assert activity.gates == {"AND": 6, "OR": 3, "NOT": 2}
+    assert activity.circuits["computer.adders.half_adder"] == {"AND": 6, "OR": 2, "NOT": 2}
+    assert activity.circuits["computer.adders.full_adder"] == {"OR": 1}
+    assert activity.total == 11
+
+
+def test_count_gates_of_ripple_carry_adder_8bit():
+    _, activity = count_gates(ripple_carry_adder_8bit, Byte.from_int(100), Byte.from_int(57))
+    assert activity.total == 8 * 11
+
+
+def test_inclusive_counts_attribute_gates_to_every_enclosing_circuit():
+    register = MatrixRegister(16)
+    _, activity = count_gates(register.write, 3, 4, Bit(1), Bit(1), inclusive=True)
+    assert activity.inclusive_circuits["computer.ram.MatrixRegister.write"] == activity.gates
+    assert activity.circuits["computer.ram.Gate.__call__"] == {"AND": 2, "NOT": 1}
+    assert "computer.ram.MatrixRegister.write" in activity.report()
+
+
+def test_instrumentation_is_off_outside_the_context():
+    previous = sys.getprofile()
+    with GateActivity() as activity:
+        gates.AND(Bit(1), Bit(1))
+    gates.AND(Bit(1), Bit(1))
+    assert activity.gates == {"AND": 1}
+    assert sys.getprofile() is previous
+    activity.reset()
+    assert activity.total == 0
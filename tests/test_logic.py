@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from computer.bits_and_bytes import Bit, BitString, Byte
+from computer.logic import (
+    REDUCTIONS,
+    Reduction,
+    all_set,
+    any_set,
+    compare,
+    equal,
+    greater_than,
+    is_zero,
+    is_zero_8bit,
+    less_than,
+    parity,
+    popcount,
+)
+
+
+def signed(value, width):
+    return value - (1 << width) if value >> (width - 1) else value
+
+
+@pytest.mark.parametrize("width", [1, 2, 3, 5, 8])
+def test_single_word_reductions(width):
+    for value in range(1 << width):
+        a = BitString.from_int(value, width)
+        ones = bin(value).count("1")
+        assert is_zero(a) == Bit(value == 0)
+        assert any_set(a) == Bit(value != 0)
+        assert all_set(a) == Bit(ones == width)
+        assert parity(a) == Bit(ones % 2)
+        count = popcount(a)
+        assert len(count) == width.bit_length()
+        assert int(count) == ones
+
+
+@pytest.mark.parametrize("width", [1, 2, 3, 4])
+def test_comparators(width):
+    for x in range(1 << width):
+        for y in range(1 << width):
+            a, b = BitString.from_int(x, width), BitString.from_int(y, width)
+            assert equal(a, b) == Bit(x == y)
+            assert less_than(a, b) == Bit(x < y)
+            assert greater_than(a, b) == Bit(x > y)
+            assert compare(a, b) == (Bit(x < y), Bit(x == y), Bit(x > y))
+            sx, sy = signed(x, width), signed(y, width)
+            assert less_than(a, b, signed=True) == Bit(sx < sy)
+            assert greater_than(a, b, signed=True) == Bit(sx > sy)
+            assert compare(a, b, signed=True) == (Bit(sx < sy), Bit(sx == sy), Bit(sx > sy))
+
+
+def test_popcount_of_byte_is_bitstring():
+    count = popcount(Byte.from_int(0b10110111))
+    assert type(count) is BitString
+    assert count == BitString("0110")
+
+
+def test_reduction_batch_single_word():
+    values = np.arange(1 << 12, dtype=np.uint64)
+    ones = np.array([bin(value).count("1") for value in range(1 << 12)])
+    np.testing.assert_array_equal(Reduction("is_zero", 12).batch(values), values == 0)
+    np.testing.assert_array_equal(Reduction("parity", 12).batch(values), ones % 2 == 1)
+    np.testing.assert_array_equal(Reduction("popcount", 12).batch(values), ones)
+
+
+@pytest.mark.parametrize("is_signed", [False, True])
+def test_reduction_batch_comparators(is_signed):
+    a = np.arange(256, dtype=np.uint64).repeat(256)
+    b = np.tile(np.arange(256, dtype=np.uint64), 256)
+    x, y = (a.astype(np.int64), b.astype(np.int64))
+    if is_signed:
+        x, y = (x ^ 0x80) - 0x80, (y ^ 0x80) - 0x80
+    less, same, greater = Reduction("compare", 8, signed=is_signed).batch(a, b)
+    np.testing.assert_array_equal(less, x < y)
+    np.testing.assert_array_equal(same, x == y)
+    np.testing.assert_array_equal(greater, x > y)
+    np.testing.assert_array_equal(Reduction("less_than", 8, signed=is_signed).batch(a, b), x < y)
+    np.testing.assert_array_equal(Reduction("equal", 8).batch(a, b), x == y)
+
+
+def test_reduction_rejects_unsigned_kinds_as_signed():
+    with pytest.raises(AssertionError):
+        Reduction("parity", 8, signed=True)
+    with pytest.raises(AssertionError):
+        Reduction("majority", 8)
+
+
+@pytest.mark.parametrize("kind", REDUCTIONS)
+def test_reduction_depth_is_logarithmic(kind):
+    depths = [Reduction(kind, width).depth for width in (8, 16, 32, 64)]
+    steps = np.diff(depths)
+    assert (steps > 0).all()
+    # the depth grows by a bounded amount whenever the width doubles, rather than doubling with it
+    assert steps.max() <= depths[0] and depths[-1] < 64
+
+
+def test_is_zero_depth():
+    assert Reduction("any_set", 64).depth == 6
+    assert Reduction("any_set", 64).gate_count == 63
+    assert Reduction("is_zero", 64).depth == 7
+
+
+def test_is_zero_8bit():
+    assert is_zero_8bit(Byte.from_int(0)) == Bit(1)
+    assert is_zero_8bit(Byte.from_int(16)) == Bit(0)
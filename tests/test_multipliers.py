@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+from computer.bits_and_bytes import BitString, Byte
+from computer.multipliers import MULTIPLIERS, Multiplier, array_multiplier, booth_multiplier
+
+
+def signed(value, precision):
+    return value - (1 << precision) if value >> (precision - 1) else value
+
+
+@pytest.mark.parametrize("kind", MULTIPLIERS)
+@pytest.mark.parametrize("precision", [1, 2, 3, 4])
+def test_multiplier_exhaustive(kind, precision):
+    multiplier = Multiplier(kind, precision)
+    for a in range(1 << precision):
+        for b in range(1 << precision):
+            product = multiplier(BitString.from_int(a, precision), BitString.from_int(b, precision))
+            assert len(product) == 2 * precision
+            if multiplier.signed:
+                expected = signed(a, precision) * signed(b, precision) % (1 << 2 * precision)
+            else:
+                expected = a * b
+            assert int(product) == expected
+
+
+@pytest.mark.parametrize("kind", MULTIPLIERS)
+def test_multiplier_random_16bit(kind):
+    multiplier = Multiplier(kind, 16, signed=False if kind == "booth" else None)
+    rng = random.Random(0)
+    for _ in range(50):
+        a, b = rng.getrandbits(16), rng.getrandbits(16)
+        assert int(multiplier(BitString.from_int(a, 16), BitString.from_int(b, 16))) == a * b
+
+
+@pytest.mark.parametrize("precision", [3, 5, 8])
+def test_booth_multiplier_unsigned(precision):
+    for a in range(0, 1 << precision, 3):
+        for b in range(0, 1 << precision, 5):
+            product = booth_multiplier(BitString.from_int(a, precision), BitString.from_int(b, precision), False)
+            assert int(product) == a * b
+
+
+def test_multiplier_of_bytes_is_a_bitstring():
+    product = array_multiplier(Byte.from_int(200), Byte.from_int(100))
+    assert type(product) is BitString and int(product) == 20000
+
+
+@pytest.mark.parametrize("kind", MULTIPLIERS)
+def test_multiplier_batch(kind):
+    multiplier = Multiplier(kind, 8)
+    a = np.arange(256).repeat(256)
+    b = np.tile(np.arange(256), 256)
+    if multiplier.signed:
+        expected = (((a ^ 128) - 128) * ((b ^ 128) - 128)) % (1 << 16)
+    else:
+        expected = a * b
+    assert (multiplier.batch(a, b) == expected).all()
+
+
+def test_multiplier_stats():
+    stats = {kind: Multiplier(kind, 16).stats for kind in MULTIPLIERS}
+    assert all(stats.gate_count > 0 for stats in stats.values())
+    # tree reduction is logarithmic in the number of partial products, the array is linear
+    assert stats["wallace"].depth < stats["array"].depth
+    assert stats["dadda"].depth < stats["array"].depth
+    # Dadda reduces as late as possible and so uses fewer adders than Wallace
+    assert stats["dadda"].gate_count < stats["wallace"].gate_count
+    assert Multiplier("dadda", 16).depth == stats["dadda"].depth
@@ -0,0 +1,56 @@
+import itertools
+import random
+
+import pytest
+
+from computer.adders import carry_look_ahead_adder, full_adder, half_adder, ripple_carry_adder, ripple_carry_adder_8bit
+from computer.analysis import measure
+from computer.bits_and_bytes import Bit, BitString, Byte
+from computer.gates import NAND, XOR
+from computer.netlist import compile_circuit, trace
+
+
+@pytest.mark.parametrize("circuit, n_inputs", [(XOR, 2), (NAND, 2), (half_adder, 2), (full_adder, 3)])
+def test_compiled_bit_circuits(circuit, n_inputs):
+    compiled = compile_circuit(circuit, *[0] * n_inputs)
+    for inputs in itertools.product([Bit(0), Bit(1)], repeat=n_inputs):
+        assert compiled(*inputs) == circuit(*inputs)
+
+
+def test_compiled_ripple_carry_adder_8bit():
+    compiled = compile_circuit(ripple_carry_adder_8bit, 8, 8, word_type=Byte)
+    assert compile_circuit(ripple_carry_adder_8bit, 8, 8, word_type=Byte) is compiled
+    for x, y in itertools.product(range(0, 256, 7), range(0, 256, 11)):
+        a, b = Byte.from_int(x), Byte.from_int(y)
+        sum, carry = compiled(a, b)
+        assert isinstance(sum, Byte)
+        assert (sum, carry) == ripple_carry_adder_8bit(a, b)
+
+
+def test_compiled_carry_look_ahead_adder():
+    compiled = compile_circuit(carry_look_ahead_adder, 16, 16, 0)
+    rng = random.Random(0)
+    for _ in range(100):
+        a, b = BitString.from_int(rng.getrandbits(16), 16), BitString.from_int(rng.getrandbits(16), 16)
+        carry = Bit(rng.getrandbits(1))
+        assert compiled(a, b, carry) == ripple_carry_adder(a, b, carry)
+
+
+def test_netlist_structure():
+    netlist = trace(full_adder, 0, 0, 0)
+    order = netlist.topological_order()
+    position = {node: i for i, node in enumerate(order)}
+    for node in order:
+        assert all(position.get(source, -1) < position[node] for source in netlist.nodes[node][1:])
+    assert len(order) <= measure(full_adder, 0, 0, 0).gate_count
+
+
+def test_trace_folds_constants_and_removes_dead_gates():
+    netlist = trace(lambda a, b: (XOR(a, Bit(0)), half_adder(a, b)[1]), 0, 0)
+    assert len(netlist.topological_order()) == 1
+    assert netlist.compile()(Bit(1), Bit(1)) == (Bit(1), Bit(1))
+
+
+def test_trace_rejects_data_dependent_branches():
+    with pytest.raises(TypeError):
+        trace(lambda a: a if a else Bit(0), 0)
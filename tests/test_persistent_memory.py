@@ -0,0 +1,90 @@
+import pytest
+
+from computer.bits_and_bytes import Bit, Byte
+from computer.persistent_memory import PersistentMemory, journal_record
+
+
+def test_bit_read_write(tmp_path):
+    with PersistentMemory(str(tmp_path / "image"), size=32) as memory:
+        memory.write(Byte.from_int(9), Bit(1), Bit(1))
+        memory.write(10, Bit(1), Bit(0))
+        assert memory.read(9, Bit(1)) == Bit(1)
+        assert memory.read(9, Bit(0)) == Bit(0)
+        assert memory.read(10, Bit(1)) == Bit(0)
+        assert bytes(memory.read_block(1, 1)) == b"\x40"
+        memory.write(9, Bit(0), Bit(1))
+        assert memory.read(9, Bit(1)) == Bit(0)
+
+
+def test_contents_persist(tmp_path):
+    path = str(tmp_path / "image")
+    with PersistentMemory(path, size=3 * 4096, fsync=False) as memory:
+        memory.write_block(4090, b"persistent")
+    with PersistentMemory(path) as memory:
+        assert memory.size == 3 * 4096
+        assert bytes(memory.read_block(4090, 10)) == b"persistent"
+
+
+def test_read_block_is_zero_copy(tmp_path):
+    with PersistentMemory(str(tmp_path / "image"), size=16) as memory:
+        view = memory.read_block(0, 4)
+        memory.write_block(0, b"abcd")
+        assert bytes(view) == b"abcd"
+        view.release()
+
+
+def test_journal_is_replayed_after_a_crash(tmp_path):
+    path = str(tmp_path / "image")
+    PersistentMemory(path, size=64).close()
+    # a crash after journaling a write but before it reached the image
+    with open(path + ".journal", "wb") as journal:
+        journal.write(journal_record(8, b"committed"))
+    with PersistentMemory(path) as memory:
+        assert bytes(memory.read_block(8, 9)) == b"committed"
+
+
+@pytest.mark.parametrize("torn_bytes", [1, 5, 20])
+def test_torn_journal_record_is_discarded(tmp_path, torn_bytes):
+    path = str(tmp_path / "image")
+    with PersistentMemory(path, size=64) as memory:
+        memory.write_block(0, b"old data")
+    with open(path + ".journal", "wb") as journal:
+        journal.write(journal_record(0, b"new"))
+        journal.write(journal_record(0, b"torn data")[:-torn_bytes])
+    with PersistentMemory(path) as memory:
+        assert bytes(memory.read_block(0, 8)) == b"new data"
+
+
+def test_checkpoint_empties_journal(tmp_path):
+    path = str(tmp_path / "image")
+    with PersistentMemory(path, size=64, journal_limit=100, fsync=False) as memory:
+        for i in range(20):
+            memory.write_block(i, b"x")
+        assert memory._journal.tell() <= 100
+
+
+def test_arguments_are_checked_before_creating_files(tmp_path):
+    path = tmp_path / "image"
+    with pytest.raises(AssertionError):
+        PersistentMemory(str(path))
+    with pytest.raises(AssertionError):
+        PersistentMemory(str(path), size=0)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_bit_writes_do_not_sync(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr("computer.persistent_memory.os.fsync", lambda descriptor: synced.append(descriptor))
+    with PersistentMemory(str(tmp_path / "image"), size=16) as memory:
+        synced.clear()
+        for address in range(64):
+            memory.write(address, Bit(1), Bit(1))
+        assert synced == []
+        memory.sync()
+        memory.sync()
+        assert len(synced) == 1
+        memory.write(0, Bit(0), Bit(1))
+        memory.write_block(4, b"\x01")
+        assert len(synced) == 2
+    with PersistentMemory(str(tmp_path / "image")) as memory:
+        assert bytes(memory.read_block(0, 8)) == b"\x7f\xff\xff\xff\x01\xff\xff\xff"
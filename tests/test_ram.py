@@ -1,7 +1,21 @@
+import pickle
+import random
+
+import numpy as np
 import pytest
-from computer.bits_and_bytes import Bit
+from computer.bits_and_bytes import Bit, BitString, Byte
 
-from computer.ram import AndOrLatch, GatedLatch, MatrixRegister
+from computer.ram import (
+    SRAM,
+    AndOrLatch,
+    Decoder,
+    GatedLatch,
+    LinearRegister,
+    MatrixRegister,
+    MemoryCell,
+    MultiPlexer,
+    PackedMatrixRegister,
+)
 
 
 @pytest.mark.parametrize(
@@ -47,6 +61,17 @@ def test_gated_latch(data, write_enable, initial_state, expected_state):
     assert gated_latch.read() == expected_state
 
 
+@pytest.mark.parametrize("width", [8, 12])
+def test_linear_register(width):
+    register = LinearRegister(width)
+    assert int(register.read()) == 0
+    register.write(BitString.from_int(0b1010_0101, width), Bit(1))
+    assert register.read() == BitString.from_int(0b1010_0101, width)
+    register.write(BitString.from_int(3, width), Bit(0))
+    assert int(register.read()) == 0b1010_0101
+    assert type(register.read()) is (Byte if width == 8 else BitString)
+
+
 @pytest.mark.parametrize(
     "data, read_enable, write_enable, expected_state",
     [
@@ -60,10 +85,11 @@ def test_gated_latch(data, write_enable, initial_state, expected_state):
         ("1", "1", "1", "1"),  # data and read and write enable on
     ]
 )
-def test_register(data, read_enable, write_enable, expected_state):
+@pytest.mark.parametrize("register_class", [MatrixRegister, PackedMatrixRegister])
+def test_register(data, read_enable, write_enable, expected_state, register_class):
     data, read_enable, write_enable, expected_state = Bit(data), Bit(read_enable), Bit(write_enable), Bit(expected_state)
     
-    register = MatrixRegister(width=16)
+    register = register_class(width=16)
     
     # all start at zero
     for r in range(16):
@@ -75,4 +101,139 @@ def test_register(data, read_enable, write_enable, expected_state):
     if read_enable and write_enable:
         assert register.read(0, 0, read_enable) == data
     else:
-        assert register.read(0, 0, read_enable) == Bit(0)
\ No newline at end of file
+        assert register.read(0, 0, read_enable) == Bit(0)
+
+
+@pytest.mark.parametrize("width", [4, 16, 17])
+def test_packed_register_matches_latch_register(width):
+    rng = random.Random(width)
+    latches, packed = MatrixRegister(width), PackedMatrixRegister(width)
+    for _ in range(500):
+        row, col, enable = rng.randrange(width), rng.randrange(width), Bit(rng.getrandbits(1))
+        if rng.random() < 0.5:
+            data = Bit(rng.getrandbits(1))
+            latches.write(row, col, data, enable)
+            packed.write(row, col, data, enable)
+        else:
+            assert packed.read(row, col, enable) == latches.read(row, col, enable)
+    for row in range(width):
+        for col in range(width):
+            assert packed.read(row, col, Bit(1)) == latches.read(row, col, Bit(1))
+
+
+def test_packed_register_bounds():
+    register = PackedMatrixRegister(4)
+    register.write(1, 0, Bit(1), Bit(1))
+    with pytest.raises(AssertionError):
+        register.read(0, 4, Bit(1))
+    with pytest.raises(AssertionError):
+        register.write(-1, 0, Bit(1), Bit(1))
+    with pytest.raises(AssertionError):
+        register.read_range(12, 5)
+    with pytest.raises(AssertionError):
+        register.read_bits(np.array([3, 16]))
+
+
+def test_packed_register_bits_by_index():
+    register = PackedMatrixRegister(4)
+    register.write(0, 1, Bit(1), Bit(1))
+    # bits 0 to 3 share the first byte with the bit set above
+    register.write_bits(np.array([0, 1, 3, 9]), np.array([True, False, True, True]))
+    assert register.buffer == bytearray([0b10010000, 0b01000000])
+    np.testing.assert_array_equal(register.read_bits(np.array([[0, 1], [3, 9]])), [[True, False], [True, True]])
+
+
+@pytest.mark.parametrize("storage", ["latches", "packed"])
+def test_sram_words(storage):
+    sram = SRAM(n_registers=8, register_width=16, storage=storage)
+    sram.write(3, Byte("10110001"), Bit(1))
+    sram.write(Byte("00000100"), Byte("11111111"), Bit(0))
+    assert sram.read(3, Bit(1)) == Byte("10110001")
+    assert sram.read(Byte("00000011"), Bit(0)) == Byte("00000000")
+    assert sram.read(4, Bit(1)) == Byte("00000000")
+
+
+@pytest.mark.parametrize("storage", ["latches", "packed"])
+def test_sram_blocks_match_single_word_accesses(storage):
+    rng = random.Random(0)
+    sram = SRAM(n_registers=16, register_width=16, storage=storage)
+    reference = SRAM(n_registers=16, register_width=16, storage=storage)
+    for _ in range(5):
+        address, count = rng.randrange(250), rng.randrange(1, 7)
+        data = bytes(rng.getrandbits(8) for _ in range(2 * count))
+        enable = Bit(rng.getrandbits(1))
+        sram.write_block(address, memoryview(data), enable)
+        for i in range(count):
+            reference.write(address + i, BitString.from_bytes(data[2 * i : 2 * i + 2]), enable)
+        expected = b"".join(bytes(reference.read(address + i, Bit(1))) for i in range(count))
+        assert sram.read_block(address, count) == expected
+    out = bytearray(512)
+    assert bytes(sram.read_block(0, 256, out=memoryview(out))) == bytes(reference.read_block(0, 256))
+    assert sram.read_block(0, 4, Bit(0)) == bytes(8)
+
+
+@pytest.mark.parametrize("width", [1, 2, 4, 16, 64])
+def test_decoder(width):
+    decoder = Decoder(width)
+    bits = decoder.address_bits
+    for address in range(0, width * width, max(1, width // 3)):
+        row, col = decoder.decode(address)
+        assert (row, col) == divmod(address, width)
+        assert decoder.decode(BitString.from_int(address, 2 * bits)) == (row, col)
+        rows, cols = decoder.select(address)
+        assert [bool(wire) for wire in rows] == [i == row for i in range(width)]
+        assert [bool(wire) for wire in cols] == [i == col for i in range(width)]
+    addresses = np.arange(width * width).reshape(width, width)
+    rows, cols = decoder.decode_batch(addresses)
+    np.testing.assert_array_equal(rows * width + cols, addresses)
+    row_wires, col_wires = decoder.select_batch(addresses)
+    assert row_wires.shape == (width, width, width)
+    np.testing.assert_array_equal(row_wires.argmax(-1), rows)
+    np.testing.assert_array_equal(col_wires.argmax(-1), cols)
+
+
+def test_decoder_rejects_other_widths():
+    with pytest.raises(AssertionError):
+        Decoder(12)
+
+
+@pytest.mark.parametrize("storage", ["latches", "packed"])
+@pytest.mark.parametrize("width", [4, 32])
+def test_memory_cell_batches_match_single_accesses(storage, width):
+    rng = np.random.default_rng(width)
+    cell, reference = MemoryCell(width, storage), MemoryCell(width, storage)
+    addresses = rng.integers(0, width * width, size=200)
+    data = rng.integers(0, 2, size=200).astype(bool)
+    cell.write_batch(addresses, data, Bit(1))
+    cell.write_batch(addresses[:10], ~data[:10], Bit(0))
+    for address, bit in zip(addresses, data):
+        reference.write(int(address), Bit(bool(bit)), Bit(1))
+    expected = [bool(reference.read(int(address), Bit(1))) for address in range(width * width)]
+    np.testing.assert_array_equal(cell.read_batch(np.arange(width * width), Bit(1)), expected)
+    assert not cell.read_batch(addresses, Bit(0)).any()
+    byte_address = Byte.from_int(3) if width == 16 else BitString.from_int(3, 2 * Decoder(width).address_bits)
+    assert cell.read(byte_address, Bit(1)) == Bit(expected[3])
+
+
+@pytest.mark.parametrize("width, address, index", [(16, "0101", 5), (64, "111110", 62), (2, "1", 1)])
+def test_multiplexer(width, address, index):
+    multiplexer = MultiPlexer(width)
+    assert multiplexer.select(BitString(address)) == index
+    assert multiplexer.select(address) == index
+    assert multiplexer.select(index) == index
+
+
+def test_latch_registers_pickle_as_their_bits():
+    register = MatrixRegister(12)
+    positions = [(0, 0), (3, 7), (11, 11)]
+    for row, col in positions:
+        register.write(row, col, Bit(1), Bit(1))
+    data = pickle.dumps(register, protocol=pickle.HIGHEST_PROTOCOL)
+    assert len(data) < 200  # 144 bits in 18 bytes rather than 144 latch objects
+    loaded = pickle.loads(data)
+    assert isinstance(loaded, MatrixRegister) and loaded.width == 12
+    assert [(row, col) for row in range(12) for col in range(12) if loaded.read(row, col, Bit(1))] == positions
+
+    linear = LinearRegister(8)
+    linear.write(Byte.from_int(0xA5), Bit(1))
+    assert pickle.loads(pickle.dumps(linear)).read() == Byte.from_int(0xA5)
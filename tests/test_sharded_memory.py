@@ -0,0 +1,101 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from computer.bits_and_bytes import Bit, BitString, Byte
+from computer.cpu import CPU, assemble
+from computer.ram import SRAM
+from computer.sharded_memory import ShardedSRAM
+
+
+@pytest.fixture(params=[False, True], ids=["in-process", "workers"])
+def memory(request):
+    with ShardedSRAM(16, 16, 8, n_shards=3, processes=request.param) as memory:
+        yield memory
+
+
+def test_shards_partition_the_address_space(memory):
+    assert memory.shard_size == 86
+    assert [len(shard) for shard in memory.shards] == [86, 86, 84]
+    assert sum(len(shard) for shard in memory.shards) == memory.n_addresses
+
+
+def test_shard_count_is_the_number_of_shards():
+    with ShardedSRAM(8, 16, 8, n_shards=100, processes=False) as memory:
+        assert memory.shard_size == 3 and memory.n_shards == len(memory.shards) == 86
+        assert "n_shards=86" in repr(memory)
+
+
+def test_read_write_like_sram(memory):
+    reference = SRAM(16, 16, 8, storage="packed")
+    rng = np.random.default_rng(0)
+    accesses = zip(rng.integers(0, 256, 300), rng.integers(0, 1 << 16, 300), rng.integers(0, 2, 300))
+    for address, value, enable in accesses:
+        address, data, enable = int(address), BitString.from_int(int(value), 16), Bit(int(enable))
+        memory.write(address, data, enable)
+        reference.write(address, data, enable)
+    for address in range(256):
+        assert memory.read(address, Bit(1)) == reference.read(address, Bit(1))
+        assert int(memory.read(address, Bit(0))) == 0
+    assert memory.read(BitString.from_int(255, 8), Bit(1)) == reference.read(255, Bit(1))
+
+
+def test_batches_like_sequential_accesses(memory):
+    reference = SRAM(16, 16, 8, storage="packed")
+    rng = np.random.default_rng(1)
+    addresses, values = rng.integers(0, 256, 2000), rng.integers(0, 1 << 16, 2000)
+    enables = rng.integers(0, 2, 2000).astype(bool)
+    memory.write_batch(addresses, values, enables)
+    for address, value, enable in zip(addresses, values, enables):
+        reference.write(int(address), BitString.from_int(int(value), 16), Bit(int(enable)))
+
+    reads = rng.integers(0, 256, 1000)
+    expected = [int(reference.read(int(address), Bit(1))) for address in reads]
+    np.testing.assert_array_equal(memory.read_batch(reads), expected)
+    np.testing.assert_array_equal(memory.read_batch(reads, Bit(0)), 0)
+    read_enables = np.arange(1000) % 2 == 0
+    np.testing.assert_array_equal(memory.read_batch(reads, read_enables), np.where(read_enables, expected, 0))
+
+
+def test_staging_grows(memory):
+    memory.write_batch([1], [7])
+    memory.write_batch(np.arange(256), np.arange(256) * 3)
+    np.testing.assert_array_equal(memory.read_batch(np.arange(256)), np.arange(256) * 3)
+
+
+def test_blocks(memory):
+    data = bytes(range(64))
+    memory.write_block(10, data)
+    assert memory.read_block(10, 32) == data
+    assert int(memory.read(10, Bit(1))) == 0x0001
+    assert memory.read_block(10, 2, Bit(0)) == bytes(4)
+
+
+def test_observers(memory):
+    written = []
+    memory.observers.append(lambda address, count: written.append((address, count)))
+    memory.write(3, BitString.from_int(1, 16), Bit(1))
+    memory.write(4, BitString.from_int(1, 16), Bit(0))
+    memory.write_batch([9, 8, 9], [1, 2, 3], np.array([True, True, False]))
+    assert written == [(3, 1), (8, 1), (9, 1)]
+
+
+def test_byte_words_run_a_cpu():
+    with ShardedSRAM(8, 16, 8, n_shards=2, processes=False) as memory:
+        cpu = CPU(memory)
+        cpu.load(assemble("LOADI A 5\nLOADI B 7\nADD A B\nSTORE A 100\nHALT"))
+        cpu.run()
+        assert memory.read(100, Bit(1)) == Byte.from_int(12)
+        assert isinstance(memory.read(100, Bit(1)), Byte)
+
+
+def test_close_releases_shared_memory():
+    memory = ShardedSRAM(16, 4, 4, n_shards=2)
+    memory.read_batch([0, 1])
+    names = [shared.name for shared in memory._memories]
+    memory.close()
+    assert memory._workers == [] and memory.shards == []
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name)
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from computer.adders import full_adder, ripple_carry_adder
+from computer.bits_and_bytes import Bit, BitString
+from computer.netlist import trace
+from computer.ram import AndOrLatch, GatedLatch, MatrixRegister
+from computer.simulation import (
+    AndOrLatchComponent,
+    GatedLatchComponent,
+    MatrixRegisterComponent,
+    Simulator,
+)
+
+
+def test_and_or_latch_component_matches_and_or_latch():
+    rng = random.Random(0)
+    latch, component = AndOrLatch(), AndOrLatchComponent(Simulator())
+    for _ in range(100):
+        set, reset = Bit(rng.getrandbits(1)), Bit(rng.getrandbits(1))
+        latch.write(set, reset)
+        component.write(set, reset)
+        assert component.read() == latch.read()
+
+
+def test_gated_latch_component_matches_gated_latch():
+    rng = random.Random(0)
+    latch, component = GatedLatch(), GatedLatchComponent(Simulator())
+    for _ in range(100):
+        data, write_enable = Bit(rng.getrandbits(1)), Bit(rng.getrandbits(1))
+        latch.write(data, write_enable)
+        component.write(data, write_enable)
+        assert component.read() == latch.read()
+
+
+def test_matrix_register_component_matches_matrix_register():
+    rng = random.Random(0)
+    register, component = MatrixRegister(width=8), MatrixRegisterComponent(Simulator(), width=8)
+    for _ in range(300):
+        row, col, enable = rng.randrange(8), rng.randrange(8), Bit(rng.getrandbits(1))
+        if rng.random() < 0.5:
+            data = Bit(rng.getrandbits(1))
+            register.write(row, col, data, enable)
+            component.write(row, col, data, enable)
+        else:
+            assert component.read(row, col, enable) == register.read(row, col, enable)
+
+
+@pytest.mark.parametrize("width", [16, 32, 64])
+def test_matrix_register_component_cost_is_activity_proportional(width):
+    simulator = Simulator()
+    component = MatrixRegisterComponent(simulator, width=width)
+    component.write(3, 5, Bit(1), Bit(1))
+    evaluations = simulator.evaluations
+    component.write(3, 6, Bit(0), Bit(1))
+    # the write touches the gates of two columns and of the shared wires in each row, not the whole matrix
+    assert simulator.evaluations - evaluations < 16 * width
+    assert len(simulator.gates) > 8 * width * width
+
+
+def test_add_netlist():
+    simulator = Simulator()
+    a, b = [simulator.net() for _ in range(4)], [simulator.net() for _ in range(4)]
+    sum, carry = simulator.add_netlist(trace(ripple_carry_adder, 4, 4), [a, b])
+    rng = random.Random(0)
+    for _ in range(50):
+        x, y = BitString.from_int(rng.getrandbits(4), 4), BitString.from_int(rng.getrandbits(4), 4)
+        for net, bit in zip(a + b, list(x) + list(y)):
+            simulator.set(net, bit)
+        simulator.settle()
+        expected = ripple_carry_adder(x, y)
+        assert BitString.from_bits(simulator.get(net) for net in sum) == expected[0]
+        assert simulator.get(carry) == expected[1]
+
+
+def test_full_adder_netlist_settles_in_its_depth():
+    simulator = Simulator()
+    inputs = [simulator.net() for _ in range(3)]
+    simulator.add_netlist(trace(full_adder, 0, 0, 0), inputs)
+    simulator.settle()
+    for net in inputs:
+        simulator.set(net, Bit(1))
+    assert simulator.settle() <= 6
+
+
+def test_oscillation_is_detected():
+    simulator = Simulator(max_deltas=50)
+    net = simulator.net()
+    simulator.gate("NOT", [net], net)
+    with pytest.raises(RuntimeError):
+        simulator.settle()